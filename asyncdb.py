@@ -0,0 +1,189 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import paged
+import storage
+from joins import iter_join, join
+from models import Column, Database, Table
+
+# Асинхронний фасад над Database для asyncio-сервісів. Читання виконуються в пулі потоків
+# над знімками лише потрібних таблиць (Table.snapshot; SQL — у транзакції), тож не
+# блокують ні цикл подій, ні записи, ні збереження. Записи (і save) стають у чергу з
+# обмеженою довжиною й виконуються по одному в потоці-записувачі в порядку надходження;
+# коли черга повна, write() чекає.
+# Потоки рядків і результатів з'єднання віддаються порціями по batch: наступна порція
+# читається лише тоді, коли споживач забрав попередню.
+#   async with await AsyncDatabase.open("shop.json") as adb:
+#       async for row in adb.rows("Orders"): ...
+
+DEFAULT_BATCH = 1000
+DEFAULT_PENDING = 1000
+
+
+def _take(it: Iterator[Any], n: int) -> List[Any]:
+    return list(islice(it, n))
+
+
+class AsyncDatabase:
+    def __init__(self, db: Database, path: Optional[str] = None, readers: int = 4,
+                 max_pending: int = DEFAULT_PENDING):
+        self.db = db
+        self.path = path
+        self.max_pending = max_pending
+        self.reader_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="minidb-async-read")
+        self.writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="minidb-async-write")
+        # черга й задача-записувач створюються в циклі подій першого write()
+        self._queue: Optional["asyncio.Queue[Tuple[Callable[..., Any], Tuple[Any, ...], asyncio.Future]]"] = None
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self.closed = False
+
+    @classmethod
+    async def open(cls, path: str, lazy: bool = False, compact: bool = False, readers: int = 4,
+                   progress: Optional[storage.Progress] = None) -> "AsyncDatabase":
+        # progress викликається з потоку завантаження
+        loop = asyncio.get_running_loop()
+        db = await loop.run_in_executor(None, lambda: storage.load_from_file(path, lazy, progress, compact))
+        return cls(db, path, readers)
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    # --- виконання --------------------------------------------------------------
+
+    def _check_open(self) -> None:
+        if self.closed:
+            raise ValueError("AsyncDatabase is closed")
+
+    async def read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._check_open()
+        return await asyncio.get_running_loop().run_in_executor(self.reader_pool, fn, *args)
+
+    async def write(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._check_open()
+        if self._writer is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, fut))
+        return await fut
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, args, fut = await self._queue.get()
+            # запис, на який уже ніхто не чекає, не виконується
+            if not fut.cancelled():
+                job = loop.run_in_executor(self.writer_pool, fn, *args)
+                # виняток передається, а не піднімається тут: інакше його traceback тримав би
+                # кадр цієї задачі, і traceback.clear_frames у споживача закрив би її
+                await asyncio.wait((job,))
+                if not fut.cancelled():
+                    if job.exception() is not None:
+                        fut.set_exception(job.exception())
+                    else:
+                        fut.set_result(job.result())
+            self._queue.task_done()
+
+    async def _iterate(self, make_iter: Callable[[], Iterator[Any]], batch: int) -> AsyncIterator[Any]:
+        if batch < 1:
+            raise ValueError("Batch size must be positive")
+        it = await self.read(make_iter)
+        while True:
+            part = await self.read(_take, it, batch)
+            if not part:
+                return
+            for item in part:
+                yield item
+
+    def _snapshots(self, *names: str) -> List[Table]:
+        # знімки лише потрібних таблиць, узяті разом під замком бази
+        with self.db._lock:
+            return [self.db.get_table(name).snapshot() for name in names]
+
+    # --- файл -------------------------------------------------------------------
+
+    async def save(self, path: Optional[str] = None, progress: Optional[storage.Progress] = None) -> str:
+        # у черзі записів: зберігається стан після всіх записів, поставлених раніше
+        path = path or self.path
+        if path is None:
+            raise ValueError("No file path to save to")
+        await self.write(storage.save_to_file, self.db, path, progress)
+        self.path = path
+        return path
+
+    async def close(self) -> None:
+        # дочікується поставлених записів; сторінкові файли (.pages) закриваються
+        if self.closed:
+            return
+        if self._writer is not None:
+            await self._queue.join()
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+        self.closed = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.reader_pool.shutdown)
+        self.writer_pool.shutdown()
+        paged.close(self.db)
+
+    # --- читання ----------------------------------------------------------------
+
+    async def list_tables(self) -> List[str]:
+        return self.db.list_tables()
+
+    async def table(self, name: str) -> Table:
+        # знімок таблиці: пізніші записи його не змінюють
+        return (await self.read(self._snapshots, name))[0]
+
+    async def query(self, sql: str) -> List[Dict[str, Any]]:
+        def run() -> List[Dict[str, Any]]:
+            # транзакція знімає лише таблиці, які читає запит
+            with self.db.begin() as tx:
+                return tx.query(sql)
+        return await self.read(run)
+
+    def rows(self, table: str, batch: int = DEFAULT_BATCH) -> AsyncIterator[Dict[str, Any]]:
+        return self._iterate(lambda: self._snapshots(table)[0].iter_rows(), batch)
+
+    def join(self, left: str, right: str, on: Union[str, Sequence[str]], how: str = "inner",
+             batch: int = DEFAULT_BATCH, **options: Any) -> AsyncIterator[Dict[str, Any]]:
+        # options — як у joins.iter_join (suffixes, strategy, memory_rows, ...)
+        def cursor() -> Iterator[Dict[str, Any]]:
+            return iter_join(*self._snapshots(left, right), on, how, **options)
+        return self._iterate(cursor, batch)
+
+    async def join_table(self, left: str, right: str, on: Union[str, Sequence[str]], how: str = "inner",
+                         **options: Any) -> Table:
+        def run() -> Table:
+            return join(*self._snapshots(left, right), on, how, **options)
+        return await self.read(run)
+
+    # --- записи -----------------------------------------------------------------
+
+    async def create_table(self, name: str, columns: Iterable[Column] = ()) -> Table:
+        t = Table(name=name, columns=list(columns))
+        for c in t.columns:
+            c.validate(c.default)
+        return await self.write(self.db.add_table, t)
+
+    async def delete_table(self, name: str) -> None:
+        await self.write(self.db.delete_table, name)
+
+    async def add_column(self, table: str, column: Column) -> None:
+        await self.write(lambda: self.db.get_table(table).add_column(column))
+
+    async def add_row(self, table: str, values: Dict[str, Any]) -> int:
+        return await self.write(lambda: self.db.get_table(table).add_row(values))
+
+    async def add_rows(self, table: str, rows: Iterable[Dict[str, Any]]) -> List[Tuple[int, str]]:
+        return await self.write(lambda: self.db.get_table(table).add_rows(rows))
+
+    async def update(self, table: str, rid: int, values: Dict[str, Any]) -> None:
+        await self.write(lambda: self.db.get_table(table).update(rid, values))
+
+    async def delete(self, table: str, rid: int) -> None:
+        await self.write(lambda: self.db.get_table(table).delete(rid))
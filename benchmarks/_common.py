@@ -0,0 +1,71 @@
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List
+
+from models import Column, Table
+
+STATUSES = ["NEW", "PAID", "CANCELLED", "SHIPPED"]
+
+
+def sample_columns() -> List[Column]:
+    return [
+        Column("id", "integer"),
+        Column("price", "real"),
+        Column("status", "enum", enum_values=list(STATUSES)),
+        Column("email", "email"),
+    ]
+
+
+def sample_rows(n: int, seed: int = 1) -> Iterator[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield {
+            "id": i,
+            "price": round(rnd.random() * 100, 2),
+            "status": rnd.choice(STATUSES),
+            "email": f"user{rnd.randrange(1000)}@example.com",
+        }
+
+
+def skewed_keys(n: int, distinct: int, skew: float = 0.0, seed: int = 1) -> List[int]:
+    # n ключів із [0, distinct): skew 0 — рівномірно, інакше Zipf (вага ключа k — 1/(k+1)^skew)
+    rnd = random.Random(seed)
+    if skew <= 0:
+        return [rnd.randrange(distinct) for _ in range(n)]
+    weights = list(accumulate(1 / (k + 1) ** skew for k in range(distinct)))
+    return rnd.choices(range(distinct), cum_weights=weights, k=n)
+
+
+def sample_table(n: int, name: str = "T", seed: int = 1) -> Table:
+    t = Table(name=name, columns=sample_columns())
+    t.rows = list(sample_rows(n, seed))
+    return t
+
+
+def timed(fn: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+@contextmanager
+def traced_memory() -> Iterator[Dict[str, int]]:
+    out: Dict[str, int] = {}
+    tracemalloc.start()
+    try:
+        yield out
+        out["current"], out["peak"] = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+
+def report(title: str, rows: List[Dict[str, Any]]) -> None:
+    print(title)
+    for r in rows:
+        print("  " + "  ".join(f"{k}={v}" for k, v in r.items()))
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from asyncdb import AsyncDatabase
+from benchmarks._common import report, sample_table
+from models import Database
+
+SQL = "SELECT COUNT(*) FROM S WHERE price > 50"
+
+
+async def _reads(adb: AsyncDatabase, clients: int, per_client: int) -> list:
+    async def client() -> list:
+        out = []
+        for _ in range(per_client):
+            t0 = time.perf_counter()
+            await adb.query(SQL)
+            out.append(time.perf_counter() - t0)
+        return out
+    return [s for part in await asyncio.gather(*(client() for _ in range(clients))) for s in part]
+
+
+async def _tick_lag(seconds: float) -> float:
+    # наскільки запізнюється цикл подій: якщо щось його блокує, sleep(0.01) триває довше
+    worst = 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - t0 - 0.01)
+    return worst
+
+
+async def run(n: int, clients: int, per_client: int, readers: int) -> None:
+    db = Database("bench")
+    db.add_table(sample_table(n))
+    db.add_table(sample_table(1000, name="S", seed=2))
+    path = os.path.join(tempfile.mkdtemp(), "bench.json")
+    results = []
+    async with AsyncDatabase(db, path, readers=readers) as adb:
+        for label, with_save in (("idle", False), ("during save", True)):
+            t0 = time.perf_counter()
+            finished = {}
+            save = None
+            if with_save:
+                save = asyncio.ensure_future(adb.save())
+                save.add_done_callback(lambda _: finished.setdefault("save", time.perf_counter() - t0))
+            lag = asyncio.ensure_future(_tick_lag(0.5))
+            lat = sorted(await _reads(adb, clients, per_client))
+            wall = time.perf_counter() - t0
+            if save is not None:
+                await save
+            save_s = round(finished["save"], 3) if save is not None else None
+            results.append({"reads": label, "reads_per_s": round(len(lat) / wall), "p50_ms": round(lat[len(lat) // 2] * 1e3, 2),
+                            "p99_ms": round(lat[int(len(lat) * 0.99)] * 1e3, 2), "save_s": save_s,
+                            "loop_lag_ms": round(await lag * 1e3, 1)})
+        t0 = time.perf_counter()
+        rows = 0
+        async for _ in adb.rows("T"):
+            rows += 1
+        results.append({"op": "async rows", "rows_per_s": round(rows / (time.perf_counter() - t0))})
+        t0 = time.perf_counter()
+        await asyncio.gather(*(adb.add_row("S", {"id": i, "price": 1.0}) for i in range(2000)))
+        results.append({"op": "queued add_row", "writes_per_s": round(2000 / (time.perf_counter() - t0))})
+    report(f"AsyncDatabase: {clients} coroutines x {per_client} queries, save of {n} rows", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--clients", type=int, default=200)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--readers", type=int, default=4)
+    args = ap.parse_args()
+    asyncio.run(run(args.rows, args.clients, args.queries, args.readers))
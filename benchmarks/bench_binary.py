@@ -0,0 +1,34 @@
+import argparse
+import os
+import tempfile
+
+from benchmarks._common import report, sample_table, timed
+from binstore import read_column
+from models import Database
+from storage import load_from_file, save_to_file
+
+
+def run(n: int) -> None:
+    db = Database(name="bench")
+    db.tables["T"] = sample_table(n)
+    tmp = tempfile.mkdtemp()
+    results = []
+    for ext in (".json", ".minidb"):
+        path = os.path.join(tmp, "bench" + ext)
+        save_s = timed(lambda: save_to_file(db, path), repeat=1)
+        load_s = timed(lambda: load_from_file(path), repeat=1)
+        row = {"format": ext, "rows": n, "file_mb": round(os.path.getsize(path) / 2**20, 2),
+               "save_s": round(save_s, 3), "load_s": round(load_s, 4)}
+        if ext == ".minidb":
+            row["open_and_sum_s"] = round(timed(lambda: sum(read_column(path, "T", "price")[0])), 4)
+        else:
+            row["open_and_sum_s"] = round(timed(
+                lambda: sum(r["price"] for r in load_from_file(path).get_table("T").rows), repeat=1), 4)
+        results.append(row)
+    report("JSON vs binary storage", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    run(ap.parse_args().rows)
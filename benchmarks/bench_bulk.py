@@ -0,0 +1,35 @@
+import argparse
+import os
+import tempfile
+
+from benchmarks._common import report, sample_table, timed
+from bulk import export_file, import_file
+from models import Column, Database, Table
+
+
+def run(n: int, workers: int) -> None:
+    src = sample_table(n)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("csv", "ndjson"):
+            path = os.path.join(tmp, f"T.{fmt}")
+            s = timed(lambda: export_file(src, path), repeat=1)
+            results.append({"op": "export", "format": fmt, "rows_per_s": round(n / s),
+                            "mb": round(os.path.getsize(path) / 2**20, 1)})
+            for label, w, schema in [("inferred schema", 0, False), ("table schema", 0, True),
+                                     (f"table schema, {workers} processes", workers, True)]:
+                db = Database("bench")
+                if schema:
+                    db.add_table(Table("T", [Column(c.name, c.dtype, c.enum_values) for c in src.columns]))
+                rep = import_file(db, path, table="T", workers=w, rejects=os.path.join(tmp, "rejects.ndjson"))
+                results.append({"op": "import", "format": fmt, "mode": label, "rows_per_s": round(rep.rows_per_s),
+                                "rejected": rep.rejected})
+    report("streaming bulk import/export", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+    run(args.rows, args.workers)
@@ -0,0 +1,32 @@
+import argparse
+
+from benchmarks._common import report, sample_table, timed
+from cache import ResultCache
+from models import Database, join_tables
+
+
+def run(n: int) -> None:
+    db = Database("bench", cache=ResultCache(max_bytes=1024 * 2**20))
+    t = db.add_table(sample_table(n))
+    small = sample_table(n // 10, name="S", seed=2)
+    sql = "SELECT status, COUNT(*) AS n, AVG(price) AS avg_price FROM T WHERE price > 20 GROUP BY status"
+    ops = {
+        "query (group-by)": lambda: db.query(sql),
+        "join_tables": lambda: join_tables(t, small, "id", cache=db.cache),
+    }
+    results = []
+    for op, fn in ops.items():
+        miss = timed(fn, repeat=1)
+        hit = timed(fn, repeat=3)
+        t.add_row({"id": n, "price": 1.0, "status": "NEW", "email": "x@example.com"})
+        after_write = timed(fn, repeat=1)
+        results.append({"op": op, "miss_s": round(miss, 4), "hit_s": round(hit, 6),
+                        "after_write_s": round(after_write, 4), "speedup": round(miss / hit) if hit else None})
+    report(f"result cache on a {n}-row table", results + [db.cache.stats()])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    run(args.rows)
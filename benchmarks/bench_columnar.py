@@ -0,0 +1,33 @@
+import argparse
+
+from benchmarks._common import report, sample_rows, sample_columns, timed, traced_memory
+from columnar import ColumnStore
+from models import Table
+
+
+def run(n: int) -> None:
+    results = []
+    for layout in ("rows", "columnar"):
+        with traced_memory() as mem:
+            t = Table(name="T", columns=sample_columns())
+            if layout == "columnar":
+                t.rows = ColumnStore(t.columns)
+            t.rows.extend(sample_rows(n))
+        if layout == "columnar":
+            scan = lambda: sum(v for v in t.rows.column_values("price") if v is not None)
+        else:
+            scan = lambda: sum(r["price"] for r in t.rows if r["price"] is not None)
+        results.append({
+            "layout": layout,
+            "rows": n,
+            "memory_mb": round(mem["current"] / 2**20, 1),
+            "scan_s": round(timed(scan), 4),
+            "full_rows_s": round(timed(lambda: sum(1 for _ in t.rows), repeat=1), 4),
+        })
+    report("columnar vs dict-of-rows", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    run(ap.parse_args().rows)
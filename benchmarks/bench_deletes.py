@@ -0,0 +1,36 @@
+import argparse
+import random
+
+from benchmarks._common import report, sample_table, timed
+from columnar import make_columnar
+
+
+def run(n: int, deletes: int) -> None:
+    results = []
+    for layout in ("rows", "columnar"):
+        t = sample_table(n)
+        if layout == "columnar":
+            make_columnar(t)
+        t.create_index("id", "sorted")
+        t.create_index("status", "hash")
+        rnd = random.Random(1)
+        ids = [t.row_id(p) for p in rnd.sample(range(n), deletes)]
+
+        def delete_all() -> None:
+            for rid in ids:
+                t.delete(rid)
+
+        s = timed(delete_all, repeat=1)
+        results.append({"layout": layout, "deletes": deletes, "s": round(s, 3),
+                        "us_per_delete": round(s / deletes * 1e6, 1),
+                        "tombstones": len(t.rows) - t.row_count()})
+        results.append({"layout": layout, "op": "compact", "s": round(timed(t.compact, repeat=1), 3)})
+    report("deletes by row id with a sorted and a hash index", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--deletes", type=int, default=10_000)
+    args = ap.parse_args()
+    run(args.rows, args.deletes)
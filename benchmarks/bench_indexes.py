@@ -0,0 +1,28 @@
+import argparse
+
+from benchmarks._common import report, sample_table, timed
+
+
+def run(n: int) -> None:
+    t = sample_table(n)
+    probe, lo, hi = n // 2, n // 3, n // 3 + 100
+    results = [{
+        "mode": "scan",
+        "rows": n,
+        "eq_s": round(timed(lambda: t.find("id", probe)), 4),
+        "range_s": round(timed(lambda: t.find_range("id", lo, hi)), 4),
+    }]
+    for kind in ("hash", "sorted"):
+        build = timed(lambda: t.create_index("id", kind), repeat=1)
+        row = {"mode": kind, "rows": n, "build_s": round(build, 3),
+               "eq_s": round(timed(lambda: t.find("id", probe)), 6)}
+        if kind == "sorted":
+            row["range_s"] = round(timed(lambda: t.find_range("id", lo, hi)), 6)
+        results.append(row)
+    report("point and range lookups", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,31 @@
+import argparse
+
+from benchmarks._common import report, sample_columns, sample_rows, timed
+from models import Table
+
+
+def run(n: int) -> None:
+    data = [{k: str(v) for k, v in r.items()} for r in sample_rows(n)]
+
+    def one_by_one():
+        t = Table(name="T", columns=sample_columns())
+        for r in data:
+            t.add_row(r)
+
+    def batched():
+        t = Table(name="T", columns=sample_columns())
+        t.add_rows(data)
+
+    base = timed(one_by_one, repeat=1)
+    bulk = timed(batched, repeat=1)
+    report("ingest: add_row loop vs add_rows", [
+        {"path": "add_row", "rows": n, "seconds": round(base, 3), "rows_per_s": int(n / base)},
+        {"path": "add_rows", "rows": n, "seconds": round(bulk, 3), "rows_per_s": int(n / bulk),
+         "speedup": round(base / bulk, 2)},
+    ])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,41 @@
+import argparse
+
+import joins
+from benchmarks._common import report, sample_table, timed
+from models import Column, Table
+
+
+def _dimension(n: int) -> Table:
+    t = Table("dim", [Column("id", "integer"), Column("label", "string")])
+    t.add_rows({"id": i, "label": f"label-{i}"} for i in range(n))
+    return t
+
+
+def run(n: int) -> None:
+    fact = sample_table(n, name="fact")
+    results = []
+    for ratio in (1, 10, 100):
+        dim = _dimension(max(1, n // ratio))
+        for strategy in ("hash", "merge", "partitioned"):
+            kwargs = {"partitions": 16} if strategy == "partitioned" else {}
+            results.append({
+                "ratio": f"1:{ratio}",
+                "strategy": strategy,
+                "left_s": round(timed(lambda: joins.join(fact, dim, "id", how="left", strategy=strategy, **kwargs), repeat=1), 3),
+            })
+    report("fact x dimension joins", results)
+    # many-to-many: вся відповідь чи перша сторінка курсора
+    dup = _dimension(max(1, n // 10))
+    dup.rows = [{"id": r["id"] % 100, "label": r["label"]} for r in dup.rows]
+    fact_small = sample_table(max(1, n // 10), name="fact")
+    fact_small.rows = [dict(r, id=r["id"] % 100) for r in fact_small.rows]
+    report("many-to-many join", [
+        {"mode": "first_page", "s": round(timed(lambda: joins.iter_join(fact_small, dup, "id").fetch(200)), 4)},
+        {"mode": "materialize", "s": round(timed(lambda: joins.join(fact_small, dup, "id"), repeat=1), 3)},
+    ])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    run(ap.parse_args().rows)
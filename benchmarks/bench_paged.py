@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+
+import joins
+import paged
+from benchmarks._common import report, sample_table, timed, traced_memory
+from models import Database
+
+
+def run(n: int, pool_pages: int, page_size: int) -> None:
+    db = Database("bench")
+    db.add_table(sample_table(n))
+    db.add_table(sample_table(n // 10, name="S", seed=2))
+    path = os.path.join(tempfile.mkdtemp(), "bench.pages")
+    results = [{"op": "save", "s": round(timed(lambda: paged.save(db, path, page_size=page_size), repeat=1), 3),
+                "file_mb": round(os.path.getsize(path) / 2**20, 1)}]
+    for policy in paged.POLICIES:
+        pool = paged.BufferPool(pool_pages, policy)
+        loaded = paged.load(path, pool)
+        t, s = loaded.get_table("T"), loaded.get_table("S")
+        scan = timed(lambda: sum(1 for _ in t.iter_rows()), repeat=1)
+        # повторний прохід по невеликій таблиці: вона вміщується в пул, велика — ні
+        hot = timed(lambda: sum(1 for _ in s.iter_rows()), repeat=3)
+        lookups = timed(lambda: [t.row(i) for i in range(0, n, max(1, n // 10_000))], repeat=1)
+        strategy = joins._choose(t, s, ["id"], "auto", None)
+        join = timed(lambda: joins.join(t, s, "id"), repeat=1)
+        for i in range(0, n, max(1, n // 1000)):
+            t.edit_row(i, {"price": 1.0})
+        checkpoint = timed(lambda: paged.save(loaded, path), repeat=1)
+        # пам'ять повного проходу обмежена пулом, а не розміром таблиці
+        with traced_memory() as mem:
+            sum(1 for _ in t.iter_rows())
+        stats = pool.stats()
+        results.append({"policy": policy, "scan_rows_per_s": round(n / scan), "hot_scan_s": round(hot, 3),
+                        "lookup_s": round(lookups, 3), "join": strategy, "join_s": round(join, 3),
+                        "checkpoint_s": round(checkpoint, 3), "hit_rate": stats["hit_rate"],
+                        "evictions": stats["evictions"], "peak_mb": round(mem["peak"] / 2**20, 1)})
+        paged.close(loaded)
+    report(f"paged tables ({n} rows, {pool_pages} x {page_size // 1024} KiB pool)", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--pool-pages", type=int, default=256)
+    ap.add_argument("--page-size", type=int, default=paged.DEFAULT_PAGE_SIZE)
+    args = ap.parse_args()
+    run(args.rows, args.pool_pages, args.page_size)
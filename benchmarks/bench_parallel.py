@@ -0,0 +1,45 @@
+import argparse
+import os
+
+import joins
+from benchmarks._common import report, sample_table, timed
+from columnar import make_columnar
+from parallel import Parallel
+from query import Condition, Query, Scan
+
+
+def run(n: int, workers_list: list) -> None:
+    t = make_columnar(sample_table(n))
+    small = sample_table(n // 10, name="S", seed=2)
+    cond = [("price", ">", 50), ("status", "in", ["NEW", "PAID"])]
+    aggs = {"n": ("count", "*"), "avg_price": ("avg", "price"), "max_id": ("max", "id")}
+    serial = {
+        "filter": lambda: Scan(t, [Condition(*c) for c in cond]).positions(),
+        "group-by": lambda: Query(t).group_by("status").aggregate(**aggs).rows(),
+        "join": lambda: joins.join(t, small, "id"),
+        "check conversion": lambda: t.check_conversion("price", "integer"),
+    }
+    results = [{"op": op, "workers": "serial", "s": round(timed(fn, repeat=1), 3)} for op, fn in serial.items()]
+    for w in workers_list:
+        with Parallel(workers=w) as p:
+            p.share(t), p.share(small)  # копіювання у спільну пам'ять — окремий рядок звіту
+            ops = {
+                "filter": lambda: p.filter(t, cond),
+                "group-by": lambda: p.aggregate(t, aggs, ["status"]),
+                "join": lambda: p.join(t, small, "id"),
+                "check conversion": lambda: p.check_conversion(t, "price", "integer"),
+            }
+            p.filter(t, cond)  # прогрів процесів пулу
+            for op, fn in ops.items():
+                results.append({"op": op, "workers": w, "s": round(timed(fn, repeat=2), 3)})
+    with Parallel(workers=1) as p:
+        results.append({"op": "share (copy to shared memory)", "s": round(timed(lambda: p.share(t).close(), repeat=1), 3)})
+    report(f"partitioned execution on a {n}-row columnar table ({os.cpu_count()} CPUs)", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = ap.parse_args()
+    run(args.rows, args.workers)
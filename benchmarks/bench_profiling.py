@@ -0,0 +1,39 @@
+import argparse
+
+import profiling
+from benchmarks._common import report, sample_columns, sample_rows, sample_table, timed
+from models import Table, join_tables
+
+
+def run(n: int) -> None:
+    data = [{k: str(v) for k, v in r.items()} for r in sample_rows(n)]
+    big, small = sample_table(n), sample_table(n // 10, name="S", seed=2)
+
+    def add_row() -> None:
+        t = Table(name="T", columns=sample_columns())
+        for r in data:
+            t.add_row(r)
+    ops = {
+        "add_row": add_row,
+        "add_rows": lambda: Table(name="T", columns=sample_columns()).add_rows(data),
+        "join_tables": lambda: join_tables(big, small, "id"),
+    }
+    results = []
+    for op, fn in ops.items():
+        off = timed(fn, repeat=3)
+        with profiling.profiled():
+            on = timed(fn, repeat=3)
+        results.append({"op": op, "disabled_s": round(off, 4), "enabled_s": round(on, 4),
+                        "overhead": f"{on / off - 1:+.0%}"})
+    report(f"instrumentation overhead on {n} rows", results)
+    with profiling.profiled() as stats:
+        ops["add_rows"]()
+        ops["join_tables"]()
+    report("counters (add_rows + join_tables)", [dict(name=k, **v) for k, v in stats.items()])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+    run(args.rows)
@@ -0,0 +1,38 @@
+import argparse
+
+from benchmarks._common import report, sample_table, timed
+from columnar import make_columnar
+from query import Query
+
+
+def run(n: int) -> None:
+    t = sample_table(n)
+    probe, lo, hi = n // 2, n // 3, n // 3 + 1000
+    eq = lambda: Query(t).where("id", "=", probe).rows()
+    ranged = lambda: Query(t).where("id", ">=", lo).where("id", "<", hi).rows()
+    results = [
+        {"query": "where id = k", "plan": "scan", "s": round(timed(eq), 4)},
+        {"query": "where id in range", "plan": "scan", "s": round(timed(ranged), 4)},
+    ]
+    t.create_index("id", "sorted")
+    results += [
+        {"query": "where id = k", "plan": "index", "s": round(timed(eq), 6)},
+        {"query": "where id in range", "plan": "index", "s": round(timed(ranged), 6)},
+    ]
+    group = lambda: Query(t).group_by("status").aggregate(n=("count", "*"), total=("sum", "price")).rows()
+    results.append({"query": "group by status", "plan": "hash aggregate", "s": round(timed(group, repeat=1), 3)})
+    topk = lambda: Query(t).order_by("price", desc=True).limit(10).rows()
+    full = lambda: sorted(t.rows, key=lambda r: (r["price"] is None, r["price"]), reverse=True)[:10]
+    results.append({"query": "order by price limit 10", "plan": "top-k", "s": round(timed(topk, repeat=1), 3)})
+    results.append({"query": "order by price limit 10", "plan": "full sort", "s": round(timed(full, repeat=1), 3)})
+    make_columnar(t)
+    paid = lambda: Query(t).where("status", "=", "PAID").aggregate(n=("count", "*")).rows()
+    results.append({"query": "group by status", "plan": "columnar, dictionary codes", "s": round(timed(group, repeat=1), 3)})
+    results.append({"query": "where status = k, count", "plan": "columnar, dictionary codes", "s": round(timed(paid), 3)})
+    report("query engine", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,47 @@
+import argparse
+import os
+import tempfile
+
+import joins
+from benchmarks._common import report, sample_table, timed, traced_memory
+from models import Database, Table
+from rowstore import make_compact
+from storage import load_from_file, save_to_file
+
+
+def run(n: int) -> None:
+    src = sample_table(n)
+    doc = src.to_dict()
+    small = sample_table(n // 10, name="S", seed=2)
+    path = os.path.join(tempfile.mkdtemp(), "bench.json")
+    db = Database("bench")
+    db.add_table(Table.from_dict(doc))
+    save_to_file(db, path)
+    # пам'ять, що лишається після операції (tracemalloc current), на рядок результату; значення
+    # в from_dict і join спільні з входом, тож там рахуються лише рядки-контейнери
+    ops = {
+        "Table.from_dict": lambda compact: Table.from_dict(doc, compact=compact),
+        "join (id)": lambda compact: joins.join(src, small, "id", compact=compact),
+        "load_from_file json": lambda compact: load_from_file(path, compact=compact),
+    }
+    results = []
+    for op, fn in ops.items():
+        row = {"op": op}
+        for compact in (False, True):
+            with traced_memory() as mem:
+                res = fn(compact)
+            rows = res.row_count() if isinstance(res, Table) else sum(t.row_count() for t in res.tables.values())
+            label = "compact" if compact else "dict"
+            row[f"{label}_bytes_per_row"] = round(mem["current"] / rows)
+            row[f"{label}_s"] = round(timed(lambda: fn(compact), repeat=1), 3)
+            del res
+        row["ratio"] = round(row["compact_bytes_per_row"] / row["dict_bytes_per_row"], 2)
+        results.append(row)
+    results.append({"op": "make_compact", "s": round(timed(lambda: make_compact(Table.from_dict(doc)), repeat=1), 3)})
+    report(f"compact tuple rows vs dict rows ({n} rows, 4 columns)", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks._common import report, sample_rows, sample_table
+from models import Database
+from server import ApiServer
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                   body: Any = None) -> int:
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        k, _, v = line.decode().partition(":")
+        if k.lower() == "content-length":
+            length = int(v)
+    await reader.readexactly(length)
+    return status
+
+
+async def _clients(port: int, clients: int, seconds: float,
+                   make: Callable[[int, int], Tuple[str, str, Any]]) -> Tuple[int, List[float]]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client(c: int) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        i = 0
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            status = await _request(reader, writer, *make(c, i))
+            latencies.append(time.perf_counter() - t0)
+            if status >= 400:
+                raise RuntimeError(f"HTTP {status}")
+            i += 1
+        writer.close()
+
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    return len(latencies), sorted(latencies)
+
+
+def _workloads(n: int, batch: int) -> Dict[str, Callable[[int, int], Tuple[str, str, Any]]]:
+    rows = list(sample_rows(batch, seed=2))
+    return {
+        "get row": lambda c, i: ("GET", f"/tables/T/rows/{(c * 7919 + i * 31) % n}", None),
+        "page of 100": lambda c, i: ("GET", f"/tables/T/rows?offset={(c * 7919 + i * 100) % (n - 100)}&limit=100", None),
+        "insert row": lambda c, i: ("POST", "/tables/T/rows", rows[i % batch]),
+        f"insert batch of {batch}": lambda c, i: ("POST", "/tables/T/rows", rows),
+        "group-by query": lambda c, i: ("POST", "/query",
+                                        {"sql": "SELECT status, COUNT(*) FROM T WHERE price > 50 GROUP BY status"}),
+    }
+
+
+def run(n: int, seconds: float, batch: int) -> None:
+    db = Database("bench")
+    db.add_table(sample_table(n))
+    api = ApiServer(db)
+    loop = asyncio.new_event_loop()
+    srv = loop.run_until_complete(api.start("127.0.0.1", 0))
+    port = srv.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    results = []
+    try:
+        for name, make in _workloads(n, batch).items():
+            for clients in (1, 8, 32):
+                count, lat = asyncio.run(_clients(port, clients, seconds, make))
+                results.append({"workload": name, "clients": clients, "req_per_s": round(count / seconds, 1),
+                                "p50_ms": round(lat[len(lat) // 2] * 1e3, 2),
+                                "p99_ms": round(lat[int(len(lat) * 0.99)] * 1e3, 2)})
+    finally:
+        asyncio.run_coroutine_threadsafe(api.stop(srv), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        api.close()
+    report(f"HTTP API over a {n}-row table: throughput and latency with concurrent keep-alive clients", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--batch", type=int, default=100)
+    args = ap.parse_args()
+    run(args.rows, args.seconds, args.batch)
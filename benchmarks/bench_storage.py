@@ -0,0 +1,43 @@
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks._common import report, sample_table, timed, traced_memory
+from models import Database
+from storage import load_from_file, save_to_file
+
+
+def _json_load(path: str) -> Database:
+    with open(path, "r", encoding="utf-8") as f:
+        return Database.from_dict(json.load(f))
+
+
+def run(n: int, tables: int) -> None:
+    db = Database(name="bench")
+    for i in range(tables):
+        db.tables[f"T{i}"] = sample_table(n, name=f"T{i}", seed=i)
+    path = os.path.join(tempfile.mkdtemp(), "bench.json")
+    save_s = timed(lambda: save_to_file(db, path), repeat=1)
+    results = []
+    for mode, fn in (
+        ("json.load+from_dict", lambda: _json_load(path)),
+        ("streaming", lambda: load_from_file(path)),
+        ("lazy open", lambda: load_from_file(path, lazy=True)),
+        ("lazy open+1 table", lambda: load_from_file(path, lazy=True).get_table("T0")),
+    ):
+        with traced_memory() as mem:
+            seconds = timed(fn, repeat=1)
+        results.append({"mode": mode, "seconds": round(seconds, 3),
+                        "peak_mb": round(mem["peak"] / 2**20, 1)})
+    results.append({"mode": "save", "seconds": round(save_s, 3),
+                    "file_mb": round(os.path.getsize(path) / 2**20, 1)})
+    report(f"JSON storage: {tables} tables x {n} rows", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--tables", type=int, default=4)
+    args = ap.parse_args()
+    run(args.rows, args.tables)
@@ -0,0 +1,67 @@
+import argparse
+import threading
+import time
+
+from benchmarks._common import report, sample_table
+from models import Database
+from transactions import Conflict
+
+
+def _run(db: Database, writers: int, readers: int, seconds: float, batch: int):
+    stop = threading.Event()
+    counts = {"commits": 0, "conflicts": 0, "reads": 0}
+    lock = threading.Lock()
+
+    def write(seed: int) -> None:
+        i = seed
+        while not stop.is_set():
+            try:
+                with db.begin() as tx:
+                    t = tx.table("T")
+                    n = t.row_count()
+                    for k in range(batch):
+                        pos = (i * 7919 + k) % n
+                        t.edit_row(pos, {"price": t.row(pos)["price"] + 1})
+            except Conflict:
+                with lock:
+                    counts["conflicts"] += 1
+                continue
+            i += writers
+            with lock:
+                counts["commits"] += 1
+
+    def read() -> None:
+        while not stop.is_set():
+            with db.begin() as tx:
+                tx.query("SELECT status, COUNT(*) FROM T WHERE price > 50 GROUP BY status")
+            with lock:
+                counts["reads"] += 1
+
+    threads = [threading.Thread(target=write, args=(s,)) for s in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for th in threads:
+        th.start()
+    time.sleep(seconds)
+    stop.set()
+    for th in threads:
+        th.join()
+    return {k: round(v / seconds, 1) for k, v in counts.items()}
+
+
+def run(n: int, seconds: float) -> None:
+    db = Database("bench")
+    db.add_table(sample_table(n))
+    results = []
+    for writers, readers in [(1, 0), (4, 0), (0, 1), (0, 4), (1, 4), (4, 4)]:
+        rates = _run(db, writers, readers, seconds, batch=10)
+        results.append({"writers": writers, "readers": readers, "commits_per_s": rates["commits"],
+                        "conflicts_per_s": rates["conflicts"], "snapshot_reads_per_s": rates["reads"]})
+    report("transactions: 10-row commits vs snapshot group-by readers (threads)", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+    run(args.rows, args.seconds)
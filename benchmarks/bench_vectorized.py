@@ -0,0 +1,49 @@
+import argparse
+
+import vectorized
+from benchmarks._common import report, sample_table, timed
+from columnar import make_columnar
+
+
+def run(n: int) -> None:
+    rows_t = sample_table(n)
+    col_t = make_columnar(sample_table(n))
+    cut = 500.0
+    loops = {
+        "filter": lambda: [i for i, r in enumerate(rows_t.rows) if r["price"] is not None and r["price"] > cut],
+        "sum": lambda: sum(r["price"] for r in rows_t.rows if r["price"] is not None),
+        "mean": lambda: (lambda v: sum(v) / len(v))([r["price"] for r in rows_t.rows if r["price"] is not None]),
+        "max": lambda: max(r["price"] for r in rows_t.rows if r["price"] is not None),
+        "sort": lambda: sorted(range(n), key=lambda i: (rows_t.rows[i]["price"] is None, rows_t.rows[i]["price"])),
+    }
+    backends = [False] + ([True] if vectorized.HAS_NUMPY else [])
+    results = []
+    for op, loop in loops.items():
+        base = timed(loop, repeat=1)
+        row = {"op": op, "rows_loop_s": round(base, 3)}
+        for use_numpy in backends:
+            if op == "filter":
+                fn = lambda: vectorized.filter_positions(col_t, "price", ">", cut, use_numpy=use_numpy)
+            elif op == "sort":
+                fn = lambda: vectorized.sort_positions(col_t, "price", use_numpy=use_numpy)
+            else:
+                fn = lambda: vectorized.aggregate(col_t, "price", op, use_numpy=use_numpy)
+            s = timed(fn, repeat=1)
+            key = "numpy" if use_numpy else "python"
+            row[f"{key}_s"] = round(s, 4)
+            row[f"{key}_speedup"] = round(base / s, 1) if s else None
+        results.append(row)
+    raw = [str(v) for v in range(n)]
+    coerce_loop = lambda: [int(v) for v in raw]
+    row = {"op": "coerce", "rows_loop_s": round(timed(coerce_loop, repeat=1), 3)}
+    for use_numpy in backends:
+        key = "numpy" if use_numpy else "python"
+        row[f"{key}_s"] = round(timed(lambda: vectorized.coerce(col_t._column("id"), raw, use_numpy=use_numpy), repeat=1), 4)
+    results.append(row)
+    report(f"numeric column ops (NumPy {'available' if vectorized.HAS_NUMPY else 'not installed'})", results)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,35 @@
+import argparse
+import os
+import tempfile
+
+from benchmarks._common import report, sample_table, timed
+from models import Database
+from storage import save_to_file
+from wal import WriteAheadLog
+
+
+def run(n: int) -> None:
+    db = Database(name="bench")
+    db.tables["T"] = db.adopt(sample_table(n))
+    path = os.path.join(tempfile.mkdtemp(), "bench.json")
+    full = timed(lambda: save_to_file(db, path), repeat=1)
+    log = WriteAheadLog(db, path)
+    log.checkpoint()
+    t = db.get_table("T")
+
+    def edit_and_save():
+        t.edit_row(n // 2, {"price": 1.5})
+        log.save()
+
+    incremental = timed(edit_and_save, repeat=5)
+    log.close()
+    report("save after a single edit", [
+        {"mode": "full rewrite", "rows": n, "seconds": round(full, 4)},
+        {"mode": "wal commit", "rows": n, "seconds": round(incremental, 6)},
+    ])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    run(ap.parse_args().rows)
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks._common import report, sample_columns, sample_rows, sample_table, skewed_keys, timed
+from models import Column, Database, Table, join_tables
+from storage import load_from_file, save_to_file
+
+# Набір вимірювань основних шляхів (вставка, перевірка значень, з'єднання, to_dict/from_dict,
+# збереження/завантаження) на синтетичних даних заданого розміру. Результати пишуться в JSON,
+# а compare порівнює два запуски й позначає регресії:
+#   python -m benchmarks.suite run --sizes 10k 1m --skew 0 1.2 --out new.json
+#   python -m benchmarks.suite compare base.json new.json --threshold 0.1
+
+Case = Callable[[int, float], Callable[[], Any]]
+CASES: Dict[str, Case] = {}
+# вимірювання, що не залежать від розподілу ключів, на кожному skew не повторюються
+SKEWED = {"join_tables"}
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    # підготовка — у тілі функції, вимірюється лише повернений виклик
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def _text_rows(n: int) -> List[Dict[str, str]]:
+    # значення як із форми чи файлу — рядки, які валідатори перетворюють у тип колонки
+    return [{k: str(v) for k, v in r.items()} for r in sample_rows(n)]
+
+
+@case("add_row")
+def _add_row(n: int, skew: float) -> Callable[[], Any]:
+    data = _text_rows(n)
+
+    def run() -> None:
+        t = Table(name="T", columns=sample_columns())
+        for r in data:
+            t.add_row(r)
+    return run
+
+
+@case("add_rows")
+def _add_rows(n: int, skew: float) -> Callable[[], Any]:
+    data = _text_rows(n)
+    return lambda: Table(name="T", columns=sample_columns()).add_rows(data)
+
+
+@case("Column.validate")
+def _validate(n: int, skew: float) -> Callable[[], Any]:
+    data = _text_rows(n)
+    checks = [(c.validator(), [r[c.name] for r in data]) for c in sample_columns()]
+
+    def run() -> None:
+        for validate, values in checks:
+            for v in values:
+                validate(v)
+    return run
+
+
+@case("join_tables")
+def _join(n: int, skew: float) -> Callable[[], Any]:
+    # n рядків фактів з ключами за Zipf(skew) проти довідника з n/10 унікальних ключів
+    distinct = max(1, n // 10)
+    facts = Table(name="F", columns=sample_columns() + [Column("k", "integer")])
+    facts.rows = [dict(r, k=k) for r, k in zip(sample_rows(n), skewed_keys(n, distinct, skew))]
+    dim = Table(name="D", columns=[Column("k", "integer"), Column("label", "string")])
+    dim.rows = [{"k": k, "label": f"k{k}"} for k in range(distinct)]
+    return lambda: join_tables(facts, dim, "k")
+
+
+def _database(n: int) -> Database:
+    db = Database(name="bench")
+    db.add_table(sample_table(n))
+    return db
+
+
+@case("Database.to_dict")
+def _to_dict(n: int, skew: float) -> Callable[[], Any]:
+    return _database(n).to_dict
+
+
+@case("Database.from_dict")
+def _from_dict(n: int, skew: float) -> Callable[[], Any]:
+    d = json.loads(json.dumps(_database(n).to_dict()))
+    return lambda: Database.from_dict(d)
+
+
+def _storage_case(ext: str, op: str) -> Case:
+    def make(n: int, skew: float) -> Callable[[], Any]:
+        db = _database(n)
+        path = os.path.join(tempfile.mkdtemp(), "bench" + ext)
+        save_to_file(db, path)
+        return (lambda: save_to_file(db, path)) if op == "save" else (lambda: load_from_file(path))
+    return make
+
+
+for _ext, _fmt in ((".json", "json"), (".minidb", "minidb")):
+    case(f"save_to_file {_fmt}")(_storage_case(_ext, "save"))
+    case(f"load_from_file {_fmt}")(_storage_case(_ext, "load"))
+
+
+def _meta(sizes: List[int], skews: List[float], repeat: int) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit or None,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "sizes": sizes, "skews": skews, "repeat": repeat}
+
+
+def run(sizes: List[int], skews: List[float], repeat: int = 3, cases: Optional[List[str]] = None,
+        out: Optional[str] = None) -> Dict[str, Any]:
+    names = cases or list(CASES)
+    for name in names:
+        if name not in CASES:
+            raise ValueError(f"Unknown benchmark case: {name} (expected one of {', '.join(CASES)})")
+    results = []
+    for n in sizes:
+        for name in names:
+            for skew in (skews if name in SKEWED else [0.0]):
+                seconds = timed(CASES[name](n, skew), repeat=repeat)
+                results.append({"case": name, "rows": n, "skew": skew, "s": round(seconds, 6),
+                                "rows_per_s": round(n / seconds) if seconds else None})
+    doc = {"meta": _meta(sizes, skews, repeat), "results": results}
+    report("benchmark suite", results)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    return doc
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1,
+            min_delta: float = 0.001) -> List[Dict[str, Any]]:
+    # ratio = новий час / базовий; більше за 1 + threshold — регресія, менше за 1 - threshold —
+    # прискорення. Різниця, менша за min_delta секунд, вважається шумом таймера
+    key = lambda r: (r["case"], r["rows"], r.get("skew", 0.0))
+    old = {key(r): r for r in base["results"]}
+    out = []
+    for r in new["results"]:
+        b = old.pop(key(r), None)
+        row = {"case": r["case"], "rows": r["rows"], "skew": r.get("skew", 0.0), "base_s": None, "new_s": r["s"]}
+        if b is None:
+            row["status"] = "new"
+        else:
+            ratio = r["s"] / b["s"] if b["s"] else float("inf")
+            row.update(base_s=b["s"], ratio=round(ratio, 3))
+            if abs(r["s"] - b["s"]) < min_delta:
+                row["status"] = "ok"
+            else:
+                row["status"] = ("regression" if ratio > 1 + threshold else
+                                 "faster" if ratio < 1 - threshold else "ok")
+        out.append(row)
+    out.extend({"case": c, "rows": n, "skew": s, "base_s": r["s"], "new_s": None, "status": "missing"}
+               for (c, n, s), r in old.items())
+    return out
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    try:
+        return int(float(text[:-1] if mult > 1 else text) * mult)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' is not a row count (e.g. 10000, 10k, 1m)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    sub = ap.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="run the suite and write results to JSON")
+    r.add_argument("--sizes", type=parse_size, nargs="+", default=[10_000, 1_000_000],
+                   help="row counts, e.g. 10k 1m 10m")
+    r.add_argument("--skew", type=float, nargs="+", default=[0.0, 1.2], help="Zipf exponents for join keys")
+    r.add_argument("--repeat", type=int, default=3, help="best of N timings")
+    r.add_argument("--cases", nargs="+", choices=list(CASES), help="subset of cases")
+    r.add_argument("--out", help="results file (JSON)")
+    c = sub.add_parser("compare", help="compare two result files; exit status 1 on regressions")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 = 10%%")
+    c.add_argument("--min-delta", type=float, default=0.001, help="ignore differences below this many seconds")
+    args = ap.parse_args(argv)
+    if args.command == "run":
+        run(args.sizes, args.skew, args.repeat, args.cases, args.out)
+        return 0
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold, args.min_delta)
+    report(f"{args.new} vs {args.base} (threshold {args.threshold:.0%})", rows)
+    return 1 if any(r["status"] == "regression" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+import profiling
+from columnar import ColumnStore, build_buffer, dict_buffer, numeric_buffer
+from models import Column, Database, Table
+
+# Бінарний формат .minidb:
+#   заголовок (32 байти): magic, версія, прапорці, зміщення і довжина каталогу
+#   сегменти колонок, вирівняні на 8 байт: int64/float64 дані, int32 коди словника,
+#   бітові маски NULL, словники у вигляді JSON-списків
+#   каталог (JSON) у кінці файлу: схема таблиць і зміщення сегментів
+# Цілі та дійсні колонки читаються через mmap + memoryview без копіювання.
+
+EXTENSION = ".minidb"
+MAGIC = b"MINIDB\x00\x00"
+VERSION = 1
+FLAG_LITTLE_ENDIAN = 1
+_HEADER = struct.Struct("<8sHHIQQ")
+
+
+def is_binary_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == EXTENSION
+
+
+def save(db: Database, path: str, progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
+    # progress(колонок записано, усього колонок)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(b"\x00" * _HEADER.size)
+            tables = list(db.tables.values())
+            total = sum(len(t.columns) for t in tables)
+            done = 0
+            entries = []
+            for t in tables:
+                with profiling.span("binstore.serialize", t.row_count()):
+                    entries.append(_write_table(t, f))
+                done += len(t.columns)
+                if progress is not None:
+                    progress(done, total)
+            catalog = {"name": db.name, "lsn": db.lsn, "tables": entries}
+            raw = json.dumps(catalog, ensure_ascii=False).encode("utf-8")
+            offset = f.tell()
+            f.write(raw)
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, VERSION, FLAG_LITTLE_ENDIAN, 0, offset, len(raw)))
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+
+def _segment(f: BinaryIO, data: Any) -> Tuple[int, int]:
+    pad = -f.tell() % 8
+    if pad:
+        f.write(b"\x00" * pad)
+    offset = f.tell()
+    if isinstance(data, array) and sys.byteorder != "little":
+        data = array(data.typecode, data)
+        data.byteswap()
+    f.write(data)
+    return offset, f.tell() - offset
+
+
+def _column_buffer(t: Table, col: Column):
+    if isinstance(t.rows, ColumnStore):
+        return t.rows.buffers[col.name]
+    try:
+        return build_buffer(col, t._column_values(col.name))
+    except (OverflowError, TypeError):
+        # значення не влазять у int64/float64 — зберігаємо через словник
+        return build_buffer(Column(col.name, "string"), t._column_values(col.name))
+
+
+def _write_table(t: Table, f: BinaryIO) -> Dict[str, Any]:
+    segments: Dict[str, Any] = {}
+    for col in t.columns:
+        b = _column_buffer(t, col)
+        seg: Dict[str, Any] = {"nulls": _segment(f, bytes(b.nulls.bits))}
+        if hasattr(b, "typecode"):
+            seg["encoding"] = b.typecode
+            seg["data"] = _segment(f, b.data)
+        else:
+            seg["encoding"] = "dict"
+            seg["codes"] = _segment(f, b.codes)
+            seg["dictionary"] = _segment(f, json.dumps(b.dictionary, ensure_ascii=False).encode("utf-8"))
+        segments[col.name] = seg
+    d = t.schema_dict()
+    d["size"] = t.row_count()
+    d["segments"] = segments
+    return d
+
+
+def _open(path: str) -> Tuple[memoryview, Dict[str, Any]]:
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    mv = memoryview(mm)
+    if len(mv) < _HEADER.size:
+        raise ValueError(f"'{path}' is not a {EXTENSION} file")
+    magic, version, flags, _, offset, length = _HEADER.unpack_from(mv)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a {EXTENSION} file")
+    if version > VERSION:
+        raise ValueError(f"Unsupported {EXTENSION} version {version}")
+    return mv, json.loads(bytes(mv[offset:offset + length]))
+
+
+def _typed(mv: memoryview, seg: Tuple[int, int], typecode: str) -> Any:
+    off, length = seg
+    view = mv[off:off + length].cast(typecode)
+    if sys.byteorder == "little":
+        return view
+    a = array(typecode)
+    a.frombytes(mv[off:off + length])
+    a.byteswap()
+    return a
+
+
+def _read_table(mv: memoryview, d: Dict[str, Any]) -> Table:
+    t = Table(name=d["name"], columns=[Column(**c) for c in d["columns"]])
+    size = d["size"]
+    store = ColumnStore([])
+    for col in t.columns:
+        seg = d["segments"][col.name]
+        off, length = seg["nulls"]
+        null_bits = mv[off:off + length]
+        if seg["encoding"] == "dict":
+            off, length = seg["dictionary"]
+            dictionary = json.loads(bytes(mv[off:off + length]))
+            store.buffers[col.name] = dict_buffer(_typed(mv, seg["codes"], "i"), dictionary, null_bits, size)
+        else:
+            store.buffers[col.name] = numeric_buffer(seg["encoding"], _typed(mv, seg["data"], seg["encoding"]), null_bits, size)
+    store.size = size
+    t.rows = store
+    for name, kind in d.get("indexes", {}).items():
+        t.create_index(name, kind)
+    return t
+
+
+def load(path: str) -> Database:
+    mv, catalog = _open(path)
+    db = Database(name=catalog["name"], lsn=catalog.get("lsn", 0))
+    for d in catalog["tables"]:
+        with profiling.span("binstore.map", d["size"]):
+            db.tables[d["name"]] = db.adopt(_read_table(mv, d))
+    return db
+
+
+def read_column(path: str, table: str, column: str) -> Tuple[Any, memoryview]:
+    # (значення, бітова маска NULL); для int64/float64 значення — memoryview над файлом,
+    # NULL-позиції в ньому містять 0
+    mv, catalog = _open(path)
+    for d in catalog["tables"]:
+        if d["name"] != table:
+            continue
+        seg = d["segments"].get(column)
+        if seg is None:
+            raise ValueError(f"No such column '{column}'")
+        off, length = seg["nulls"]
+        null_bits = mv[off:off + length]
+        if seg["encoding"] == "dict":
+            off, length = seg["dictionary"]
+            b = dict_buffer(_typed(mv, seg["codes"], "i"), json.loads(bytes(mv[off:off + length])), null_bits, d["size"])
+            return list(b.values()), null_bits
+        return _typed(mv, seg["data"], seg["encoding"]), null_bits
+    raise ValueError(f"No such table '{table}'")
@@ -0,0 +1,284 @@
+import csv
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from models import EMAIL_RE, Column, Database, Table
+from storage import Progress
+
+# Потокові імпорт і експорт CSV та NDJSON (один JSON-об'єкт на рядок). Імпорт читає
+# файл пачками по chunk_size записів — у пам'яті лише кілька пачок, — перевіряє їх
+# валідаторами колонок (за workers > 0 — у пулі процесів) і додає add_rows; записи,
+# що не пройшли перевірку, разом із номером рядка файлу і помилкою пишуться у файл
+# відхилених (NDJSON). Схема нової таблиці виводиться з перших sample записів.
+
+FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 10000
+SAMPLE_SIZE = 1000
+# поле джерела -> (назва колонки, схема колонки) — передається в процеси-перевіряльники
+Spec = List[Tuple[str, str, Dict[str, Any]]]
+Record = Tuple[int, Any]  # (номер рядка у файлі, сирий запис)
+Source = Tuple[str, List[str], str]  # (формат, заголовок CSV, значення NULL)
+
+
+@dataclass
+class ImportReport:
+    table: str
+    rows: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def file_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(ext)
+        if fmt is None:
+            raise ValueError(f"Cannot tell the format of '{path}' (expected .csv, .ndjson or .jsonl)")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+# --- читання ----------------------------------------------------------------------
+# Файл лише ділиться на записи (рядок NDJSON або список полів CSV); розбір у dict і
+# перевірка відбуваються в _validate_chunk, тобто в процесах пулу, якщо він є.
+
+def _csv_records(f: TextIO) -> Iterator[Record]:
+    reader = csv.reader(f)
+    for values in reader:
+        if values:
+            yield reader.line_num, values
+
+
+def _ndjson_records(f: TextIO) -> Iterator[Record]:
+    for lineno, line in enumerate(f, 1):
+        if line.strip():
+            yield lineno, line
+
+
+def _parse(source: Source, raw: Any) -> Any:
+    # dict запису або рядок з описом помилки
+    fmt, header, null = source
+    if fmt == "csv":
+        if len(raw) != len(header):
+            return f"expected {len(header)} fields, got {len(raw)}"
+        return {k: (None if v == null else v) for k, v in zip(header, raw)}
+    try:
+        rec = json.loads(raw)
+    except ValueError as e:
+        return f"invalid JSON: {e}"
+    return rec if isinstance(rec, dict) else "expected a JSON object"
+
+
+def infer_dtype(values: Sequence[Any]) -> str:
+    # найвужчий тип, якому відповідають усі непорожні значення вибірки
+    values = [v for v in values if v is not None]
+    if not values:
+        return "string"
+    for dtype, test in (("integer", _is_integer), ("real", _is_real), ("email", _is_email)):
+        if all(map(test, values)):
+            return dtype
+    return "string"
+
+
+def _is_integer(v: Any) -> bool:
+    if isinstance(v, bool) or isinstance(v, float):
+        return False
+    try:
+        int(v)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_real(v: Any) -> bool:
+    if isinstance(v, bool):
+        return False
+    try:
+        float(v)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_email(v: Any) -> bool:
+    return isinstance(v, str) and EMAIL_RE.match(v) is not None
+
+
+def infer_columns(records: Sequence[Dict[str, Any]], dtypes: Optional[Dict[str, str]] = None,
+                  names: Sequence[str] = ()) -> List[Column]:
+    # names — відомі наперед поля (заголовок CSV): колонка без значень у вибірці має тип string
+    fields: Dict[str, None] = dict.fromkeys(names)
+    for rec in records:
+        fields.update(dict.fromkeys(rec))
+    dtypes = dtypes or {}
+    return [Column(n, dtypes.get(n) or infer_dtype([r.get(n) for r in records])) for n in fields]
+
+
+# --- перевірка пачки (виконується і в процесах пулу) -----------------------------------
+
+def _validate_chunk(source: Source, spec: Spec,
+                    chunk: List[Record]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Any, str]]]:
+    rejects: List[Tuple[int, Any, str]] = []
+    good: List[Record] = []
+    for lineno, raw in chunk:
+        rec = _parse(source, raw)
+        if rec.__class__ is str:
+            rejects.append((lineno, raw, rec))
+        elif spec and not any(src in rec for src, _, _ in spec):
+            rejects.append((lineno, raw, "no fields match the table columns"))
+        else:
+            good.append((lineno, rec))
+    bad: Dict[int, str] = {}
+    columns = []
+    for source, _, schema in spec:
+        col = Column(**schema)
+        raw = [rec.get(source) for _, rec in good]
+        try:
+            columns.append(col.batch_validator()(raw))
+            continue
+        except Exception:
+            pass
+        validate = col.validator()
+        out = []
+        for i, v in enumerate(raw):
+            try:
+                out.append(validate(v))
+            except ValueError as e:
+                bad.setdefault(i, f"{col.name}: {e}")
+                out.append(None)
+        columns.append(out)
+    names = [name for _, name, _ in spec]
+    rows = [dict(zip(names, vals)) for vals in zip(*columns)] if columns else [{} for _ in good]
+    if bad:
+        rows = [r for i, r in enumerate(rows) if i not in bad]
+        rejects.extend((good[i][0], good[i][1], msg) for i, msg in sorted(bad.items()))
+        rejects.sort(key=lambda r: r[0])
+    return rows, rejects
+
+
+def _validated(source: Source, spec: Spec, chunks: Iterator[List[Record]], workers: int):
+    if workers <= 0:
+        for chunk in chunks:
+            yield _validate_chunk(source, spec, chunk)
+        return
+    # не більше 2*workers пачок у польоті: пам'ять не залежить від розміру файлу
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: "deque[Future]" = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_validate_chunk, source, spec, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def import_file(db: Database, path: str, table: Optional[str] = None, fmt: Optional[str] = None,
+                columns: Optional[Dict[str, str]] = None, dtypes: Optional[Dict[str, str]] = None,
+                rejects: Optional[str] = None, chunk_size: int = CHUNK_SIZE, sample: int = SAMPLE_SIZE,
+                workers: int = 0, null: str = "", progress: Optional[Progress] = None) -> ImportReport:
+    # columns: поле файлу -> назва колонки (інші поля пропускаються); dtypes: типи колонок
+    # нової таблиці замість виведених. Наявна таблиця доповнюється за її власною схемою.
+    fmt = file_format(path, fmt)
+    name = table or os.path.splitext(os.path.basename(path))[0]
+    report = ImportReport(table=name)
+    started = time.perf_counter()
+    total = os.path.getsize(path)
+    with open(path, "rb") as raw:
+        f = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        records = _csv_records(f) if fmt == "csv" else _ndjson_records(f)
+        header = next(records, (0, []))[1] if fmt == "csv" else []
+        source: Source = (fmt, header, null)
+        head = list(islice(records, sample))
+        t = db.tables.get(name)
+        new = t is None
+        if new:
+            parsed = (_parse(source, raw) for _, raw in head)
+            sample_rows = [rec for rec in parsed if isinstance(rec, dict)]
+            fields = header
+            if columns:
+                sample_rows = [{columns[k]: v for k, v in rec.items() if k in columns} for rec in sample_rows]
+                fields = [columns[k] for k in header if k in columns]
+            t = Table(name=name, columns=infer_columns(sample_rows, dtypes, fields))
+        by_name = {c.name: c for c in t.columns}
+        mapping = columns or {c.name: c.name for c in t.columns}
+        spec = [(src, dst, by_name[dst].schema()) for src, dst in mapping.items()
+                if dst in by_name and (fmt != "csv" or src in header)]
+        if not spec:
+            raise ValueError(f"No fields of '{path}' match columns of table '{name}'")
+        # нова таблиця з'являється в базі лише з придатною схемою
+        if new:
+            t = db.add_table(t)
+        it = chain(head, records)
+        chunks = iter(lambda: list(islice(it, chunk_size)), [])
+        out = open(rejects, "w", encoding="utf-8") if rejects else None
+        try:
+            for rows, bad in _validated(source, spec, chunks, workers):
+                errors = t.add_rows(rows)
+                report.rows += len(rows) - len(errors)
+                report.rejected += len(bad) + len(errors)
+                if out is not None:
+                    for lineno, rec, msg in bad:
+                        out.write(json.dumps({"line": lineno, "error": msg, "record": rec}, ensure_ascii=False) + "\n")
+                    for i, msg in errors:
+                        out.write(json.dumps({"line": None, "error": msg, "record": rows[i]}, ensure_ascii=False) + "\n")
+                if progress is not None:
+                    progress(raw.tell(), total)
+        finally:
+            if out is not None:
+                out.close()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# --- запис ------------------------------------------------------------------------
+
+def export_file(table: Table, path: str, fmt: Optional[str] = None, columns: Optional[List[str]] = None,
+                null: str = "", progress: Optional[Progress] = None) -> int:
+    # значення йдуть кортежами з колонок (_column_values), без проміжних dict рядків;
+    # файл пишеться поруч і підміняється лише після успіху
+    fmt = file_format(path, fmt)
+    names = columns or table.column_names()
+    if not names:
+        raise ValueError(f"Table '{table.name}' has no columns to export")
+    for n in names:
+        table._column(n)
+    total = table.row_count()
+    values = zip(*(table._column_values(n) for n in names))
+    tmp = path + ".tmp"
+    done = 0
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                w = csv.writer(f)
+                w.writerow(names)
+                write = lambda rows: w.writerows(tuple(null if v is None else v for v in r) for r in rows)
+            else:
+                enc = json.JSONEncoder(ensure_ascii=False).encode
+                keys = ["{" + enc(names[0]) + ": "] + [", " + enc(n) + ": " for n in names[1:]]
+                write = lambda rows: f.write("".join(
+                    "".join(k + enc(v) for k, v in zip(keys, r)) + "}\n" for r in rows))
+            while True:
+                rows = list(islice(values, CHUNK_SIZE))
+                if not rows:
+                    break
+                write(rows)
+                done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+    return done
@@ -0,0 +1,111 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from models import Table
+from rowstore import TupleStore
+
+# LRU-кеш результатів операцій (з'єднання, запити). Ключ — назва операції, аргументи і
+# Table.state() усіх вхідних таблиць: будь-яка зміна таблиці дає новий стан, тож старі
+# записи більше не знаходяться і витісняються як найдавніші. Знімок таблиці (транзакція,
+# HTTP-сервер) має той самий стан, що й таблиця, з якої його взято, і бачить її записи.
+# Розмір обмежено приблизною кількістю байтів; результат-таблиця віддається знімком
+# (copy-on-write), список рядків — копіями dict, тож зміни в отриманому не псують кеш.
+
+DEFAULT_MAX_BYTES = 64 * 2**20
+_SIZE_SAMPLE = 64
+
+
+def estimate_size(value: Any) -> int:
+    # рядки оцінюються за вибіркою: розмір рядка (dict чи кортежу) і значень, помножений на кількість
+    rows = value.rows if isinstance(value, Table) else value
+    if isinstance(rows, TupleStore):
+        rows = rows.rows
+    if isinstance(rows, list) and rows and isinstance(rows[0], (dict, tuple)):
+        step = max(1, len(rows) // _SIZE_SAMPLE)
+        sample = rows[::step][:_SIZE_SAMPLE]
+        per_row = sum(sys.getsizeof(r) + sum(map(sys.getsizeof, r.values() if isinstance(r, dict) else r))
+                      for r in sample) / len(sample)
+        return int(per_row * len(rows)) + sys.getsizeof(rows)
+    if isinstance(rows, list):
+        return sys.getsizeof(rows) + sum(map(sys.getsizeof, rows))
+    return sys.getsizeof(rows)
+
+
+def _share(value: Any) -> Any:
+    if isinstance(value, Table):
+        return value.snapshot()
+    if isinstance(value, list):
+        return [dict(r) if isinstance(r, dict) else r for r in value]
+    return value
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(op: str, tables: Sequence[Table], args: Tuple[Any, ...]) -> Hashable:
+        return (op, tuple(t.state() for t in tables), args)
+
+    def get(self, op: str, tables: Sequence[Table], args: Tuple[Any, ...] = ()) -> Optional[Any]:
+        key = self.key(op, tables, args)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return _share(entry[0])
+
+    def put(self, op: str, tables: Sequence[Table], args: Tuple[Any, ...], value: Any,
+            states: Optional[Hashable] = None) -> None:
+        # states — стан таблиць на початку обчислення; якщо таблиця змінилась під час нього,
+        # результат не відповідає жодному стану і не зберігається
+        key = self.key(op, tables, args)
+        if states is not None and key != states:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if isinstance(value, Table):
+            value = value.snapshot()
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, dropped) = self.entries.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
+
+    def get_or_compute(self, op: str, tables: Sequence[Table], args: Tuple[Any, ...],
+                       compute: Callable[[], Any]) -> Any:
+        hit = self.get(op, tables, args)
+        if hit is not None:
+            return hit
+        states = self.key(op, tables, args)
+        value = compute()
+        self.put(op, tables, args, value, states)
+        return _share(value) if isinstance(value, list) else value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None}
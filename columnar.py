@@ -0,0 +1,361 @@
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from models import Column, Table
+
+# Колонкове сховище рядків для Table: один типізований буфер на колонку
+# і бітова маска NULL. Рядки віддаються як нові dict, тому зміни
+# повертати через Table.edit_row, а не через мутацію отриманого dict.
+
+NUMERIC_TYPECODES = {"integer": "q", "real": "d"}
+
+
+def _raw(data: Any) -> memoryview:
+    return memoryview(data).cast("B")
+
+
+class _NullMask:
+    __slots__ = ("bits", "size")
+
+    def __init__(self, size: int = 0, fill: bool = False):
+        self.bits = bytearray((b"\xff" if fill else b"\x00") * ((size + 7) // 8))
+        if fill and size & 7:
+            # біти за межею size лишаються нульовими: на них потраплять наступні append
+            self.bits[-1] = (1 << (size & 7)) - 1
+        self.size = size
+
+    def append(self, is_null: bool) -> None:
+        if self.size % 8 == 0:
+            self.bits.append(0)
+        self.set(self.size, is_null)
+        self.size += 1
+
+    def get(self, i: int) -> bool:
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def set(self, i: int, is_null: bool) -> None:
+        if is_null:
+            self.bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def pop(self, i: int) -> None:
+        n = int.from_bytes(self.bits, "little") & ((1 << self.size) - 1)
+        n = (n & ((1 << i) - 1)) | ((n >> (i + 1)) << i)
+        self.size -= 1
+        self.bits = bytearray(n.to_bytes((self.size + 7) // 8, "little"))
+
+    def any(self) -> bool:
+        return any(self.bits)
+
+    def positions(self) -> List[int]:
+        # позиції NULL; нульові байти пропускаються цілком
+        out = []
+        for j, byte in enumerate(self.bits):
+            if byte:
+                base = j << 3
+                out.extend(base + k for k in range(8) if byte >> k & 1)
+        return [i for i in out if i < self.size]
+
+    def copy(self) -> "_NullMask":
+        m = _NullMask()
+        m.bits = bytearray(self.bits)
+        m.size = self.size
+        return m
+
+
+class _NumericBuffer:
+    # data може бути memoryview над mmap (read-only, без копіювання);
+    # перша зміна перетворює його на власний array
+    __slots__ = ("typecode", "data", "nulls")
+
+    def __init__(self, typecode: str, size: int = 0):
+        self.typecode = typecode
+        self.data = array(typecode, bytes(array(typecode).itemsize * size))
+        self.nulls = _NullMask(size, fill=True)
+
+    def _own(self) -> array:
+        if not isinstance(self.data, array):
+            a = array(self.typecode)
+            a.frombytes(_raw(self.data))
+            self.data = a
+        return self.data
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self._own().append(0)
+            self.nulls.append(True)
+        else:
+            self._own().append(value)
+            self.nulls.append(False)
+
+    def get(self, i: int) -> Any:
+        return None if self.nulls.get(i) else self.data[i]
+
+    def set(self, i: int, value: Any) -> None:
+        if value is None:
+            self._own()[i] = 0
+            self.nulls.set(i, True)
+        else:
+            self._own()[i] = value
+            self.nulls.set(i, False)
+
+    def pop(self, i: int) -> None:
+        self._own().pop(i)
+        self.nulls.pop(i)
+
+    def values(self) -> Iterator[Any]:
+        if not self.nulls.any():
+            return iter(self.data)
+        get = self.nulls.get
+        return (None if get(i) else v for i, v in enumerate(self.data))
+
+    def copy(self) -> "_NumericBuffer":
+        b = _NumericBuffer.__new__(_NumericBuffer)
+        b.typecode = self.typecode
+        b.data = array(self.typecode)
+        b.data.frombytes(_raw(self.data))
+        b.nulls = self.nulls.copy()
+        return b
+
+
+class _DictBuffer:
+    __slots__ = ("codes", "nulls", "dictionary", "lookup")
+
+    def __init__(self, size: int = 0):
+        self.codes = array("i", bytes(4 * size))
+        self.nulls = _NullMask(size, fill=True)
+        self.dictionary: List[Any] = []
+        self.lookup: Dict[Any, int] = {}
+
+    def _own(self) -> array:
+        if not isinstance(self.codes, array):
+            a = array("i")
+            a.frombytes(_raw(self.codes))
+            self.codes = a
+        return self.codes
+
+    def encode(self, value: Any) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.dictionary)
+            self.dictionary.append(value)
+            self.lookup[value] = code
+        return code
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self._own().append(0)
+            self.nulls.append(True)
+        else:
+            self._own().append(self.encode(value))
+            self.nulls.append(False)
+
+    def get(self, i: int) -> Any:
+        return None if self.nulls.get(i) else self.dictionary[self.codes[i]]
+
+    def set(self, i: int, value: Any) -> None:
+        if value is None:
+            self._own()[i] = 0
+            self.nulls.set(i, True)
+        else:
+            self._own()[i] = self.encode(value)
+            self.nulls.set(i, False)
+
+    def pop(self, i: int) -> None:
+        self._own().pop(i)
+        self.nulls.pop(i)
+
+    def values(self) -> Iterator[Any]:
+        d = self.dictionary
+        if not self.nulls.any():
+            return (d[c] for c in self.codes)
+        get = self.nulls.get
+        return (None if get(i) else d[c] for i, c in enumerate(self.codes))
+
+    def keys(self) -> List[int]:
+        # коди рядків як список int, NULL -> -1 (ключ групування без декодування рядків)
+        keys = self.codes.tolist()
+        if self.nulls.any():
+            for i in self.nulls.positions():
+                keys[i] = -1
+        return keys
+
+    def decode(self, code: int) -> Any:
+        return None if code < 0 else self.dictionary[code]
+
+    def matching(self, test: Callable[[Any], bool]) -> List[int]:
+        # позиції рядків, значення яких проходить test; test рахується один раз на
+        # елемент словника, а рядки порівнюються за кодами. NULL не проходить
+        wanted = [c for c, v in enumerate(self.dictionary) if test(v)]
+        if not wanted:
+            return []
+        if len(wanted) == len(self.dictionary):
+            hits = list(range(self.nulls.size))
+        elif len(wanted) == 1:
+            code = wanted[0]
+            hits = [i for i, c in enumerate(self.codes) if c == code]
+        else:
+            codes = frozenset(wanted)
+            hits = [i for i, c in enumerate(self.codes) if c in codes]
+        if wanted[0] == 0 and self.nulls.any():
+            # NULL зберігається з кодом 0
+            nulls = set(self.nulls.positions())
+            hits = [i for i in hits if i not in nulls]
+        return hits
+
+    def copy(self) -> "_DictBuffer":
+        b = _DictBuffer.__new__(_DictBuffer)
+        b.codes = array("i")
+        b.codes.frombytes(_raw(self.codes))
+        b.nulls = self.nulls.copy()
+        b.dictionary = list(self.dictionary)
+        b.lookup = dict(self.lookup)
+        return b
+
+
+def _make_buffer(column: Column, size: int = 0):
+    code = NUMERIC_TYPECODES.get(column.dtype)
+    if code:
+        return _NumericBuffer(code, size)
+    return _DictBuffer(size)
+
+
+def build_buffer(column: Column, values: Iterable[Any]):
+    b = _make_buffer(column)
+    for v in values:
+        b.append(v)
+    return b
+
+
+def numeric_buffer(typecode: str, data: Any, null_bits: bytes, size: int) -> _NumericBuffer:
+    b = _NumericBuffer.__new__(_NumericBuffer)
+    b.typecode = typecode
+    b.data = data
+    b.nulls = _NullMask()
+    b.nulls.bits = bytearray(null_bits)
+    b.nulls.size = size
+    return b
+
+
+def dict_buffer(codes: Any, dictionary: List[Any], null_bits: bytes, size: int) -> _DictBuffer:
+    b = _DictBuffer.__new__(_DictBuffer)
+    b.codes = codes
+    b.dictionary = dictionary
+    b.lookup = {v: i for i, v in enumerate(dictionary)}
+    b.nulls = _NullMask()
+    b.nulls.bits = bytearray(null_bits)
+    b.nulls.size = size
+    return b
+
+
+class ColumnStore:
+    def __init__(self, columns: List[Column]):
+        self.buffers: Dict[str, Any] = {c.name: _make_buffer(c) for c in columns}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self.size
+        if not (0 <= index < self.size):
+            raise IndexError("Row index out of range")
+        return index
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        i = self._index(index)
+        return {name: b.get(i) for name, b in self.buffers.items()}
+
+    def __setitem__(self, index: int, row: Dict[str, Any]) -> None:
+        i = self._index(index)
+        done = []
+        try:
+            for name, b in self.buffers.items():
+                old = b.get(i)
+                b.set(i, row.get(name))
+                done.append((b, old))
+        except OverflowError:
+            # рядок змінюється цілком або ніяк, як і в append
+            for b, old in done:
+                b.set(i, old)
+            raise ValueError(f"'{row.get(name)}' is out of range for column '{name}'")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.buffers)
+        for values in zip(*(b.values() for b in self.buffers.values())):
+            yield dict(zip(names, values))
+
+    def append(self, row: Dict[str, Any]) -> None:
+        done = []
+        try:
+            for name, b in self.buffers.items():
+                b.append(row.get(name))
+                done.append(b)
+        except OverflowError:
+            for b in done:
+                b.pop(self.size)
+            raise ValueError(f"'{row.get(name)}' is out of range for column '{name}'")
+        self.size += 1
+
+    def extend(self, rows) -> None:
+        for r in rows:
+            self.append(r)
+
+    def pop(self, index: int = -1) -> Dict[str, Any]:
+        i = self._index(index)
+        row = self[i]
+        for b in self.buffers.values():
+            b.pop(i)
+        self.size -= 1
+        return row
+
+    def copy(self) -> "ColumnStore":
+        s = ColumnStore([])
+        s.buffers = {name: b.copy() for name, b in self.buffers.items()}
+        s.size = self.size
+        return s
+
+    def add_column(self, column: Column, default: Any = None) -> None:
+        b = _make_buffer(column, self.size)
+        if default is not None:
+            # заповнення на рівні C: масив повторень і маска без NULL
+            if isinstance(b, _NumericBuffer):
+                b.data = array(b.typecode, [default]) * self.size
+            else:
+                b.codes = array("i", [b.encode(default)]) * self.size
+            b.nulls = _NullMask(self.size)
+        self.buffers[column.name] = b
+
+    def drop_column(self, name: str) -> None:
+        self.buffers.pop(name, None)
+
+    def replace_column(self, column: Column, values: Iterable[Any]) -> None:
+        self.buffers[column.name] = build_buffer(column, values)
+
+    def column_values(self, name: str) -> Iterator[Any]:
+        if name not in self.buffers:
+            raise ValueError(f"No such column '{name}'")
+        return self.buffers[name].values()
+
+
+def make_columnar(table: Table) -> Table:
+    if isinstance(table.rows, ColumnStore):
+        return table
+    with table._lock:
+        # надгробки прибираються заздалегідь, щоб слоти в індексах збіглися з позиціями стовпців
+        table._purge()
+        store = ColumnStore(table.columns)
+        store.extend(table.iter_rows())
+        table.rows = store
+        table._pending.clear()
+        table._dropped.clear()
+    return table
+
+
+def make_row_based(table: Table) -> Table:
+    # назад до рядків-dict з будь-якого сховища (ColumnStore, rowstore.TupleStore)
+    if not isinstance(table.rows, list):
+        table.rows = list(table.rows)
+    return table
@@ -1,7 +1,156 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, filedialog, ttk
+import bulk
+import json
+import profiling
+from cache import ResultCache
 from models import Database, Table, Column, join_tables
-from storage import save_to_file, load_from_file
+from storage import LazyTables, load_from_file
+from tasks import TaskRunner
+from wal import WriteAheadLog
+
+class VirtualGrid(tk.Frame):
+    # Treeview тримає лише видиме вікно рядків (слоти "0".."N-1"); прокрутка змінює offset
+    # і переписує значення слотів, тож вартість не залежить від розміру таблиці
+    def __init__(self, master, **kw):
+        super().__init__(master, **kw)
+        self.tree = ttk.Treeview(self, show="headings", selectmode="browse")
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="left", fill="y")
+        self.table: Table | None = None
+        self.names: list[str] = []
+        self.offset = 0
+        self.visible = 20
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._step(-1))
+        self.tree.bind("<Down>", lambda e: self._step(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(1, "pages"))
+
+    def _total(self) -> int:
+        return self.table.row_count() if self.table is not None else 0
+
+    def set_table(self, table: Table | None) -> None:
+        self.table = table
+        self.names = table.column_names() if table is not None else []
+        self.tree["columns"] = tuple(self.names)
+        for col in self.names:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=120, stretch=True)
+        self.tree.delete(*self.tree.get_children())
+        self.offset = 0
+        self.render()
+
+    def _on_resize(self, event) -> None:
+        rowheight = ttk.Style(self).lookup("Treeview", "rowheight") or 20
+        visible = max(1, (event.height - 24) // int(rowheight))
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _slot_values(self, pos: int) -> list:
+        r = self.table.row(pos)
+        return [r.get(c) for c in self.names]
+
+    def render(self, start: int | None = None, stop: int | None = None) -> None:
+        # перемальовує позиції [start, stop) у межах вікна; без аргументів — усе вікно
+        total = self._total()
+        offset = max(0, min(self.offset, total - self.visible))
+        if offset != self.offset:
+            self.offset, start, stop = offset, None, None
+        count = min(self.visible, total - offset)
+        existing = len(self.tree.get_children())
+        for slot in range(count, existing):
+            self.tree.delete(str(slot))
+        for slot in range(existing, count):
+            self.tree.insert("", "end", iid=str(slot), values=self._slot_values(offset + slot))
+        first = 0 if start is None else max(0, start - offset)
+        last = count if stop is None else stop - offset
+        for slot in range(first, min(last, existing, count)):
+            self.tree.item(str(slot), values=self._slot_values(offset + slot))
+        if total:
+            self.scroll.set(offset / total, (offset + count) / total)
+        else:
+            self.scroll.set(0, 1)
+
+    def _on_scrollbar(self, action, value, unit=None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._total()))
+        else:
+            self.scroll_by(int(value), unit)
+
+    def scroll_by(self, n: int, unit: str = "units") -> None:
+        step = max(1, self.visible - 1) if unit == "pages" else 3
+        self.scroll_to(self.offset + n * step)
+
+    def scroll_to(self, offset: int) -> None:
+        rid = self.selected_id()
+        self.offset = offset
+        self.render()
+        self.select_id(rid)
+
+    def _step(self, delta: int):
+        # стрілки біля краю вікна прокручують на один рядок
+        pos = self.selected_index()
+        if pos is None:
+            return None
+        pos += delta
+        if not (0 <= pos < self._total()):
+            return "break"
+        if not (self.offset <= pos < self.offset + self.visible):
+            self.offset += delta
+            self.render()
+        self._select(pos)
+        return "break"
+
+    def _select(self, pos: int | None) -> None:
+        self.tree.selection_set(())
+        if pos is not None and self.offset <= pos < self.offset + self.visible and self.tree.exists(str(pos - self.offset)):
+            iid = str(pos - self.offset)
+            self.tree.selection_set(iid)
+            self.tree.focus(iid)
+
+    def selected_index(self) -> int | None:
+        sel = self.tree.selection()
+        return self.offset + int(sel[0]) if sel else None
+
+    def selected_id(self) -> int | None:
+        # id рядка не змінюється, коли інші рядки видаляють (зокрема у фоновій задачі)
+        pos = self.selected_index()
+        return self.table.row_id(pos) if pos is not None and pos < self._total() else None
+
+    def select_id(self, rid: int | None) -> None:
+        try:
+            pos = self.table.position(rid) if rid is not None else None
+        except ValueError:
+            pos = None
+        self._select(pos)
+
+    # точкові оновлення після операцій над рядками
+
+    def row_added(self, pos: int) -> None:
+        # новий рядок показуємо, прокрутивши вікно до нього, якщо треба
+        offset = max(self.offset, pos - self.visible + 1)
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        else:
+            self.render(pos, pos + 1)
+        self._select(pos)
+
+    def row_changed(self, pos: int) -> None:
+        if self.offset <= pos < self.offset + self.visible:
+            self.tree.item(str(pos - self.offset), values=self._slot_values(pos))
+
+    def row_deleted(self, pos: int) -> None:
+        # рядки після pos зсуваються на одну позицію вгору — лише в межах вікна
+        self.render(max(pos, self.offset))
+        self._select(min(pos, self._total() - 1) if self._total() else None)
+
 
 class App(tk.Tk):
     def __init__(self):
@@ -11,6 +160,10 @@ class App(tk.Tk):
         self.db: Database | None = None
         self.db_name_var = tk.StringVar(value="Database: (none)")
         self._cur_table_name: str | None = None  # поточна таблиця (джерело істини)
+        self.wal: WriteAheadLog | None = None  # журнал змін відкритого файлу
+        self.tasks = TaskRunner(self.after)  # довгі операції у фоні, результати — через after()
+        self.results = ResultCache()  # повторне з'єднання тих самих незмінених таблиць — з кешу
+        self.capture: profiling.Capture | None = None
         self._build_ui()
 
     def _build_ui(self):
@@ -18,11 +171,21 @@ class App(tk.Tk):
         filem = tk.Menu(menubar, tearoff=0)
         filem.add_command(label="New DB", command=self.new_db)
         filem.add_command(label="Open...", command=self.open_db)
+        filem.add_command(label="Save", command=self.quick_save, accelerator="Ctrl+S")
         filem.add_command(label="Save As...", command=self.save_db)
         filem.add_separator()
+        filem.add_command(label="Import CSV/NDJSON...", command=self.import_rows)
+        filem.add_command(label="Export table...", command=self.export_rows)
+        filem.add_separator()
         filem.add_command(label="Exit", command=self.destroy)
         menubar.add_cascade(label="File", menu=filem)
+        profm = tk.Menu(menubar, tearoff=0)
+        profm.add_command(label="Start capture", command=lambda: self.start_capture(memory=False))
+        profm.add_command(label="Start capture with memory", command=lambda: self.start_capture(memory=True))
+        profm.add_command(label="Stop capture and show report", command=self.stop_capture)
+        menubar.add_cascade(label="Profile", menu=profm)
         self.config(menu=menubar)
+        self.bind_all("<Control-s>", lambda e: self.quick_save())
 
         header = tk.Frame(self); header.pack(side="top", fill="x")
         tk.Label(header, textvariable=self.db_name_var, font=("Arial", 12, "bold")).pack(pady=4)
@@ -61,11 +224,13 @@ class App(tk.Tk):
         self.btn_add_col = tk.Button(cbtns, text="Add column", command=self.add_column)
         self.btn_edit_col = tk.Button(cbtns, text="Edit column", command=self.edit_column)
         self.btn_del_col = tk.Button(cbtns, text="Delete column", command=self.delete_column)
+        self.btn_compact = tk.Button(cbtns, text="Compact", command=self.compact_table)
         self.btn_add_col.pack(fill="x", pady=2); self.btn_edit_col.pack(fill="x", pady=2); self.btn_del_col.pack(fill="x", pady=2)
+        self.btn_compact.pack(fill="x", pady=2)
 
         rows_frame = tk.LabelFrame(right, text="Rows"); rows_frame.pack(fill="both", expand=True, padx=8, pady=4)
-        self.rows_tree = ttk.Treeview(rows_frame, show="headings")
-        self.rows_tree.pack(side="left", fill="both", expand=True, padx=4, pady=4)
+        self.rows_grid = VirtualGrid(rows_frame)
+        self.rows_grid.pack(side="left", fill="both", expand=True, padx=4, pady=4)
         rbtns = tk.Frame(rows_frame); rbtns.pack(side="left", fill="y")
         self.btn_add_row = tk.Button(rbtns, text="Add row", command=self.add_row)
         self.btn_edit_row = tk.Button(rbtns, text="Edit row", command=self.edit_row)
@@ -89,13 +254,20 @@ class App(tk.Tk):
                 self.tables_list.activate(idx)
             return
         name = self.tables_list.get(sel[0])
+        tables = self.db.tables
+        if isinstance(tables, LazyTables) and not tables.is_loaded(name):
+            def loaded(t):
+                self._cur_table_name = name
+                self.refresh_table_view()
+            self._run_task(f"Loading '{name}'", lambda task: tables.load(name, task.progress), on_done=loaded)
+            return
         self._cur_table_name = name
         self.refresh_table_view()
 
     def update_controls(self):
         enabled = self.db is not None
         for w in [self.btn_add_table, self.btn_join, self.btn_rename_table, self.btn_delete_table,
-                  self.btn_add_col, self.btn_edit_col, self.btn_del_col,
+                  self.btn_add_col, self.btn_edit_col, self.btn_del_col, self.btn_compact,
                   self.btn_add_row, self.btn_edit_row, self.btn_del_row,
                   self.tables_list]:
             state = "normal" if enabled else "disabled"
@@ -105,9 +277,8 @@ class App(tk.Tk):
             self.tables_list.delete(0, tk.END)
             self._cur_table_name = None
             self.table_name_var.set("(no table)")
-            for w in (self.cols_tree, self.rows_tree):
-                for i in w.get_children(): w.delete(i)
-            self.rows_tree["columns"] = tuple()
+            for i in self.cols_tree.get_children(): self.cols_tree.delete(i)
+            self.rows_grid.set_table(None)
 
     def current_table(self) -> Table | None:
         if not self.db:
@@ -148,10 +319,9 @@ class App(tk.Tk):
         if not t:
             self.table_name_var.set(self._cur_table_name or "(no table)")
             if not (self._cur_table_name and self.db and self._cur_table_name in self.db.tables):
-                for w in (self.cols_tree, self.rows_tree):
-                    for i in w.get_children():
-                        w.delete(i)
-                self.rows_tree["columns"] = tuple()
+                for i in self.cols_tree.get_children():
+                    self.cols_tree.delete(i)
+                self.rows_grid.set_table(None)
             return
 
         self.table_name_var.set(t.name)
@@ -161,15 +331,7 @@ class App(tk.Tk):
         for c in t.columns:
             self.cols_tree.insert("", "end", values=(c.name, c.dtype, ",".join(c.enum_values or [])))
 
-        self.rows_tree['columns'] = tuple(t.column_names())
-        self.rows_tree["show"] = "headings"
-        for col in t.column_names():
-            self.rows_tree.heading(col, text=col)
-            self.rows_tree.column(col, width=120, stretch=True)
-        for i in self.rows_tree.get_children():
-            self.rows_tree.delete(i)
-        for r in t.rows:
-            self.rows_tree.insert("", "end", values=[r.get(c) for c in t.column_names()])
+        self.rows_grid.set_table(t)
 
     def center_dialog(self, dlg: tk.Toplevel):
         dlg.update_idletasks()
@@ -180,9 +342,66 @@ class App(tk.Tk):
         y = sy + (sh - h)//2
         dlg.geometry(f"+{x}+{y}")
 
+    def _close_wal(self):
+        if self.wal:
+            self.wal.close()
+            self.wal = None
+
+    def _run_task(self, title: str, fn, *args, on_done=None):
+        # fn(task, *args) виконується у фоновому потоці; вікно лишається живим,
+        # а модальний діалог показує прогрес і дозволяє скасувати операцію
+        dlg = tk.Toplevel(self); dlg.title(title); dlg.resizable(False, False)
+        dlg.transient(self)
+        status = tk.StringVar(value="Working...")
+        tk.Label(dlg, textvariable=status, width=40).pack(padx=12, pady=(10, 4))
+        bar = ttk.Progressbar(dlg, mode="indeterminate", length=280, maximum=1000)
+        bar.pack(padx=12, pady=4)
+        bar.start(15)
+        btn = tk.Button(dlg, text="Cancel", width=10)
+        btn.pack(pady=(4, 10))
+
+        def finish():
+            bar.stop()
+            dlg.grab_release()
+            dlg.destroy()
+        def progress(done, total):
+            if total:
+                if str(bar["mode"]) != "determinate":
+                    bar.stop(); bar.config(mode="determinate")
+                bar["value"] = 1000 * min(done, total) / total
+                status.set(f"{done:,} / {total:,}")
+            else:
+                status.set(f"{done:,}")
+        def done(result):
+            finish()
+            if on_done: on_done(result)
+        def error(e):
+            finish()
+            messagebox.showerror("Error", str(e))
+
+        task = self.tasks.submit(fn, *args, on_done=done, on_error=error, on_progress=progress, on_cancel=finish)
+        def cancel():
+            btn.config(state="disabled")
+            status.set("Cancelling...")
+            task.cancel()
+        btn.config(command=cancel)
+        dlg.protocol("WM_DELETE_WINDOW", cancel)
+        self.center_dialog(dlg)
+        try:
+            dlg.wait_visibility(); dlg.grab_set()
+        except tk.TclError:
+            pass  # задача вже завершилась і закрила діалог
+        return task
+
+    def destroy(self):
+        self.tasks.shutdown()
+        self._close_wal()
+        super().destroy()
+
     def new_db(self):
         name = simpledialog.askstring("New DB", "Database name:")
         if not name: return
+        self._close_wal()
         self.db = Database(name=name)
         self.db_name_var.set(f"Database: {self.db.name}")
         self._cur_table_name = None
@@ -190,29 +409,50 @@ class App(tk.Tk):
         self.refresh_tables_list()
 
     def open_db(self):
-        path = filedialog.askopenfilename(filetypes=[("JSON","*.json")])
+        path = filedialog.askopenfilename(filetypes=[("JSON","*.json"), ("Mini DB binary","*.minidb"), ("Paged database","*.pages")])
         if not path: return
-        try:
-            self.db = load_from_file(path)
-            self.db_name_var.set(f"Database: {self.db.name}")
-            self._cur_table_name = None
-            self.update_controls()
-            self.refresh_tables_list()
-            messagebox.showinfo("Open", "Database loaded successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        def opened(db):
+            try:
+                self._close_wal()
+                self.db = db
+                self.wal = WriteAheadLog(self.db, path)
+                self.db_name_var.set(f"Database: {self.db.name}")
+                self._cur_table_name = None
+                self.update_controls()
+                self.refresh_tables_list()
+                messagebox.showinfo("Open", "Database loaded successfully.")
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+        self._run_task("Open", lambda task: load_from_file(path, lazy=True, progress=task.progress), on_done=opened)
 
     def save_db(self):
         if not self.db:
             messagebox.showerror("Save", "No database to save. Use File → New DB or Open...")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON","*.json")])
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON","*.json"), ("Mini DB binary","*.minidb"), ("Paged database","*.pages")])
         if not path: return
         try:
-            save_to_file(self.db, path)
-            messagebox.showinfo("Save", "Database saved successfully.")
+            self._close_wal()
+            self.wal = WriteAheadLog(self.db, path)
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+        log = self.wal
+        self._run_task("Save", lambda task: log.checkpoint(task.progress),
+                       on_done=lambda _: messagebox.showinfo("Save", "Database saved successfully."))
+
+    def quick_save(self):
+        if not self.wal:
+            self.save_db()
+            return
+        try:
+            self.wal.commit()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if self.wal.needs_checkpoint():
+            log = self.wal
+            self._run_task("Save", lambda task: log.checkpoint(task.progress))
 
     def add_table(self):
         if not self.db: return
@@ -232,9 +472,7 @@ class App(tk.Tk):
         if name in self.db.tables and name != t.name:
             messagebox.showerror("Error", "Table with this name exists.")
             return
-        del self.db.tables[t.name]
-        t.name = name
-        self.db.tables[name] = t
+        self.db.rename_table(t.name, name)
         self.refresh_tables_list(select_name=name)
 
     def delete_table(self):
@@ -261,6 +499,10 @@ class App(tk.Tk):
         dtype_combo = ttk.Combobox(frm, textvariable=dtype_var, values=["integer","real","char","string","email","enum"], state="readonly", width=21)
         dtype_combo.grid(row=1, column=1, sticky="w", padx=6, pady=4)
 
+        tk.Label(frm, text="Default:").grid(row=3, column=0, sticky="e", padx=6, pady=4)
+        default_var = tk.StringVar()
+        tk.Entry(frm, textvariable=default_var, width=24).grid(row=3, column=1, sticky="w", padx=6, pady=4)
+
         enum_lbl = tk.Label(frm, text="Enum values (comma-separated):")
         enum_var = tk.StringVar()
         enum_entry = tk.Entry(frm, textvariable=enum_var, width=24)
@@ -293,8 +535,10 @@ class App(tk.Tk):
             enum_values = [x.strip() for x in enum_var.get().split(",") if x.strip()]
             if not enum_values:
                 messagebox.showerror("Error", "Enum values cannot be empty"); return
+        default = default_var.get() if default_var.get() != "" else None
         try:
-            t.add_column(Column(name=name, dtype=dtype, enum_values=enum_values))
+            # існуючі рядки не переписуються: default підставляється під час читання
+            t.add_column(Column(name=name, dtype=dtype, enum_values=enum_values, default=default))
             self.refresh_table_view()
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -330,7 +574,7 @@ class App(tk.Tk):
         refresh_enum_visibility()
 
         btns = tk.Frame(dlg); btns.pack(pady=8)
-        result = {"ok": False}
+        result = {"args": None}
         def submit():
             name = col_var.get()
             new_dtype = dtype_var.get()
@@ -339,31 +583,28 @@ class App(tk.Tk):
                 enum_values = [x.strip() for x in enum_var.get().split(",") if x.strip()]
                 if not enum_values:
                     messagebox.showerror("Error", "Enum values cannot be empty"); return
-            from models import Column as _Col
-            validator = _Col(name, new_dtype, enum_values)
-            try:
-                for r in t.rows:
-                    v = r.get(name)
-                    if v is None:
-                        continue
-                    r[name] = validator.validate(v)
-            except Exception as e:
-                messagebox.showerror("Error", f"Cannot convert existing values: {e}")
-                return
-            for c in t.columns:
-                if c.name == name:
-                    c.dtype = new_dtype
-                    c.enum_values = enum_values
-                    break
-            result["ok"] = True
+            result["args"] = (name, new_dtype, enum_values)
             dlg.destroy()
         def cancel(): dlg.destroy()
         tk.Button(btns, text="OK", width=10, command=submit).grid(row=0, column=0, padx=6)
         tk.Button(btns, text="Cancel", width=10, command=cancel).grid(row=0, column=1, padx=6)
         self.center_dialog(dlg)
         self.wait_window(dlg)
-        if result["ok"]:
-            self.refresh_table_view()
+        if result["args"]:
+            name, new_dtype, enum_values = result["args"]
+            def checked(errors):
+                if errors:
+                    shown = "\n".join(f"row {i + 1}: {msg}" for i, msg in errors[:15])
+                    more = f"\n... and {len(errors) - 15} more" if len(errors) > 15 else ""
+                    messagebox.showerror("Error", f"Cannot convert {len(errors)} value(s):\n{shown}{more}")
+                    return
+                # конвертація теж спершу перевіряє всі значення, тож скасування нічого не змінює
+                self._run_task("Convert column",
+                               lambda task: t.convert_column(name, new_dtype, enum_values, progress=task.progress),
+                               on_done=lambda _: self.refresh_table_view())
+            self._run_task("Check conversion",
+                           lambda task: t.check_conversion(name, new_dtype, enum_values, progress=task.progress),
+                           on_done=checked)
 
     def delete_column(self):
         t = self.current_table()
@@ -376,6 +617,67 @@ class App(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def compact_table(self):
+        # прибирає з рядків значення видалених колонок і дописує відкладені default
+        t = self.current_table()
+        if not t: return
+        self._run_task("Compact", lambda task: t.compact(progress=task.progress))
+
+    def import_rows(self):
+        # у таблицю з назвою файлу (нову — зі схемою, виведеною з перших записів); відхилені
+        # рядки — у <файл>.rejects.ndjson
+        if not self.db: return
+        path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson *.jsonl")])
+        if not path: return
+        rejects = path + ".rejects.ndjson"
+        def imported(report):
+            self.refresh_tables_list(select_name=report.table)
+            msg = f"Imported {report.rows} rows into '{report.table}' ({report.rows_per_s:,.0f} rows/s)."
+            if report.rejected:
+                msg += f"\n{report.rejected} rows rejected, see {rejects}"
+            messagebox.showinfo("Import", msg)
+        self._run_task("Import", lambda task: bulk.import_file(self.db, path, rejects=rejects, progress=task.progress),
+                       on_done=imported)
+
+    def export_rows(self):
+        t = self.current_table()
+        if not t: return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", initialfile=t.name,
+                                            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson")])
+        if not path: return
+        snap = t.snapshot()
+        self._run_task("Export", lambda task: bulk.export_file(snap, path, progress=task.progress),
+                       on_done=lambda n: messagebox.showinfo("Export", f"Exported {n} rows."))
+
+    # --- profiling
+    def start_capture(self, memory: bool):
+        if self.capture is not None:
+            messagebox.showinfo("Profile", "Capture is already running.")
+            return
+        self.capture = profiling.Capture(memory=memory).start()
+
+    def stop_capture(self):
+        if self.capture is None:
+            messagebox.showinfo("Profile", "No capture is running.")
+            return
+        cap = self.capture.stop()
+        self.capture = None
+        dlg = tk.Toplevel(self); dlg.title("Profile report")
+        text = tk.Text(dlg, width=110, height=32, font=("Courier", 9))
+        text.insert("1.0", cap.report())
+        text.config(state="disabled")
+        text.pack(fill="both", expand=True, padx=8, pady=(8, 4))
+
+        def save_json():
+            path = filedialog.asksaveasfilename(parent=dlg, defaultextension=".json", filetypes=[("JSON", "*.json")])
+            if not path: return
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(cap.to_dict(), f, indent=2)
+
+        bar = tk.Frame(dlg); bar.pack(fill="x", padx=8, pady=(0, 8))
+        tk.Button(bar, text="Save as JSON...", command=save_json).pack(side="left")
+        tk.Button(bar, text="Close", command=dlg.destroy).pack(side="right")
+
     def _prompt_row_values(self, t: Table, initial=None):
         dlg = tk.Toplevel(self); dlg.title("Row values"); dlg.resizable(False, False)
         dlg.transient(self); dlg.grab_set()
@@ -439,33 +741,33 @@ class App(tk.Tk):
         vals = self._prompt_row_values(t)
         if vals is None: return
         try:
-            t.add_row(vals)
-            self.refresh_table_view()
+            rid = t.add_row(vals)
+            self.rows_grid.row_added(t.position(rid))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def edit_row(self):
         t = self.current_table()
         if not t: return
-        sel = self.rows_tree.selection()
-        if not sel: return
-        idx = self.rows_tree.index(sel[0])
-        vals = self._prompt_row_values(t, t.rows[idx])
+        rid = self.rows_grid.selected_id()
+        if rid is None: return
+        vals = self._prompt_row_values(t, t.get(rid))
         if vals is None: return
         try:
-            t.edit_row(idx, vals)
-            self.refresh_table_view()
+            # рядок адресується за id: поки відкрито діалог, позиція могла змінитися
+            t.update(rid, vals)
+            self.rows_grid.row_changed(t.position(rid))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def delete_row(self):
         t = self.current_table()
         if not t: return
-        sel = self.rows_tree.selection()
-        if not sel: return
-        idx = self.rows_tree.index(sel[0])
-        t.delete_row(idx)
-        self.refresh_table_view()
+        rid = self.rows_grid.selected_id()
+        if rid is None: return
+        pos = t.position(rid)
+        t.delete(rid)
+        self.rows_grid.row_deleted(pos)
 
     def join_tables_dialog(self):
         if not self.db or len(self.db.tables) < 2:
@@ -483,17 +785,69 @@ class App(tk.Tk):
         key = simpledialog.askstring("Join", f"Join key (common column): {lk}")
         if not key: return
         try:
-            res = join_tables(self.db.get_table(left), self.db.get_table(right), key)
-            base = res.name; i=1
-            while base in self.db.tables:
-                base = f"{res.name}_{i}"; i+=1
-            res.name = base
-            self.db.tables[res.name] = res
-            cur = self.current_table().name if self.current_table() else None
-            self.refresh_tables_list(select_name=cur)
-            messagebox.showinfo("Join", f"Join created as table '{res.name}'")
+            cursor = join_tables(self.db.get_table(left), self.db.get_table(right), key, lazy=True,
+                                 cache=self.results)
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+        self._join_preview(cursor)
+
+    def _join_preview(self, cursor, page: int = 200):
+        # показуємо першу сторінку одразу; решта рахується лише на "More" або "Save as table"
+        dlg = tk.Toplevel(self); dlg.title(f"Join preview: {cursor.name}")
+        names = cursor.column_names()
+        tree = ttk.Treeview(dlg, columns=tuple(names), show="headings", height=15)
+        for col in names:
+            tree.heading(col, text=col)
+            tree.column(col, width=120, stretch=True)
+        tree.pack(fill="both", expand=True, padx=8, pady=(8, 4))
+        status = tk.StringVar()
+        shown = []
+
+        def more():
+            try:
+                rows = cursor.fetch(page)
+            except Exception as e:
+                messagebox.showerror("Error", str(e), parent=dlg)
+                return
+            shown.extend(rows)
+            for r in rows:
+                tree.insert("", "end", values=[r.get(c) for c in names])
+            done = len(rows) < page
+            status.set(f"{len(shown)} rows" + ("" if done else "+"))
+            if done:
+                btn_more.config(state="disabled")
+
+        def save():
+            def built(res):
+                try:
+                    base = res.name; i=1
+                    while base in self.db.tables:
+                        base = f"{res.name}_{i}"; i+=1
+                    res.name = base
+                    self.db.add_table(res)
+                except Exception as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                cur = self.current_table().name if self.current_table() else None
+                self.refresh_tables_list(select_name=cur)
+                messagebox.showinfo("Join", f"Join created as table '{res.name}'")
+            dlg.destroy()
+            self._run_task("Join", lambda task: cursor.to_table(head=shown, progress=task.progress), on_done=built)
+
+        def close():
+            cursor.close()
+            dlg.destroy()
+
+        bar = tk.Frame(dlg); bar.pack(fill="x", padx=8, pady=(0, 8))
+        tk.Label(bar, textvariable=status).pack(side="left")
+        tk.Button(bar, text="Close", command=close).pack(side="right")
+        tk.Button(bar, text="Save as table", command=save).pack(side="right", padx=(0, 6))
+        btn_more = tk.Button(bar, text="More", command=more)
+        btn_more.pack(side="right", padx=(0, 6))
+        dlg.protocol("WM_DELETE_WINDOW", close)
+        more()
+        self.center_dialog(dlg)
 
 def run():
     app = App()
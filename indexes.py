@@ -0,0 +1,154 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Вторинні індекси над слотами рядків у Table.rows (для рядків-dict слот не
+# змінюється при видаленні інших рядків, див. Table._dead).
+# Table сам підтримує їх актуальними в add_row/edit_row/delete_row.
+
+INDEX_KINDS = ("hash", "sorted")
+
+
+class HashIndex:
+    # слоти в кошику відсортовані: вставка/видалення — бінарний пошук, а не перебір
+    kind = "hash"
+
+    def __init__(self, column: str):
+        self.column = column
+        self.buckets: Dict[Any, List[int]] = {}
+
+    def build(self, values: Iterable[Any]) -> None:
+        buckets: Dict[Any, List[int]] = {}
+        for pos, v in enumerate(values):
+            b = buckets.get(v)
+            if b is None:
+                buckets[v] = [pos]
+            else:
+                b.append(pos)
+        self.buckets = buckets
+
+    def insert(self, pos: int, value: Any) -> None:
+        b = self.buckets.get(value)
+        if b is None:
+            self.buckets[value] = [pos]
+        elif b[-1] < pos:
+            b.append(pos)
+        else:
+            insort(b, pos)
+
+    def extend(self, start: int, values: Iterable[Any]) -> None:
+        buckets = self.buckets
+        for pos, v in enumerate(values, start):
+            b = buckets.get(v)
+            if b is None:
+                buckets[v] = [pos]
+            else:
+                b.append(pos)
+
+    def remove(self, pos: int, value: Any) -> None:
+        b = self.buckets.get(value)
+        if b is None:
+            return
+        i = bisect_left(b, pos)
+        if i < len(b) and b[i] == pos:
+            del b[i]
+        if not b:
+            del self.buckets[value]
+
+    def update(self, pos: int, old: Any, new: Any) -> None:
+        if old != new:
+            self.remove(pos, old)
+            self.insert(pos, new)
+
+    def delete_at(self, pos: int, value: Any) -> None:
+        self.remove(pos, value)
+        for b in self.buckets.values():
+            b[:] = [p - 1 if p > pos else p for p in b]
+
+    def renumber(self, removed: List[int]) -> None:
+        # після ущільнення: слоти зсуваються на кількість прибраних слотів перед ними
+        for b in self.buckets.values():
+            b[:] = [p - bisect_left(removed, p) for p in b]
+
+    def lookup(self, value: Any) -> List[int]:
+        return list(self.buckets.get(value, ()))
+
+    def range(self, lo: Any = None, hi: Any = None) -> List[int]:
+        raise ValueError(f"Hash index on '{self.column}' does not support range queries")
+
+
+class SortedIndex:
+    kind = "sorted"
+
+    def __init__(self, column: str):
+        self.column = column
+        self.keys: List[Any] = []
+        self.positions: List[int] = []
+        self.nulls: List[int] = []
+
+    def build(self, values: Iterable[Any]) -> None:
+        self.keys, self.positions, self.nulls = [], [], []
+        self.extend(0, values)
+
+    def extend(self, start: int, values: Iterable[Any]) -> None:
+        pairs: List[Tuple[Any, int]] = list(zip(self.keys, self.positions))
+        for pos, v in enumerate(values, start):
+            if v is None:
+                self.nulls.append(pos)
+            else:
+                pairs.append((v, pos))
+        # timsort зливає вже відсортований префікс з новим хвостом майже лінійно
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.positions = [p for _, p in pairs]
+
+    def insert(self, pos: int, value: Any) -> None:
+        if value is None:
+            self.nulls.append(pos)
+            return
+        i = bisect_right(self.keys, value)
+        self.keys.insert(i, value)
+        self.positions.insert(i, pos)
+
+    def remove(self, pos: int, value: Any) -> None:
+        if value is None:
+            self.nulls.remove(pos)
+            return
+        lo = bisect_left(self.keys, value)
+        hi = bisect_right(self.keys, value, lo)
+        i = self.positions.index(pos, lo, hi)
+        del self.keys[i]
+        del self.positions[i]
+
+    def update(self, pos: int, old: Any, new: Any) -> None:
+        if old != new:
+            self.remove(pos, old)
+            self.insert(pos, new)
+
+    def delete_at(self, pos: int, value: Any) -> None:
+        self.remove(pos, value)
+        self.positions = [p - 1 if p > pos else p for p in self.positions]
+        self.nulls = [p - 1 if p > pos else p for p in self.nulls]
+
+    def renumber(self, removed: List[int]) -> None:
+        self.positions = [p - bisect_left(removed, p) for p in self.positions]
+        self.nulls = [p - bisect_left(removed, p) for p in self.nulls]
+
+    def lookup(self, value: Any) -> List[int]:
+        if value is None:
+            return list(self.nulls)
+        lo = bisect_left(self.keys, value)
+        return self.positions[lo:bisect_right(self.keys, value, lo)]
+
+    def range(self, lo: Any = None, hi: Any = None) -> List[int]:
+        start = 0 if lo is None else bisect_left(self.keys, lo)
+        stop = len(self.keys) if hi is None else bisect_right(self.keys, hi)
+        return self.positions[start:stop]
+
+
+def make_index(column: str, kind: str):
+    if kind == "hash":
+        return HashIndex(column)
+    if kind == "sorted":
+        return SortedIndex(column)
+    raise ValueError(f"Unsupported index kind: {kind} (expected one of {', '.join(INDEX_KINDS)})")
+
@@ -0,0 +1,397 @@
+import pickle
+import tempfile
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import profiling
+from models import Column, Table
+from rowstore import TupleStore
+
+# Рушій з'єднань: inner/left/right/outer, складені ключі, вибір меншої таблиці для
+# побудови хеш-таблиці, sort-merge (за наявності відсортованих індексів) і
+# секціонований хеш-join зі скиданням секцій на диск для входів, що не влазять у пам'ять.
+
+HOWS = ("inner", "left", "right", "outer")
+STRATEGIES = ("auto", "hash", "merge", "partitioned")
+
+Row = Dict[str, Any]
+
+
+class JoinPlan:
+    # Схема результату і перетворення пари рядків у вихідний рядок; рахується один раз
+    def __init__(self, left: Table, right: Table, keys: List[str], suffixes: Tuple[str, str]):
+        left_names = left.column_names()
+        right_names = right.column_names()
+        for k in keys:
+            if k not in left_names or k not in right_names:
+                raise ValueError(f"Join key '{k}' must exist in both tables")
+        self.keys = keys
+        self.left_names = left_names
+        self.right_map: List[Tuple[str, str]] = []
+        columns = [Column(name=c.name, dtype=c.dtype, enum_values=c.enum_values) for c in left.columns]
+        for c in right.columns:
+            if c.name in keys:
+                continue
+            name = c.name if c.name not in left_names else c.name + suffixes[1]
+            self.right_map.append((c.name, name))
+            columns.append(Column(name=name, dtype=c.dtype, enum_values=c.enum_values))
+        self.columns = columns
+        self.names = [c.name for c in columns]
+        self._right_src = [src for src, _ in self.right_map]
+        self._right_nulls = (None,) * len(self.right_map)
+
+    def merge(self, lr: Optional[Row], rr: Optional[Row]) -> Row:
+        if lr is None:
+            out = dict.fromkeys(self.left_names)
+            for k in self.keys:
+                out[k] = rr.get(k)
+        else:
+            out = {name: lr.get(name) for name in self.left_names}
+        if rr is None:
+            for _, dst in self.right_map:
+                out[dst] = None
+        else:
+            for src, dst in self.right_map:
+                out[dst] = rr.get(src)
+        return out
+
+    def merge_tuple(self, lr: Optional[Row], rr: Optional[Row]) -> Tuple[Any, ...]:
+        # те саме, що merge, але кортеж у порядку names (компактний результат, rowstore.py)
+        if lr is None:
+            keys = self.keys
+            left = tuple(rr.get(n) if n in keys else None for n in self.left_names)
+        else:
+            left = tuple(map(lr.get, self.left_names))
+        if rr is None:
+            return left + self._right_nulls
+        return left + tuple(map(rr.get, self._right_src))
+
+
+class JoinCursor:
+    # результат з'єднання, що обчислюється по запиту; рядок, отриманий один раз, більше не повертається.
+    # compact — джерело дає кортежі (JoinPlan.merge_tuple): назовні вони віддаються як dict,
+    # а to_table() складає їх у TupleStore без проміжних dict
+    def __init__(self, plan: JoinPlan, rows: Iterator[Any], name: str, compact: bool = False):
+        self.plan = plan
+        self.rows = iter(rows)
+        self.name = name
+        self.compact = compact
+        self.fetched = 0
+        # викликається з повним результатом, коли to_table() дочитав курсор (кеш join_tables)
+        self.on_complete: Optional[Callable[[Table], None]] = None
+
+    @property
+    def columns(self) -> List[Column]:
+        return self.plan.columns
+
+    def column_names(self) -> List[str]:
+        return list(self.plan.names)
+
+    def __iter__(self) -> "JoinCursor":
+        return self
+
+    def __next__(self) -> Row:
+        row = next(self.rows)
+        self.fetched += 1
+        return dict(zip(self.plan.names, row)) if self.compact else row
+
+    def fetch(self, n: int) -> List[Row]:
+        out = list(islice(self.rows, n))
+        self.fetched += len(out)
+        if self.compact:
+            names = self.plan.names
+            return [dict(zip(names, t)) for t in out]
+        return out
+
+    def limit(self, n: int) -> "JoinCursor":
+        if n < 0:
+            raise ValueError("Limit must be non-negative")
+        return JoinCursor(self.plan, islice(self.rows, n), self.name, self.compact)
+
+    def close(self) -> None:
+        # звільняє тимчасові файли секціонованого з'єднання, якщо результат не дочитано
+        close = getattr(self.rows, "close", None)
+        if close is not None:
+            close()
+
+    def to_table(self, name: Optional[str] = None, head: Iterable[Row] = (),
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Table:
+        # head — рядки, вже отримані через fetch(), щоб не перераховувати з'єднання
+        out = Table(name=name or self.name, columns=self.plan.columns)
+        if self.compact:
+            out.rows = TupleStore(self.plan.columns)
+            out.rows.extend(head)
+            target = out.rows.rows
+        else:
+            out.rows.extend(head)
+            target = out.rows
+        if progress is None:
+            before = len(target)
+            target.extend(self.rows)
+            self.fetched += len(target) - before
+        else:
+            while True:
+                chunk = list(islice(self.rows, 10000))
+                self.fetched += len(chunk)
+                target.extend(chunk)
+                progress(len(target), None)
+                if len(chunk) < 10000:
+                    break
+        # результат повний, лише якщо head — усі рядки, отримані раніше
+        if self.on_complete is not None and len(out.rows) == self.fetched:
+            self.on_complete(out)
+        return out
+
+
+def _key_func(keys: List[str]) -> Callable[[Row], Any]:
+    if len(keys) == 1:
+        k = keys[0]
+        return lambda r: r.get(k)
+    return lambda r: tuple(r.get(k) for k in keys)
+
+
+def _sort_key(keys: List[str]) -> Callable[[Row], Any]:
+    # (is None, value): None порівнюється лише з None, тож сортування не падає на NULL
+    return lambda r: tuple((r.get(k) is None, r.get(k)) for k in keys)
+
+
+def _hash_join(build: List[Row], probe: Iterator[Row], key: Callable[[Row], Any],
+               build_is_left: bool, keep_build: bool, keep_probe: bool,
+               merge: Callable[[Optional[Row], Optional[Row]], Row],
+               table: Optional[Dict[Any, List[int]]] = None) -> Iterator[Row]:
+    if table is None:
+        with profiling.span("join.build", len(build)):
+            table = {}
+            for i, r in enumerate(build):
+                table.setdefault(key(r), []).append(i)
+    if build_is_left:
+        rows = _probe_left(build, probe, key, keep_build, keep_probe, merge, table)
+    else:
+        rows = _probe(build, probe, key, False, keep_build, keep_probe, merge, table)
+    yield from profiling.iterate("join.probe", rows) if profiling.enabled else rows
+
+
+def _probe(build: List[Row], probe: Iterator[Row], key: Callable[[Row], Any],
+           build_is_left: bool, keep_build: bool, keep_probe: bool,
+           merge: Callable[[Optional[Row], Optional[Row]], Row],
+           table: Dict[Any, List[int]]) -> Iterator[Row]:
+    matched = bytearray(len(build)) if keep_build else None
+    for pr in probe:
+        hits = table.get(key(pr))
+        if hits:
+            for i in hits:
+                if matched is not None:
+                    matched[i] = 1
+                yield merge(build[i], pr) if build_is_left else merge(pr, build[i])
+        elif keep_probe:
+            yield merge(None, pr) if build_is_left else merge(pr, None)
+    if matched is not None:
+        for i, flag in enumerate(matched):
+            if not flag:
+                yield merge(build[i], None) if build_is_left else merge(None, build[i])
+
+
+def _probe_left(build: List[Row], probe: Iterator[Row], key: Callable[[Row], Any],
+                keep_left: bool, keep_right: bool,
+                merge: Callable[[Optional[Row], Optional[Row]], Row],
+                table: Dict[Any, List[int]]) -> Iterator[Row]:
+    # побудова на лівій (меншій) стороні: пари збираються за лівими рядками, тож порядок
+    # той самий, що й при побудові на правій — ліві рядки по черзі, потім праві без пари
+    matches: List[Optional[List[Row]]] = [None] * len(build)
+    unmatched: List[Row] = []
+    for pr in probe:
+        hits = table.get(key(pr))
+        if hits:
+            for i in hits:
+                m = matches[i]
+                if m is None:
+                    matches[i] = [pr]
+                else:
+                    m.append(pr)
+        elif keep_right:
+            unmatched.append(pr)
+    for lr, m in zip(build, matches):
+        if m is not None:
+            for pr in m:
+                yield merge(lr, pr)
+        elif keep_left:
+            yield merge(lr, None)
+    for pr in unmatched:
+        yield merge(None, pr)
+
+
+def _merge_join(lt: Table, rt: Table, keys: List[str], keep_left: bool, keep_right: bool,
+                merge: Callable[[Optional[Row], Optional[Row]], Row]) -> Iterator[Row]:
+    with profiling.span("join.sort", lt.row_count() + rt.row_count()):
+        left, right = _sorted_rows(lt, keys), _sorted_rows(rt, keys)
+        skey = _sort_key(keys)
+        lk = [skey(r) for r in left]
+        rk = [skey(r) for r in right]
+    rows = _merge(left, right, lk, rk, keep_left, keep_right, merge)
+    yield from profiling.iterate("join.merge", rows) if profiling.enabled else rows
+
+
+def _merge(left: List[Row], right: List[Row], lk: List[Any], rk: List[Any], keep_left: bool, keep_right: bool,
+           merge: Callable[[Optional[Row], Optional[Row]], Row]) -> Iterator[Row]:
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if lk[i] < rk[j]:
+            if keep_left:
+                yield merge(left[i], None)
+            i += 1
+        elif rk[j] < lk[i]:
+            if keep_right:
+                yield merge(None, right[j])
+            j += 1
+        else:
+            k = lk[i]
+            i2 = i
+            while i2 < len(left) and lk[i2] == k:
+                i2 += 1
+            j2 = j
+            while j2 < len(right) and rk[j2] == k:
+                j2 += 1
+            for a in range(i, i2):
+                for b in range(j, j2):
+                    yield merge(left[a], right[b])
+            i, j = i2, j2
+    if keep_left:
+        for a in range(i, len(left)):
+            yield merge(left[a], None)
+    if keep_right:
+        for b in range(j, len(right)):
+            yield merge(None, right[b])
+
+
+def _row_list(t: Table) -> List[Row]:
+    rows = t.rows
+    return rows if isinstance(rows, list) and not t._stale() else list(t.iter_rows())
+
+
+def _sorted_rows(t: Table, keys: List[str]) -> List[Row]:
+    idx = t.indexes.get(keys[0]) if len(keys) == 1 else None
+    if idx is not None and idx.kind == "sorted":
+        # рядки з NULL-ключем у кінці, як і в _sort_key
+        row = t._slot_row
+        return [row(p) for p in idx.positions] + [row(p) for p in idx.nulls]
+    return sorted(t.iter_rows(), key=_sort_key(keys))
+
+
+class _Spill:
+    # секції одного входу у тимчасових файлах; рядки пишуться пачками через pickle
+    def __init__(self, n: int, directory: Optional[str], batch: int = 1024):
+        self.files = [tempfile.TemporaryFile(dir=directory) for _ in range(n)]
+        self.buffers: List[List[Row]] = [[] for _ in range(n)]
+        self.batch = batch
+
+    def add(self, part: int, row: Row) -> None:
+        buf = self.buffers[part]
+        buf.append(row)
+        if len(buf) >= self.batch:
+            pickle.dump(buf, self.files[part], pickle.HIGHEST_PROTOCOL)
+            buf.clear()
+
+    def read(self, part: int) -> Iterator[Row]:
+        f = self.files[part]
+        if self.buffers[part]:
+            pickle.dump(self.buffers[part], f, pickle.HIGHEST_PROTOCOL)
+            self.buffers[part] = []
+        f.seek(0)
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                return
+
+    def close(self) -> None:
+        for f in self.files:
+            f.close()
+
+
+def _partitioned_join(left: Table, right: Table, key: Callable[[Row], Any], keep_left: bool, keep_right: bool,
+                      merge: Callable[[Optional[Row], Optional[Row]], Row], partitions: int,
+                      spill_dir: Optional[str]) -> Iterator[Row]:
+    ls, rs = _Spill(partitions, spill_dir), _Spill(partitions, spill_dir)
+    try:
+        with profiling.span("join.partition", left.row_count() + right.row_count()):
+            for r in left.iter_rows():
+                ls.add(hash(key(r)) % partitions, r)
+            for r in right.iter_rows():
+                rs.add(hash(key(r)) % partitions, r)
+        for p in range(partitions):
+            # у пам'яті одночасно лише одна секція правого входу
+            build = list(rs.read(p))
+            yield from _hash_join(build, ls.read(p), key, False, keep_right, keep_left, merge)
+    finally:
+        ls.close()
+        rs.close()
+
+
+def _choose(left: Table, right: Table, keys: List[str], strategy: str, memory_rows: Optional[int]) -> str:
+    if strategy != "auto":
+        return strategy
+    if memory_rows is None:
+        # сторінкові таблиці (paged.PagedStore) підказують, скільки рядків уміщує буферний пул
+        limits = [n for n in (getattr(left.rows, "memory_rows", None), getattr(right.rows, "memory_rows", None))
+                  if n is not None]
+        memory_rows = min(limits) if limits else None
+    if memory_rows is not None and min(left.row_count(), right.row_count()) > memory_rows:
+        return "partitioned"
+    if len(keys) == 1:
+        li, ri = left.indexes.get(keys[0]), right.indexes.get(keys[0])
+        if li is not None and ri is not None and li.kind == ri.kind == "sorted":
+            return "merge"
+    return "hash"
+
+
+def iter_join(left: Table, right: Table, on: Union[str, Sequence[str]], how: str = "inner",
+              suffixes: Tuple[str, str] = ("_x", "_y"), strategy: str = "auto",
+              memory_rows: Optional[int] = None, partitions: int = 16,
+              spill_dir: Optional[str] = None, compact: bool = False) -> "JoinCursor":
+    # нічого не обчислюється до першого запиту рядка: побудова хеш-таблиці,
+    # сортування і розбиття на секції відбуваються під час першого next()
+    if how not in HOWS:
+        raise ValueError(f"Unsupported join type: {how} (expected one of {', '.join(HOWS)})")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unsupported join strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+    keys = [on] if isinstance(on, str) else list(on)
+    if not keys:
+        raise ValueError("Join needs at least one key column")
+    plan = JoinPlan(left, right, keys, suffixes)
+    keep_left = how in ("left", "outer")
+    keep_right = how in ("right", "outer")
+    key = _key_func(keys)
+    merge = plan.merge_tuple if compact else plan.merge
+    strategy = _choose(left, right, keys, strategy, memory_rows)
+    if strategy == "merge":
+        rows = _merge_join(left, right, keys, keep_left, keep_right, merge)
+    elif strategy == "partitioned":
+        rows = _partitioned_join(left, right, key, keep_left, keep_right, merge, partitions, spill_dir)
+    else:
+        rows = _hash_strategy(left, right, keys, key, keep_left, keep_right, merge)
+    return JoinCursor(plan, rows, f"{left.name}_JOIN_{right.name}", compact)
+
+
+def _hash_strategy(left: Table, right: Table, keys: List[str], key: Callable[[Row], Any],
+                   keep_left: bool, keep_right: bool,
+                   merge: Callable[[Optional[Row], Optional[Row]], Row]) -> Iterator[Row]:
+    if len(keys) == 1:
+        # готовий хеш-індекс замінює фазу побудови
+        for build, probe, build_is_left in ((right, left, False), (left, right, True)):
+            idx = build.indexes.get(keys[0])
+            # індекс зберігає слоти, тож придатний, лише поки слоти збігаються з позиціями
+            if idx is not None and idx.kind == "hash" and not build._stale():
+                keep_build, keep_probe = (keep_left, keep_right) if build_is_left else (keep_right, keep_left)
+                return _hash_join(_row_list(build), probe.iter_rows(), key, build_is_left, keep_build, keep_probe, merge,
+                                  table=idx.buckets)
+    build_is_left = left.row_count() < right.row_count()
+    build, probe = (left, right) if build_is_left else (right, left)
+    keep_build, keep_probe = (keep_left, keep_right) if build_is_left else (keep_right, keep_left)
+    return _hash_join(_row_list(build), probe.iter_rows(), key, build_is_left, keep_build, keep_probe, merge)
+
+
+def join(left: Table, right: Table, on: Union[str, Sequence[str]], how: str = "inner",
+         suffixes: Tuple[str, str] = ("_x", "_y"), strategy: str = "auto",
+         memory_rows: Optional[int] = None, partitions: int = 16, spill_dir: Optional[str] = None,
+         compact: bool = False) -> Table:
+    return iter_join(left, right, on, how, suffixes, strategy, memory_rows, partitions, spill_dir, compact).to_table()
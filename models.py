@@ -1,68 +1,489 @@
+import functools
+import itertools
+import threading
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import re
+import time
+
+import profiling
+from indexes import make_index
 
 EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
 
+Validator = Callable[[Any], Any]
+# слухач змін: (джерело — Table або Database, назва операції, аргументи для повтору)
+Listener = Callable[[Any, str, Tuple[Any, ...]], None]
+
+def _integer_validator(col: "Column") -> Validator:
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        if value.__class__ is int:
+            return value
+        if isinstance(value, bool):
+            raise ValueError("Boolean is not allowed for integer")
+        try:
+            return int(value)
+        except Exception:
+            raise ValueError(f"'{value}' is not a valid integer")
+    return validate
+
+def _real_validator(col: "Column") -> Validator:
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except Exception:
+            raise ValueError(f"'{value}' is not a valid real")
+    return validate
+
+def _char_validator(col: "Column") -> Validator:
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        s = str(value)
+        if len(s) != 1:
+            raise ValueError(f"'{value}' is not a single character")
+        return s
+    return validate
+
+def _string_validator(col: "Column") -> Validator:
+    def validate(value: Any) -> Any:
+        return None if value is None else str(value)
+    return validate
+
+def _email_validator(col: "Column") -> Validator:
+    match = EMAIL_RE.match
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        s = str(value)
+        if not match(s):
+            raise ValueError(f"'{value}' is not a valid email")
+        return s
+    return validate
+
+def _enum_validator(col: "Column") -> Validator:
+    enum_values = list(col.enum_values or [])
+    # значення -> той самий об'єкт str з enum_values: O(1) перевірка, і всі рядки
+    # таблиці посилаються на кілька спільних рядків замість власних копій
+    canonical = {v: v for v in enum_values}
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        if not canonical:
+            raise ValueError("Enum column must have predefined values")
+        s = canonical.get(value if value.__class__ is str else str(value))
+        if s is None:
+            raise ValueError(f"'{value}' is not in enum {enum_values}")
+        return s
+    return validate
+
+def _unsupported_validator(col: "Column") -> Validator:
+    dtype = col.dtype
+    def validate(value: Any) -> Any:
+        if value is None:
+            return None
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    return validate
+
+def _batch_validator(dtype: str, validate: Validator) -> Callable[[List[Any]], List[Any]]:
+    # Швидкий шлях для цілої пачки значень; будь-яка помилка -> повільний шлях по клітинках
+    if dtype in ("integer", "real", "string"):
+        convert = {"integer": int, "real": float, "string": str}[dtype]
+        def batch(raw: List[Any]) -> List[Any]:
+            types = set(map(type, raw))
+            if types == {int} and dtype == "integer":
+                return list(raw)
+            if type(None) in types or bool in types:
+                return list(map(validate, raw))
+            return list(map(convert, raw))
+        return batch
+    def batch(raw: List[Any]) -> List[Any]:
+        done = {v: validate(v) for v in dict.fromkeys(raw)}
+        return list(map(done.__getitem__, raw))
+    return batch
+
+# частка надгробків (видалених рядків-dict), після якої список рядків ущільнюється
+PURGE_RATIO = 0.25
+PURGE_MIN = 64
+
+# текстові типи, значення яких на завантаженні зводяться до спільних об'єктів str
+INTERNED_DTYPES = ("char", "string", "email", "enum")
+
+VALIDATOR_FACTORIES: Dict[str, Callable[["Column"], Validator]] = {
+    "integer": _integer_validator,
+    "real": _real_validator,
+    "char": _char_validator,
+    "string": _string_validator,
+    "email": _email_validator,
+    "enum": _enum_validator,
+}
+
 @dataclass
 class Column:
     name: str
     dtype: str
     enum_values: Optional[List[str]] = None
+    default: Any = None
+    _compiled: Optional[Tuple[Any, Validator, Callable[[List[Any]], List[Any]]]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    def _compile(self) -> Tuple[Any, Validator, Callable[[List[Any]], List[Any]]]:
+        # dtype/enum_values можуть змінюватися (edit column), тож кеш перевіряється за ключем
+        key = (self.dtype, self.enum_values)
+        if self._compiled is None or self._compiled[0] != key:
+            factory = VALIDATOR_FACTORIES.get(self.dtype, _unsupported_validator)
+            validate = factory(self)
+            key = (self.dtype, list(self.enum_values) if self.enum_values is not None else None)
+            self._compiled = (key, validate, _batch_validator(self.dtype, validate))
+        return self._compiled
+
+    def validator(self) -> Validator:
+        if profiling.enabled:
+            return profiling.counting_validator(self.dtype, self._compile()[1])
+        return self._compile()[1]
+
+    def batch_validator(self) -> Callable[[List[Any]], List[Any]]:
+        if profiling.enabled:
+            return profiling.counting_batch(self.dtype, self._compile()[2])
+        return self._compile()[2]
 
     def validate(self, value: Any) -> Any:
-        if value is None:
-            return None
-        if self.dtype == "integer":
-            if isinstance(value, bool):
-                raise ValueError("Boolean is not allowed for integer")
-            try:
-                return int(value)
-            except Exception:
-                raise ValueError(f"'{value}' is not a valid integer")
-        elif self.dtype == "real":
-            try:
-                return float(value)
-            except Exception:
-                raise ValueError(f"'{value}' is not a valid real")
-        elif self.dtype == "char":
-            s = str(value)
-            if len(s) != 1:
-                raise ValueError(f"'{value}' is not a single character")
-            return s
-        elif self.dtype == "string":
-            return str(value)
-        elif self.dtype == "email":
-            s = str(value)
-            if not EMAIL_RE.match(s):
-                raise ValueError(f"'{value}' is not a valid email")
-            return s
-        elif self.dtype == "enum":
-            if not self.enum_values:
-                raise ValueError("Enum column must have predefined values")
-            s = str(value)
-            if s not in self.enum_values:
-                raise ValueError(f"'{value}' is not in enum {self.enum_values}")
-            return s
-        else:
-            raise ValueError(f"Unsupported dtype: {self.dtype}")
+        return self.validator()(value)
+
+    def schema(self) -> Dict[str, Any]:
+        d = {"name": self.name, "dtype": self.dtype, "enum_values": self.enum_values}
+        if self.default is not None:
+            d["default"] = self.default
+        return d
+
+# лічильники на весь процес: version після зміни ніколи не повторюється, тож таблиця та її
+# знімок, змінені незалежно, не отримають однакового стану (див. Table.state, cache.py)
+_versions = itertools.count(1)
+_uids = itertools.count(1)
+# група таблиць, що ділять рядки (Table._sharers), змінюється лише під цим замком: знімок
+# і таблиця можуть мати різні замки
+_share_lock = threading.Lock()
+
+def _mutation(method: Callable[..., Any]) -> Callable[..., Any]:
+    # зміна таблиці: під замком (спільним для бази, див. Database.adopt); відкриті транзакції,
+    # що ще не мають знімка таблиці, отримують його до зміни; рядки, які ще тримає живий
+    # знімок (Table.snapshot), спершу копіюються; після успіху version стає новою
+    @functools.wraps(method)
+    def wrapper(self: "Table", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._before_write is not None:
+                self._before_write(self)
+            if self._sharers is not None:
+                self._unshare()
+            if profiling.enabled:
+                t0 = time.perf_counter()
+                result = method(self, *args, **kwargs)
+                profiling.record(name, time.perf_counter() - t0)
+            else:
+                result = method(self, *args, **kwargs)
+            self.version = next(_versions)
+            return result
+    name = f"Table.{method.__name__}"
+    return wrapper
 
 @dataclass
 class Table:
     name: str
     columns: List[Column] = field(default_factory=list)
     rows: List[Dict[str, Any]] = field(default_factory=list)
+    indexes: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    listeners: List[Listener] = field(default_factory=list, repr=False, compare=False)
+    # Онлайн-зміни схеми для рядків-dict: нова колонка не дописується в кожен рядок —
+    # відсутній ключ читається як default (_pending); видалена колонка лишає свій ключ
+    # у рядках (_dropped) до compact(). Читати рядки поточної схеми — через row()/iter_rows()
+    schema_version: int = field(default=0, repr=False, compare=False)
+    _pending: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _dropped: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Знімки для транзакцій (transactions.py): знімок ділить список рядків із таблицею,
+    # а перший запис будь-якої сторони копіює його (copy-on-write). Рядки-dict після
+    # вставки не змінюються на місці — лише замінюються новими. _sharers — спільний для
+    # таблиці та всіх її знімків список weakref: копіюється лише те, що ще тримає живий
+    # знімок, тож завершена й забута транзакція запису не сповільнює. version змінюється
+    # з кожною зміною; _uid спільний для таблиці та її знімків
+    version: int = field(default=0, repr=False, compare=False)
+    _uid: int = field(default_factory=lambda: next(_uids), init=False, repr=False, compare=False)
+    _sharers: Optional[List[Any]] = field(default=None, init=False, repr=False, compare=False)
+    _before_write: Optional[Callable[["Table"], None]] = field(default=None, init=False, repr=False, compare=False)
+    _lock: Any = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    # Стабільні id рядків. Поки рядки лише додавались, id рядка дорівнює його слоту в rows
+    # (_ids is None); масив id за слотами з'являється при першому зсуві слотів і завжди
+    # зростає, тож слот за id шукається бінарним пошуком. Видалений рядок-dict лишається
+    # надгробком (_dead — відсортовані слоти): інші рядки й індекси не зсуваються, а
+    # позиція рядка — це його номер серед живих. Надгробки прибирає _purge(), коли їх
+    # більше PURGE_RATIO, а також compact(). Індекси зберігають слоти, а не позиції
+    _ids: Optional[array] = field(default=None, init=False, repr=False, compare=False)
+    _next_id: int = field(default=0, init=False, repr=False, compare=False)
+    _dead: List[int] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def _notify(self, op: str, *args: Any) -> None:
+        for fn in self.listeners:
+            fn(self, op, args)
+
+    def _stale(self) -> bool:
+        return bool(self._pending or self._dropped or self._dead) and isinstance(self.rows, list)
+
+    def _schema_stale(self) -> bool:
+        return bool(self._pending or self._dropped) and isinstance(self.rows, list)
+
+    def _shape(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        names = self.column_names()
+        pending = self._pending
+        return lambda r: {n: r[n] if n in r else pending.get(n) for n in names}
+
+    def row_count(self) -> int:
+        return len(self.rows) - len(self._dead)
+
+    def _slot(self, index: int) -> int:
+        # позиція серед живих рядків -> слот у rows
+        if not (0 <= index < self.row_count()):
+            raise IndexError("Row index out of range")
+        dead = self._dead
+        if not dead:
+            return index
+        # найменший слот, до якого включно index + 1 живих рядків
+        lo, hi = index, index + len(dead)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid + 1 - bisect_right(dead, mid) > index:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _is_dead(self, slot: int) -> bool:
+        dead = self._dead
+        i = bisect_left(dead, slot)
+        return i < len(dead) and dead[i] == slot
+
+    def _position(self, slot: int) -> int:
+        return slot - bisect_left(self._dead, slot)
+
+    def _slot_row(self, slot: int) -> Dict[str, Any]:
+        r = self.rows[slot]
+        return self._shape()(r) if self._schema_stale() else r
+
+    def _live_rows(self) -> Iterator[Dict[str, Any]]:
+        # сирі рядки без надгробків: шматки списку між видаленими слотами
+        rows = self.rows
+        if not self._dead:
+            return iter(rows)
+        bounds = [-1] + self._dead + [len(rows)]
+        return (r for a, b in zip(bounds, bounds[1:]) for r in rows[a + 1:b])
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if not self._stale():
+            return self.rows[index]
+        return self._slot_row(self._slot(index))
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        if not self._stale():
+            return iter(self.rows)
+        if not self._schema_stale():
+            return self._live_rows()
+        return map(self._shape(), self._live_rows())
+
+    def _id_array(self) -> array:
+        # матеріалізує/дописує id для слотів, доданих після останнього звернення
+        with self._lock:
+            ids = self._ids
+            n = len(self.rows)
+            if ids is None:
+                ids = self._ids = array("q", range(n))
+                self._next_id = n
+            elif len(ids) < n:
+                added = n - len(ids)
+                ids.extend(range(self._next_id, self._next_id + added))
+                self._next_id += added
+            return ids
+
+    def _slot_id(self, slot: int) -> int:
+        return slot if self._ids is None else self._id_array()[slot]
+
+    def _id_slot(self, row_id: int) -> int:
+        if self._ids is None:
+            slot = row_id if 0 <= row_id < len(self.rows) else -1
+        else:
+            ids = self._id_array()
+            slot = bisect_left(ids, row_id)
+            if slot == len(ids) or ids[slot] != row_id:
+                slot = -1
+        if slot < 0 or self._is_dead(slot):
+            raise ValueError(f"No row with id {row_id}")
+        return slot
+
+    def row_id(self, index: int) -> int:
+        return self._slot_id(self._slot(index))
+
+    def position(self, row_id: int) -> int:
+        return self._position(self._id_slot(row_id))
+
+    def get(self, row_id: int) -> Dict[str, Any]:
+        return self._slot_row(self._id_slot(row_id))
+
+    def update(self, row_id: int, values: Dict[str, Any]) -> None:
+        with self._lock:
+            self.edit_row(self.position(row_id), values)
+
+    def delete(self, row_id: int) -> None:
+        with self._lock:
+            self.delete_row(self.position(row_id))
+
+    def _purge(self) -> None:
+        # ущільнення: прибирає надгробки одним проходом, id і слоти в індексах перераховуються
+        dead = self._dead
+        if not dead:
+            return
+        ids = self._id_array()
+        keep = self._live_rows()
+        bounds = [-1] + dead + [len(ids)]
+        self._ids = array("q", (i for a, b in zip(bounds, bounds[1:]) for i in ids[a + 1:b]))
+        self.rows = list(keep)
+        for idx in self.indexes.values():
+            idx.renumber(dead)
+        self._dead = []
+
+    def snapshot(self) -> "Table":
+        # незмінний для читача стан таблиці: без індексів і слухачів, рядки спільні до першого запису
+        with self._lock:
+            t = Table(self.name, [Column(c.name, c.dtype, list(c.enum_values) if c.enum_values is not None else None,
+                                         c.default) for c in self.columns], self.rows)
+            t._pending = dict(self._pending)
+            t._dropped = set(self._dropped)
+            if self._ids is not None:
+                self._id_array()
+            t._ids, t._next_id, t._dead = self._ids, self._next_id, list(self._dead)
+            t.schema_version = self.schema_version
+            t.version = self.version
+            t._uid = self._uid
+            with _share_lock:
+                group = self._sharers
+                if group is None:
+                    group = self._sharers = [weakref.ref(self)]
+                elif len(group) >= 32:
+                    group[:] = [r for r in group if r() is not None]
+                group.append(weakref.ref(t))
+                t._sharers = group
+            return t
+
+    def _unshare(self) -> None:
+        # таблиця виходить із групи знімків, копіюючи рядки й id, лише якщо їх ще тримає живий знімок
+        with _share_lock:
+            peers = [s for s in (r() for r in self._sharers) if s is not None and s is not self]
+            self._sharers = None
+        if any(s.rows is self.rows for s in peers):
+            self.rows = list(self.rows) if isinstance(self.rows, list) else self.rows.copy()
+        if self._ids is not None and any(s._ids is self._ids for s in peers):
+            self._ids = array("q", self._ids)
+
+    def state(self) -> Tuple[int, int, int]:
+        # однаковий стан — однакові рядки й схема (ключ кешу результатів, cache.py)
+        return self._uid, self.version, self.schema_version
+
+    @_mutation
+    def compact(self, batch_size: int = 10000, progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
+        # прибирає надгробки, дописує відкладені default і прибирає ключі видалених колонок;
+        # переривання (виняток із progress) безпечне — оброблені рядки читаються так само
+        self._purge()
+        if not self._stale():
+            return
+        shape = self._shape()
+        rows = self.rows
+        total = len(rows)
+        for start in range(0, total, batch_size):
+            rows[start:start + batch_size] = list(map(shape, rows[start:start + batch_size]))
+            if progress is not None:
+                progress(min(start + batch_size, total), total)
+        self._pending.clear()
+        self._dropped.clear()
 
     def column_names(self) -> List[str]:
         return [c.name for c in self.columns]
 
+    def _column(self, name: str) -> Column:
+        for c in self.columns:
+            if c.name == name:
+                return c
+        raise ValueError(f"No such column '{name}'")
+
+    def _column_values(self, name: str):
+        if not isinstance(self.rows, list):
+            return self.rows.column_values(name)
+        if name in self._pending:
+            d = self._pending[name]
+            return (r.get(name, d) for r in self._live_rows())
+        return (r.get(name) for r in self._live_rows())
+
+    @_mutation
+    def create_index(self, column: str, kind: str = "hash") -> None:
+        self._column(column)
+        self._purge()
+        idx = make_index(column, kind)
+        idx.build(self._column_values(column))
+        self.indexes[column] = idx
+        if self.listeners:
+            self._notify("create_index", column, kind)
+
+    @_mutation
+    def drop_index(self, column: str) -> None:
+        if column not in self.indexes:
+            raise ValueError(f"No index on column '{column}'")
+        del self.indexes[column]
+        if self.listeners:
+            self._notify("drop_index", column)
+
+    def find(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        value = self._column(column).validate(value)
+        idx = self.indexes.get(column)
+        if idx is not None:
+            return [self._slot_row(p) for p in sorted(idx.lookup(value))]
+        return [r for r in self.iter_rows() if r.get(column) == value]
+
+    def find_range(self, column: str, lo: Any = None, hi: Any = None) -> List[Dict[str, Any]]:
+        col = self._column(column)
+        lo, hi = col.validate(lo), col.validate(hi)
+        idx = self.indexes.get(column)
+        if idx is not None and idx.kind == "sorted":
+            return [self._slot_row(p) for p in sorted(idx.range(lo, hi))]
+        return [r for r in self.iter_rows()
+                if r.get(column) is not None
+                and (lo is None or r.get(column) >= lo)
+                and (hi is None or r.get(column) <= hi)]
+
+    @_mutation
     def add_column(self, column: Column) -> None:
         if column.name in self.column_names():
             raise ValueError(f"Column '{column.name}' already exists")
+        default = column.validate(column.default)
+        if not isinstance(self.rows, list):
+            self.rows.add_column(column, default)
+        else:
+            if column.name in self._dropped:
+                # старі значення видаленої колонки з тією ж назвою не мають «воскреснути»
+                name = column.name
+                rows = self.rows
+                for i, r in enumerate(rows):
+                    if name in r:
+                        rows[i] = {k: v for k, v in r.items() if k != name}
+                self._dropped.discard(column.name)
+            self._pending[column.name] = default
         self.columns.append(column)
-        for r in self.rows:
-            r[column.name] = None
+        self.schema_version += 1
+        if self.listeners:
+            self._notify("add_column", column.schema())
 
+    @_mutation
     def delete_column(self, name: str) -> None:
         idx = None
         for i, c in enumerate(self.columns):
@@ -72,65 +493,296 @@ class Table:
         if idx is None:
             raise ValueError(f"No such column '{name}'")
         self.columns.pop(idx)
-        for r in self.rows:
-            r.pop(name, None)
+        self.indexes.pop(name, None)
+        if not isinstance(self.rows, list):
+            self.rows.drop_column(name)
+        else:
+            self._pending.pop(name, None)
+            self._dropped.add(name)
+        self.schema_version += 1
+        if self.listeners:
+            self._notify("delete_column", name)
 
-    def add_row(self, values: Dict[str, Any]) -> None:
+    def check_conversion(self, name: str, dtype: str, enum_values: Optional[List[str]] = None,
+                         progress: Optional[Callable[[int, Optional[int]], None]] = None) -> List[Tuple[int, str]]:
+        # усі значення, які не перетворюються в новий тип: [(позиція рядка, помилка)]; таблиця не змінюється
+        self._column(name)
+        validate = Column(name, dtype, enum_values).validator()
+        errors: List[Tuple[int, str]] = []
+        total = self.row_count()
+        for i, v in enumerate(self._column_values(name)):
+            try:
+                validate(v)
+            except ValueError as e:
+                errors.append((i, str(e)))
+            if progress is not None and (i + 1) % 10000 == 0:
+                progress(i + 1, total)
+        return errors
+
+    @_mutation
+    def convert_column(self, name: str, dtype: str, enum_values: Optional[List[str]] = None,
+                       progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
+        col = self._column(name)
+        target = Column(name, dtype, enum_values)
+        validate = target.validator()
+        default = validate(col.default)
+        # спершу перевіряємо всі значення: помилка чи скасування через progress нічого не змінюють
+        converted: List[Any] = []
+        total = self.row_count()
+        for v in self._column_values(name):
+            converted.append(validate(v))
+            if progress is not None and len(converted) % 10000 == 0:
+                progress(len(converted), total)
+        col.dtype = dtype
+        col.enum_values = enum_values
+        col.default = default
+        if not isinstance(self.rows, list):
+            self.rows.replace_column(col, converted)
+        else:
+            self._purge()
+            rows = self.rows
+            for i, v in enumerate(converted):
+                rows[i] = {**rows[i], name: v}
+            self._pending.pop(name, None)
+        if name in self.indexes:
+            idx = make_index(name, self.indexes[name].kind)
+            idx.build(self._column_values(name))
+            self.indexes[name] = idx
+        self.schema_version += 1
+        if self.listeners:
+            self._notify("convert_column", name, dtype, enum_values)
+
+    @_mutation
+    def add_row(self, values: Dict[str, Any]) -> int:
+        # повертає id нового рядка
         row = {}
         for col in self.columns:
-            val = values.get(col.name)
-            row[col.name] = col.validate(val) if val is not None else None
+            row[col.name] = col.validate(values.get(col.name))
         self.rows.append(row)
+        slot = len(self.rows) - 1
+        for name, idx in self.indexes.items():
+            idx.insert(slot, row[name])
+        if self.listeners:
+            self._notify("add_row", row)
+        return self._slot_id(slot)
+
+    @_mutation
+    def add_rows(self, rows: Iterable[Dict[str, Any]], batch_size: int = 10000) -> List[Tuple[int, str]]:
+        errors: List[Tuple[int, str]] = []
+        batch: List[Dict[str, Any]] = []
+        start = 0
+        for values in rows:
+            batch.append(values)
+            if len(batch) >= batch_size:
+                self._add_batch(batch, start, errors)
+                start += len(batch)
+                batch = []
+        if batch:
+            self._add_batch(batch, start, errors)
+        return errors
 
+    def _add_batch(self, batch: List[Dict[str, Any]], start: int, errors: List[Tuple[int, str]]) -> None:
+        names = self.column_names()
+        bad: Dict[int, str] = {}
+        columns = []
+        for col in self.columns:
+            validate = col.validator()
+            raw = [values.get(col.name) for values in batch]
+            try:
+                columns.append(col.batch_validator()(raw))
+                continue
+            except Exception:
+                pass
+            out = []
+            for i, v in enumerate(raw):
+                try:
+                    out.append(validate(v))
+                except ValueError as e:
+                    bad.setdefault(i, f"{col.name}: {e}")
+                    out.append(None)
+            columns.append(out)
+        new_rows = [dict(zip(names, vals)) for vals in zip(*columns)] if columns else [{} for _ in batch]
+        if bad:
+            new_rows = [r for i, r in enumerate(new_rows) if i not in bad]
+            errors.extend((start + i, msg) for i, msg in sorted(bad.items()))
+        pos = len(self.rows)
+        self.rows.extend(new_rows)
+        for name, idx in self.indexes.items():
+            idx.extend(pos, [r[name] for r in new_rows])
+        if self.listeners and new_rows:
+            self._notify("add_rows", new_rows)
+
+    @_mutation
     def edit_row(self, index: int, values: Dict[str, Any]) -> None:
-        if not (0 <= index < len(self.rows)):
-            raise IndexError("Row index out of range")
-        current = self.rows[index].copy()
+        slot = self._slot(index)
+        old = self._slot_row(slot)
+        current = dict(old)
+        cols = {c.name: c for c in self.columns}
         for k, v in values.items():
-            if k not in self.column_names():
+            col = cols.get(k)
+            if col is None:
                 continue
-            col = next(c for c in self.columns if c.name == k)
-            current[k] = col.validate(v) if v is not None else None
-        self.rows[index] = current
+            current[k] = col.validate(v)
+        self.rows[slot] = current
+        for name, idx in self.indexes.items():
+            idx.update(slot, old.get(name), current.get(name))
+        if self.listeners:
+            self._notify("edit_row", index, current)
 
+    @_mutation
     def delete_row(self, index: int) -> None:
-        if not (0 <= index < len(self.rows)):
-            raise IndexError("Row index out of range")
-        self.rows.pop(index)
+        slot = self._slot(index)
+        row = self._slot_row(slot)
+        if isinstance(self.rows, list):
+            # надгробок: слоти інших рядків і записи індексів не зсуваються
+            insort(self._dead, slot)
+            for name, idx in self.indexes.items():
+                idx.remove(slot, row.get(name))
+            if len(self._dead) >= PURGE_MIN and len(self._dead) > PURGE_RATIO * len(self.rows):
+                self._purge()
+        else:
+            # id і індекси змінюються лише після того, як рядок вийшов зі сховища:
+            # помилка pop не розсинхронізує їх із рядками
+            ids = self._id_array()
+            self.rows.pop(slot)
+            del ids[slot]
+            for name, idx in self.indexes.items():
+                idx.delete_at(slot, row.get(name))
+        if self.listeners:
+            self._notify("delete_row", index)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def schema_dict(self) -> Dict[str, Any]:
+        d = {
             "name": self.name,
             "columns": [
-                {"name": c.name, "dtype": c.dtype, "enum_values": c.enum_values}
-                for c in self.columns
+                c.schema() for c in self.columns
             ],
-            "rows": self.rows,
         }
+        if self.indexes:
+            d["indexes"] = {name: idx.kind for name, idx in self.indexes.items()}
+        return d
+
+    @profiling.timed("Table.to_dict")
+    def to_dict(self) -> Dict[str, Any]:
+        d = self.schema_dict()
+        d["rows"] = self.rows if isinstance(self.rows, list) and not self._stale() else list(self.iter_rows())
+        return d
+
+    def intern_strings(self, sample: int = 1024) -> None:
+        # однакові значення текстових колонок стають одним об'єктом str. Колонка, де серед
+        # перших sample рядків більше половини різних значень, пропускається — там нема чого ділити
+        if not isinstance(self.rows, list):
+            intern = getattr(self.rows, "intern_strings", None)
+            if intern is not None:
+                intern(self.columns, sample)
+            return
+        for col in self.columns:
+            if col.dtype not in INTERNED_DTYPES:
+                continue
+            name = col.name
+            seen: Dict[str, str] = {v: v for v in col.enum_values or []} if col.dtype == "enum" else {}
+            base = len(seen)
+            for i, r in enumerate(self.rows):
+                v = r.get(name)
+                if v.__class__ is str:
+                    r[name] = seen.setdefault(v, v)
+                if i == sample and len(seen) - base > sample // 2:
+                    break
 
     @staticmethod
-    def from_dict(d: Dict[str, Any]) -> "Table":
+    @profiling.timed("Table.from_dict")
+    def from_dict(d: Dict[str, Any], compact: bool = False) -> "Table":
+        # compact — рядки-кортежі (rowstore.TupleStore) замість копій dict
         t = Table(name=d["name"])
         t.columns = [Column(**c) for c in d["columns"]]
-        t.rows = [dict(r) for r in d.get("rows", [])]
+        if compact:
+            from rowstore import compact_rows
+            t.rows = compact_rows(t.columns, d.get("rows", []))
+        else:
+            t.rows = [dict(r) for r in d.get("rows", [])]
+        t.intern_strings()
+        for name, kind in d.get("indexes", {}).items():
+            t.create_index(name, kind)
         return t
 
 @dataclass
 class Database:
     name: str
     tables: Dict[str, Table] = field(default_factory=dict)
+    listeners: List[Listener] = field(default_factory=list, repr=False, compare=False)
+    # номер останнього запису журналу змін, уже врахованого у файлі бази (див. wal.py)
+    lsn: int = field(default=0, repr=False, compare=False)
+    # необов'язковий кеш результатів query() (cache.ResultCache)
+    cache: Any = field(default=None, repr=False, compare=False)
+    # один замок на базу: зміни таблиць, знімки й commit транзакцій
+    _lock: Any = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    # таблиці-знімки відкритих транзакцій (transactions.SnapshotTables), що знімають таблиці ліниво
+    _open: Any = field(default_factory=weakref.WeakValueDictionary, init=False, repr=False, compare=False)
+
+    def _notify(self, op: str, *args: Any) -> None:
+        for fn in self.listeners:
+            fn(self, op, args)
+
+    def _on_table_event(self, table: Table, op: str, args: Tuple[Any, ...]) -> None:
+        for fn in self.listeners:
+            fn(table, op, args)
+
+    def adopt(self, table: Table) -> Table:
+        # підписує таблицю на пересилання подій до слухачів бази
+        if self._on_table_event not in table.listeners:
+            table.listeners.append(self._on_table_event)
+        table._lock = self._lock
+        table._before_write = self._before_write
+        return table
+
+    def _before_write(self, table: Table) -> None:
+        # під замком бази, перед зміною, перейменуванням чи видаленням таблиці
+        if self._open:
+            for tables in self._open.values():
+                tables.pin(table)
 
     def create_table(self, name: str) -> Table:
-        if name in self.tables:
-            raise ValueError(f"Table '{name}' already exists")
-        t = Table(name=name)
-        self.tables[name] = t
-        return t
+        with self._lock:
+            if name in self.tables:
+                raise ValueError(f"Table '{name}' already exists")
+            t = self.adopt(Table(name=name))
+            self.tables[name] = t
+            self._notify("create_table", name)
+            return t
+
+    def add_table(self, table: Table) -> Table:
+        with self._lock:
+            if table.name in self.tables:
+                raise ValueError(f"Table '{table.name}' already exists")
+            self.tables[table.name] = self.adopt(table)
+            if self.listeners:
+                self._notify("add_table", table.to_dict())
+            return table
+
+    def rename_table(self, old: str, new: str) -> None:
+        with self._lock:
+            if old not in self.tables:
+                raise ValueError(f"No such table '{old}'")
+            if new == old:
+                return
+            if new in self.tables:
+                raise ValueError(f"Table '{new}' already exists")
+            self._before_write(self.tables[old])
+            t = self.tables.pop(old)
+            t.name = new
+            self.tables[new] = t
+            self._notify("rename_table", old, new)
 
     def delete_table(self, name: str) -> None:
-        if name not in self.tables:
-            raise ValueError(f"No such table '{name}'")
-        del self.tables[name]
+        with self._lock:
+            if name not in self.tables:
+                raise ValueError(f"No such table '{name}'")
+            self._before_write(self.tables[name])
+            t = self.tables.pop(name)
+            if self._on_table_event in t.listeners:
+                t.listeners.remove(self._on_table_event)
+            t._before_write = None
+            self._notify("delete_table", name)
 
     def get_table(self, name: str) -> Table:
         if name not in self.tables:
@@ -140,6 +792,18 @@ class Database:
     def list_tables(self) -> List[str]:
         return list(self.tables.keys())
 
+    def query(self, sql: str) -> List[Dict[str, Any]]:
+        from query import execute, parse
+        if self.cache is None:
+            return execute(self, sql)
+        q = parse(self, sql)
+        return self.cache.get_or_compute("query", (q.table,), (sql,), q.rows)
+
+    def begin(self) -> Any:
+        from transactions import Transaction
+        return Transaction(self)
+
+    @profiling.timed("Database.to_dict")
     def to_dict(self) -> Dict[str, Any]:
         return {
             "name": self.name,
@@ -147,38 +811,29 @@ class Database:
         }
 
     @staticmethod
-    def from_dict(d: Dict[str, Any]) -> "Database":
+    @profiling.timed("Database.from_dict")
+    def from_dict(d: Dict[str, Any], compact: bool = False) -> "Database":
         db = Database(name=d["name"])
         for k, tv in d.get("tables", {}).items():
-            db.tables[k] = Table.from_dict(tv)
+            db.tables[k] = db.adopt(Table.from_dict(tv, compact))
         return db
 
-def join_tables(left: Table, right: Table, key: str, suffixes: Tuple[str, str] = ("_x", "_y")) -> Table:
-    if key not in left.column_names() or key not in right.column_names():
-        raise ValueError(f"Join key '{key}' must exist in both tables")
-    out_cols: List[Column] = []
-    left_names = left.column_names()
-    for c in left.columns:
-        out_cols.append(Column(name=c.name, dtype=c.dtype, enum_values=c.enum_values))
-    for c in right.columns:
-        if c.name == key and key in left_names:
-            continue
-        name = c.name if c.name not in left_names else c.name + suffixes[1]
-        out_cols.append(Column(name=name, dtype=c.dtype, enum_values=c.enum_values))
-    out = Table(name=f"{left.name}_JOIN_{right.name}", columns=out_cols)
-    idx: Dict[Any, List[Dict[str, Any]]] = {}
-    for rr in right.rows:
-        idx.setdefault(rr.get(key), []).append(rr)
-    for lr in left.rows:
-        matches = idx.get(lr.get(key), [])
-        for rr in matches:
-            merged: Dict[str, Any] = {}
-            for c in left.columns:
-                merged[c.name] = lr.get(c.name)
-            for c in right.columns:
-                if c.name == key and key in left_names:
-                    continue
-                name = c.name if c.name not in left_names else c.name + suffixes[1]
-                merged[name] = rr.get(c.name)
-            out.rows.append(merged)
-    return out
+def join_tables(left: Table, right: Table, key: str, suffixes: Tuple[str, str] = ("_x", "_y"), lazy: bool = False,
+                cache: Any = None, compact: bool = False):
+    # compact — результат у рядках-кортежах (rowstore.TupleStore)
+    from joins import JoinCursor, JoinPlan, iter_join
+    if cache is None:
+        cursor = iter_join(left, right, key, suffixes=suffixes, compact=compact)
+        return cursor if lazy else cursor.to_table()
+    # назви таблиць — частина ключа: від них залежить назва результату
+    args = (key, tuple(suffixes), left.name, right.name, compact)
+    if not lazy:
+        return cache.get_or_compute("join", (left, right), args,
+                                    lambda: iter_join(left, right, key, suffixes=suffixes, compact=compact).to_table())
+    hit = cache.get("join", (left, right), args)
+    if hit is not None:
+        return JoinCursor(JoinPlan(left, right, [key], suffixes), iter(hit.rows), f"{left.name}_JOIN_{right.name}")
+    states = cache.key("join", (left, right), args)
+    cursor = iter_join(left, right, key, suffixes=suffixes, compact=compact)
+    cursor.on_complete = lambda t: cache.put("join", (left, right), args, t, states)
+    return cursor
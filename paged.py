@@ -0,0 +1,647 @@
+import itertools
+import json
+import marshal
+import os
+import struct
+import threading
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import Column, Database, Table
+
+# Сторінкове сховище таблиць поза пам'яттю (файли *.pages). Рядки таблиці — кортежі в
+# порядку колонок, упаковані в сторінки фіксованого розміру; у пам'яті тримаються лише
+# сторінки з BufferPool (LRU або CLOCK, ємність у сторінках), решта читається з диска за
+# потреби, а змінені сторінки записуються назад при витісненні. Сторінка 0 — заголовок із
+# номером першої сторінки каталогу (JSON: таблиці, схема, списки сторінок, кількості рядків).
+#
+# Сторінки мають лічильники посилань: знімок таблиці (copy-on-write) і останній записаний
+# каталог ділять сторінки зі сховищем, а запис у спільну сторінку спершу копіює її в нову.
+# Тож checkpoint (save) ніколи не перезаписує сторінки попереднього каталогу: нові сторінки
+# й каталог пишуться поруч, fsync, і лише потім заголовок перемикається на новий каталог.
+# Збій посередині лишає файл у стані попереднього checkpoint.
+#
+# Значення кодуються marshal версії 2 (без посилань між об'єктами): розмір списку кортежів
+# точно дорівнює 5 байтам заголовка плюс сумі розмірів кортежів, тож заповнення сторінки
+# рахується без повторного кодування.
+
+EXTENSION = ".pages"
+MAGIC = b"MDBPAGES"
+VERSION = 1
+DEFAULT_PAGE_SIZE = 64 * 1024
+DEFAULT_POOL_PAGES = 1024
+POLICIES = ("lru", "clock")
+
+_HEADER = struct.Struct("<8sIIQ")      # magic, version, page_size, перша сторінка каталогу
+_PAGE = struct.Struct("<I")            # довжина закодованого списку рядків
+_BLOB = struct.Struct("<QI")           # наступна сторінка ланцюжка (0 — кінець), довжина шматка
+_LIST_OVERHEAD = 5
+_MARSHAL = 2
+
+Row = Dict[str, Any]
+
+
+def is_paged_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == EXTENSION
+
+
+def _row_size(values: Tuple[Any, ...]) -> int:
+    return len(marshal.dumps(values, _MARSHAL))
+
+
+class _Frame:
+    __slots__ = ("rows", "nbytes", "dirty", "ref")
+
+    def __init__(self, rows: List[Tuple[Any, ...]], nbytes: int, dirty: bool):
+        self.rows = rows
+        self.nbytes = nbytes
+        self.dirty = dirty
+        self.ref = True
+
+
+class BufferPool:
+    # спільний для кількох файлів кеш сторінок; ключ — (файл, номер сторінки)
+    def __init__(self, capacity: int = DEFAULT_POOL_PAGES, policy: str = "clock"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unsupported eviction policy: {policy} (expected one of {', '.join(POLICIES)})")
+        if capacity < 2:
+            raise ValueError("Buffer pool needs at least 2 pages")
+        self.capacity = capacity
+        self.policy = policy
+        self.frames: "OrderedDict[Tuple[int, int], _Frame]" = OrderedDict()
+        self.files: Dict[int, "PageFile"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+        self._ring: List[Tuple[int, int]] = []
+        self._hand = 0
+        self._lock = threading.RLock()
+
+    def _victim(self) -> Tuple[int, int]:
+        if self.policy == "lru":
+            return next(iter(self.frames))
+        # CLOCK: стрілка проходить по кільцю, знімаючи біт звертання, до сторінки без нього
+        ring = self._ring
+        while True:
+            if self._hand >= len(ring):
+                self._hand = 0
+            key = ring[self._hand]
+            frame = self.frames.get(key)
+            if frame is None:
+                ring[self._hand] = ring[-1]
+                ring.pop()
+                continue
+            if frame.ref:
+                frame.ref = False
+                self._hand += 1
+                continue
+            ring[self._hand] = ring[-1]
+            ring.pop()
+            return key
+
+    def _admit(self, key: Tuple[int, int], frame: _Frame) -> None:
+        while len(self.frames) >= self.capacity:
+            victim = self._victim()
+            old = self.frames.pop(victim)
+            if old.dirty:
+                self.files[victim[0]]._write_page(victim[1], old.rows)
+                self.writes += 1
+            self.evictions += 1
+        self.frames[key] = frame
+        if self.policy == "clock":
+            self._ring.append(key)
+
+    def get(self, pf: "PageFile", page: int) -> _Frame:
+        key = (pf.id, page)
+        with self._lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.hits += 1
+                if self.policy == "lru":
+                    self.frames.move_to_end(key)
+                else:
+                    frame.ref = True
+                return frame
+            self.misses += 1
+            rows, nbytes = pf._read_page(page)
+            frame = _Frame(rows, nbytes, False)
+            self._admit(key, frame)
+            return frame
+
+    def put(self, pf: "PageFile", page: int, frame: _Frame) -> None:
+        # нова чи змінена сторінка; повертає до пулу кадр, витіснений під час зміни
+        key = (pf.id, page)
+        with self._lock:
+            frame.dirty = True
+            if self.frames.get(key) is frame:
+                if self.policy == "lru":
+                    self.frames.move_to_end(key)
+                return
+            self.frames.pop(key, None)
+            self._admit(key, frame)
+
+    def discard(self, pf: "PageFile", page: int) -> None:
+        with self._lock:
+            self.frames.pop((pf.id, page), None)
+
+    def flush(self, pf: "PageFile", pages: Optional[Iterable[int]] = None) -> int:
+        # pages — лише ці сторінки файлу (наприклад, сторінки знімка під час checkpoint)
+        with self._lock:
+            if pages is None:
+                keys = [k for k in self.frames if k[0] == pf.id]
+            else:
+                keys = [(pf.id, p) for p in pages]
+            n = 0
+            for key in keys:
+                frame = self.frames.get(key)
+                if frame is not None and frame.dirty:
+                    pf._write_page(key[1], frame.rows)
+                    frame.dirty = False
+                    n += 1
+            self.writes += n
+            return n
+
+    def drop_file(self, pf: "PageFile") -> None:
+        with self._lock:
+            for key in [k for k in self.frames if k[0] == pf.id]:
+                del self.frames[key]
+            self.files.pop(pf.id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"capacity": self.capacity, "policy": self.policy, "pages": len(self.frames),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions, "writes": self.writes,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None}
+
+
+_default_pool: Optional[BufferPool] = None
+
+
+def default_pool() -> BufferPool:
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BufferPool()
+    return _default_pool
+
+
+class PageFile:
+    _ids = itertools.count(1)
+
+    def __init__(self, path: str, pool: BufferPool, page_size: int = DEFAULT_PAGE_SIZE, create: bool = False):
+        if page_size < 1024:
+            raise ValueError("Page size must be at least 1024 bytes")
+        self.id = next(PageFile._ids)
+        self.path = path
+        self.pool = pool
+        self.refs: Dict[int, int] = {}
+        self.free: List[int] = []
+        self.catalog_pages: List[int] = []
+        self.closed = False
+        self._lock = threading.RLock()
+        # checkpoint-и одного файлу не перетинаються; записи в таблиці на нього не чекають
+        self.checkpointing = threading.Lock()
+        if create:
+            self.f = open(path, "w+b")
+            self.page_size = page_size
+            self.npages = 1
+            self._write_header(0)
+        else:
+            self.f = open(path, "r+b")
+            raw = self.f.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                self.f.close()
+                raise ValueError(f"'{path}' is not a {EXTENSION} file")
+            magic, version, self.page_size, _ = _HEADER.unpack(raw)
+            if magic != MAGIC:
+                self.f.close()
+                raise ValueError(f"'{path}' is not a {EXTENSION} file")
+            if version != VERSION:
+                self.f.close()
+                raise ValueError(f"Unsupported {EXTENSION} version {version}")
+            self.npages = max(1, -(-os.path.getsize(path) // self.page_size))
+        self.capacity = self.page_size - _PAGE.size
+        pool.files[self.id] = self
+
+    def _write_header(self, catalog_page: int) -> None:
+        self.f.seek(0)
+        self.f.write(_HEADER.pack(MAGIC, VERSION, self.page_size, catalog_page))
+
+    def _catalog_page(self) -> int:
+        self.f.seek(0)
+        return _HEADER.unpack(self.f.read(_HEADER.size))[3]
+
+    # --- сторінки
+    def alloc(self) -> int:
+        with self._lock:
+            if self.free:
+                page = self.free.pop()
+            else:
+                page = self.npages
+                self.npages += 1
+            self.refs[page] = 1
+            return page
+
+    def incref(self, pages: Iterable[int]) -> None:
+        with self._lock:
+            refs = self.refs
+            for p in pages:
+                refs[p] = refs.get(p, 0) + 1
+
+    def release(self, pages: Iterable[int]) -> None:
+        if self.closed:
+            return
+        with self._lock:
+            refs = self.refs
+            for p in pages:
+                n = refs.get(p, 0) - 1
+                if n > 0:
+                    refs[p] = n
+                else:
+                    refs.pop(p, None)
+                    self.pool.discard(self, p)
+                    self.free.append(p)
+
+    def shared(self, page: int) -> bool:
+        return self.refs.get(page, 0) > 1
+
+    def _read(self, page: int) -> bytes:
+        return os.pread(self.f.fileno(), self.page_size, page * self.page_size)
+
+    def _read_page(self, page: int) -> Tuple[List[Tuple[Any, ...]], int]:
+        raw = self._read(page)
+        (n,) = _PAGE.unpack_from(raw)
+        return marshal.loads(raw[_PAGE.size:_PAGE.size + n]), n
+
+    def _write_page(self, page: int, rows: List[Tuple[Any, ...]]) -> None:
+        data = marshal.dumps(rows, _MARSHAL)
+        if len(data) > self.capacity:
+            raise ValueError(f"Page {page} overflow: {len(data)} bytes")
+        os.pwrite(self.f.fileno(), _PAGE.pack(len(data)) + data, page * self.page_size)
+
+    # --- ланцюжки сторінок для каталогу й масивів id
+    def write_blob(self, data: bytes) -> List[int]:
+        chunk = self.page_size - _BLOB.size
+        parts = [data[i:i + chunk] for i in range(0, len(data), chunk)] or [b""]
+        pages = [self.alloc() for _ in parts]
+        for i, (page, part) in enumerate(zip(pages, parts)):
+            nxt = pages[i + 1] if i + 1 < len(pages) else 0
+            os.pwrite(self.f.fileno(), _BLOB.pack(nxt, len(part)) + part, page * self.page_size)
+        return pages
+
+    def read_blob(self, page: int) -> Tuple[bytes, List[int]]:
+        out, pages = [], []
+        while page:
+            raw = self._read(page)
+            nxt, n = _BLOB.unpack_from(raw)
+            out.append(raw[_BLOB.size:_BLOB.size + n])
+            pages.append(page)
+            page = nxt
+        return b"".join(out), pages
+
+    def sync(self) -> None:
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.pool.drop_file(self)
+        self.f.close()
+
+
+class PagedStore:
+    # сховище рядків Table (як ColumnStore/TupleStore): логічний список сторінок pages,
+    # кількість рядків у кожній (counts) і початкові позиції сторінок для пошуку рядка.
+    # Зміна сторінки триває під замком пулу, щоб інший потік не витіснив (і не записав)
+    # кадр посеред зміни.
+    def __init__(self, pf: PageFile, columns: List[Column], pages: Optional[List[int]] = None,
+                 counts: Optional[List[int]] = None):
+        self.pf = pf
+        self.names: List[str] = [c.name for c in columns]
+        self.pos: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        # pages змінюється лише на місці: за ним стежить finalize, що звільняє сторінки
+        self.pages: List[int] = pages if pages is not None else []
+        self.counts: List[int] = counts if counts is not None else []
+        self.size = sum(self.counts)
+        self._starts: Optional[array] = None
+        weakref.finalize(self, pf.release, self.pages).atexit = False
+
+    # --- позиції
+    def __len__(self) -> int:
+        return self.size
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += self.size
+        if not (0 <= index < self.size):
+            raise IndexError("Row index out of range")
+        starts = self._starts
+        if starts is None:
+            starts = self._starts = array("q", [0])
+            for n in self.counts[:-1]:
+                starts.append(starts[-1] + n)
+        li = bisect_right(starts, index) - 1
+        return li, index - starts[li]
+
+    def _frame(self, li: int) -> _Frame:
+        return self.pf.pool.get(self.pf, self.pages[li])
+
+    def _own(self, li: int) -> _Frame:
+        # сторінка, яку ділить знімок чи записаний каталог, перед зміною копіюється в нову
+        pf = self.pf
+        page = self.pages[li]
+        frame = pf.pool.get(pf, page)
+        if pf.shared(page):
+            new = pf.alloc()
+            frame = _Frame(list(frame.rows), frame.nbytes, True)
+            pf.pool.put(pf, new, frame)
+            self.pages[li] = new
+            pf.release([page])
+        return frame
+
+    def _store(self, li: int, frame: _Frame) -> None:
+        self.pf.pool.put(self.pf, self.pages[li], frame)
+
+    def _new_page(self, li: int, rows: List[Tuple[Any, ...]], nbytes: int) -> None:
+        page = self.pf.alloc()
+        self.pages.insert(li, page)
+        self.counts.insert(li, len(rows))
+        self.pf.pool.put(self.pf, page, _Frame(rows, nbytes, True))
+        self._starts = None
+
+    def _split(self, li: int, frame: _Frame) -> None:
+        # переповнена сторінка ділиться навпіл (за байтами), хвіст іде в нову сторінку після неї
+        sizes = [_row_size(t) for t in frame.rows]
+        half, acc, cut = sum(sizes) / 2, 0, 0
+        while cut < len(sizes) - 1 and acc + sizes[cut] <= half:
+            acc += sizes[cut]
+            cut += 1
+        cut = max(cut, 1)
+        tail = frame.rows[cut:]
+        del frame.rows[cut:]
+        frame.nbytes = _LIST_OVERHEAD + sum(sizes[:cut])
+        self.counts[li] = cut
+        self._store(li, frame)
+        tail_bytes = _LIST_OVERHEAD + sum(sizes[cut:])
+        self._new_page(li + 1, tail, tail_bytes)
+        if tail_bytes > self.pf.capacity:
+            self._split(li + 1, self._frame(li + 1))
+        if frame.nbytes > self.pf.capacity:
+            self._split(li, frame)
+
+    # --- протокол сховища Table
+    def __getitem__(self, index: int) -> Row:
+        li, off = self._locate(index)
+        return dict(zip(self.names, self._frame(li).rows[off]))
+
+    def __setitem__(self, index: int, row: Row) -> None:
+        li, off = self._locate(index)
+        values = tuple(map(row.get, self.names))
+        size = self._checked_size(values)
+        with self.pf.pool._lock:
+            frame = self._own(li)
+            frame.nbytes += size - _row_size(frame.rows[off])
+            frame.rows[off] = values
+            self._store(li, frame)
+            if frame.nbytes > self.pf.capacity:
+                self._split(li, frame)
+
+    def __iter__(self) -> Iterator[Row]:
+        names = self.names
+        for values in self.tuples():
+            yield dict(zip(names, values))
+
+    def tuples(self) -> Iterator[Tuple[Any, ...]]:
+        # сторінка за сторінкою через пул; список сторінок фіксується на початку проходу
+        pf, pages = self.pf, list(self.pages)
+        get = pf.pool.get
+        for page in pages:
+            yield from get(pf, page).rows
+
+    def append(self, row: Row) -> None:
+        self._append(tuple(map(row.get, self.names)))
+
+    def _checked_size(self, values: Tuple[Any, ...]) -> int:
+        size = _row_size(values)
+        if size + _LIST_OVERHEAD > self.pf.capacity:
+            raise ValueError(f"Row is larger than a page ({size} > {self.pf.capacity - _LIST_OVERHEAD} bytes)")
+        return size
+
+    def _append(self, values: Tuple[Any, ...]) -> None:
+        size = self._checked_size(values)
+        li = len(self.pages) - 1
+        with self.pf.pool._lock:
+            if li < 0 or self._frame(li).nbytes + size > self.pf.capacity:
+                self._new_page(li + 1, [values], _LIST_OVERHEAD + size)
+            else:
+                frame = self._own(li)
+                frame.rows.append(values)
+                frame.nbytes += size
+                self.counts[li] += 1
+                self._store(li, frame)
+        self.size += 1
+
+    def extend(self, rows: Iterable[Row]) -> None:
+        names = self.names
+        for r in rows:
+            self._append(tuple(map(r.get, names)))
+
+    def pop(self, index: int = -1) -> Row:
+        li, off = self._locate(index)
+        with self.pf.pool._lock:
+            frame = self._own(li)
+            values = frame.rows.pop(off)
+            frame.nbytes -= _row_size(values)
+            self.counts[li] -= 1
+            if self.counts[li] == 0:
+                page = self.pages.pop(li)
+                self.counts.pop(li)
+                self.pf.release([page])
+            else:
+                self._store(li, frame)
+        self.size -= 1
+        self._starts = None
+        return dict(zip(self.names, values))
+
+    def copy(self) -> "PagedStore":
+        # copy-on-write на рівні сторінок: нове сховище ділить усі сторінки
+        self.pf.incref(self.pages)
+        s = PagedStore(self.pf, [], list(self.pages), list(self.counts))
+        s.names, s.pos = list(self.names), dict(self.pos)
+        return s
+
+    def _rewrite(self, fn: Callable[[List[Tuple[Any, ...]]], List[Tuple[Any, ...]]]) -> None:
+        # схема змінюється переписуванням кожної сторінки; переповнені сторінки діляться
+        li = 0
+        lock = self.pf.pool._lock
+        while li < len(self.pages):
+            with lock:
+                frame = self._own(li)
+                frame.rows[:] = fn(frame.rows)
+                frame.nbytes = _LIST_OVERHEAD + sum(map(_row_size, frame.rows))
+                self._store(li, frame)
+                before = len(self.pages)
+                if frame.nbytes > self.pf.capacity:
+                    self._split(li, frame)
+            li += 1 + len(self.pages) - before
+
+    def _rename(self, names: List[str]) -> None:
+        self.names = names
+        self.pos = {n: i for i, n in enumerate(names)}
+
+    def add_column(self, column: Column, default: Any = None) -> None:
+        tail = (default,)
+        self._rewrite(lambda rows: [t + tail for t in rows])
+        self._rename(self.names + [column.name])
+
+    def drop_column(self, name: str) -> None:
+        p = self.pos.get(name)
+        if p is None:
+            return
+        self._rewrite(lambda rows: [t[:p] + t[p + 1:] for t in rows])
+        self._rename(self.names[:p] + self.names[p + 1:])
+
+    def replace_column(self, column: Column, values: Iterable[Any]) -> None:
+        p = self.pos[column.name]
+        it = iter(values)
+        self._rewrite(lambda rows: [t[:p] + (v,) + t[p + 1:] for t, v in zip(rows, it)])
+
+    def column_values(self, name: str) -> Iterator[Any]:
+        if name not in self.pos:
+            raise ValueError(f"No such column '{name}'")
+        return map(itemgetter(self.pos[name]), self.tuples())
+
+    @property
+    def memory_rows(self) -> int:
+        # скільки рядків уміщує приблизно половина пулу — межа для з'єднання в пам'яті (joins._choose)
+        per_page = self.size / len(self.pages) if self.pages else 0
+        return int(per_page * self.pf.pool.capacity / 2)
+
+
+# --- відкриття і checkpoint -------------------------------------------------------
+
+def _files(db: Database) -> List[PageFile]:
+    return list({id(t.rows.pf): t.rows.pf for t in db.tables.values() if isinstance(t.rows, PagedStore)}.values())
+
+
+def make_paged(table: Table, pf: PageFile) -> Table:
+    # рядки таблиці переносяться в сторінки файлу pf
+    if isinstance(table.rows, PagedStore) and table.rows.pf is pf:
+        return table
+    with table._lock:
+        table._purge()
+        store = PagedStore(pf, table.columns)
+        store.extend(table.iter_rows())
+        table.rows = store
+        table._pending.clear()
+        table._dropped.clear()
+    return table
+
+
+def _checkpoint(db: Database, pf: PageFile, schemas: Dict[str, Dict[str, Any]],
+                progress: Optional[Callable[[int, Optional[int]], None]]) -> None:
+    # db — знімок: його сторінки вже ніхто не змінює (copy-on-write), тож записати треба лише їх
+    tables = list(db.tables.values())
+    for i, t in enumerate(tables):
+        make_paged(t, pf)
+        if progress is not None:
+            progress(i + 1, len(tables))
+    pf.pool.flush(pf, [p for t in tables for p in t.rows.pages])
+    entries = []
+    blobs: List[int] = []
+    for t in tables:
+        ids = pf.write_blob(t._id_array().tobytes()) if t._ids is not None else []
+        blobs += ids
+        d = dict(schemas[t.name])
+        d.update(pages=t.rows.pages, counts=t.rows.counts, ids=ids[0] if ids else 0, next_id=t._next_id)
+        entries.append(d)
+    catalog = json.dumps({"name": db.name, "lsn": db.lsn, "tables": entries}, ensure_ascii=False).encode("utf-8")
+    blobs = pf.write_blob(catalog) + blobs
+    pf.sync()
+    pf._write_header(blobs[0])
+    pf.sync()
+    # новий каталог тримає свої сторінки; сторінки попереднього звільняються лише тепер
+    table_pages = [p for t in tables for p in t.rows.pages]
+    pf.incref(table_pages)
+    old, pf.catalog_pages = pf.catalog_pages, blobs + table_pages
+    pf.release(old)
+
+
+def _snapshot(db: Database) -> Tuple[Database, Dict[str, Dict[str, Any]]]:
+    # під замком бази; схема з індексами — з оригінальних таблиць, бо знімки індексів не мають
+    snapshot = Database(db.name, {n: t.snapshot() for n, t in db.tables.items()}, lsn=db.lsn)
+    return snapshot, {t.name: t.schema_dict() for t in db.tables.values()}
+
+
+def save(db: Database, path: str, progress: Optional[Callable[[int, Optional[int]], None]] = None,
+         page_size: int = DEFAULT_PAGE_SIZE, pool: Optional[BufferPool] = None) -> None:
+    # база, відкрита з цього ж файлу, — checkpoint на місці; інакше новий файл через .tmp.
+    # Сторінки пишуться зі знімка, тож записи й читання бази на checkpoint не чекають
+    files = _files(db)
+    target = next((pf for pf in files if os.path.abspath(pf.path) == os.path.abspath(path)), None)
+    if target is not None and not target.closed:
+        with target.checkpointing:
+            with db._lock:
+                # таблиці з пам'яті переходять у файл
+                for t in db.tables.values():
+                    make_paged(t, target)
+                snapshot, schemas = _snapshot(db)
+            _checkpoint(snapshot, target, schemas, progress)
+        return
+    tmp = path + ".tmp"
+    pf = PageFile(tmp, pool or default_pool(), page_size, create=True)
+    try:
+        with db._lock:
+            snapshot, schemas = _snapshot(db)
+        _checkpoint(snapshot, pf, schemas, progress)
+    except BaseException:
+        pf.close()
+        os.remove(tmp)
+        raise
+    pf.close()
+    os.replace(tmp, path)
+
+
+def load(path: str, pool: Optional[BufferPool] = None) -> Database:
+    pf = PageFile(path, pool or default_pool())
+    data, catalog_pages = pf.read_blob(pf._catalog_page())
+    catalog = json.loads(data)
+    db = Database(name=catalog["name"], lsn=catalog.get("lsn", 0))
+    held = list(catalog_pages)
+    for d in catalog["tables"]:
+        t = Table(d["name"], [Column(**c) for c in d["columns"]])
+        t.rows = PagedStore(pf, t.columns, list(d["pages"]), list(d["counts"]))
+        pf.incref(t.rows.pages)
+        held += t.rows.pages
+        if d.get("ids"):
+            raw, id_pages = pf.read_blob(d["ids"])
+            t._ids = array("q")
+            t._ids.frombytes(raw)
+            held += id_pages
+        t._next_id = d.get("next_id", 0)
+        for name, kind in d.get("indexes", {}).items():
+            t.create_index(name, kind)
+        db.tables[t.name] = db.adopt(t)
+    # посилання записаного каталогу; сторінки поза ним (недописаний checkpoint) — вільні
+    pf.incref(held)
+    pf.catalog_pages = held
+    used = set(held)
+    pf.free = [p for p in range(pf.npages - 1, 0, -1) if p not in used]
+    return db
+
+
+def close(db: Database) -> None:
+    # закриває файли сторінок бази; незбережені з останнього checkpoint зміни втрачаються
+    for pf in _files(db):
+        pf.close()
+
+
+def pool_stats(db: Database) -> Optional[Dict[str, Any]]:
+    files = _files(db)
+    return files[0].pool.stats() if files else None
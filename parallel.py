@@ -0,0 +1,441 @@
+import math
+import os
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from columnar import ColumnStore, build_buffer
+import joins
+from joins import HOWS, JoinPlan
+from models import Column, Table
+from query import AGGREGATES, Condition, Query
+
+# Розбите на частини виконання на пулі процесів. Таблиця один раз (на версію) копіюється
+# у блоки спільної пам'яті у колонковому вигляді — числа як array('q'/'d'), текст як коди
+# словника array('i') плюс сам словник, NULL як бітова маска, — і процеси пулу підключаються
+# до блоків за назвою. Задача несе лише опис блоків і діапазон рядків [lo, hi), тож дані
+# не серіалізуються на кожну задачу; батьківський процес лише зливає часткові результати.
+# Таблиця, що не вміщується в ці масиви (цілі поза int64), обробляється послідовно.
+
+Row = Dict[str, Any]
+# колонка в спільній пам'яті: (typecode, блок значень, блок маски NULL або None, блок словника або None)
+ColumnRef = Tuple[str, str, Optional[str], Optional[str]]
+TableRef = Tuple[int, Dict[str, ColumnRef]]
+ConditionSpec = Tuple[str, str, Any]  # (колонка, оператор, значення), як у Query.where
+MIN_CHUNK = 10000
+
+
+class SharedTable:
+    # знімок колонок таблиці у спільній пам'яті; блоки звільняє close()
+    def __init__(self, table: Table, columns: Optional[Sequence[str]] = None):
+        self.table = table
+        self.version = (table.version, table.schema_version)
+        self.size = table.row_count()
+        self.blocks: List[SharedMemory] = []
+        self.dictionaries: Dict[str, List[Any]] = {}
+        refs: Dict[str, ColumnRef] = {}
+        try:
+            for name in columns or table.column_names():
+                rows = table.rows
+                if isinstance(rows, ColumnStore):
+                    b = rows.buffers[name]
+                else:
+                    b = build_buffer(table._column(name), table._column_values(name))
+                nulls = self._block(b.nulls.bits) if b.nulls.any() else None
+                if hasattr(b, "dictionary"):
+                    self.dictionaries[name] = b.dictionary
+                    refs[name] = ("i", self._block(memoryview(b.codes).cast("B")[:4 * self.size]), nulls,
+                                  self._block(pickle.dumps(b.dictionary, pickle.HIGHEST_PROTOCOL)))
+                else:
+                    data = memoryview(b.data).cast("B")[:array(b.typecode).itemsize * self.size]
+                    refs[name] = (b.typecode, self._block(data), nulls, None)
+        except BaseException:
+            self.close()
+            raise
+        self.ref: TableRef = (self.size, refs)
+
+    def _block(self, data: Any) -> str:
+        shm = SharedMemory(create=True, size=max(len(data), 1))
+        self.blocks.append(shm)
+        shm.buf[:len(data)] = data
+        return shm.name
+
+    def stale(self) -> bool:
+        return self.version != (self.table.version, self.table.schema_version)
+
+    def close(self) -> None:
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+        self.blocks = []
+
+
+# --- процеси пулу ---------------------------------------------------------------------
+
+_attached: Dict[str, Tuple[SharedMemory, Any]] = {}  # назва блоку -> (блок, словник)
+_bad_codes: Dict[Tuple[Any, ...], Dict[int, str]] = {}
+_hashes: Dict[Tuple[Any, ...], Dict[Any, List[int]]] = {}
+
+
+class _ColumnView:
+    __slots__ = ("data", "nulls", "dictionary")
+
+    def __init__(self, data: Any, nulls: Any, dictionary: Optional[List[Any]]):
+        self.data = data
+        self.nulls = nulls
+        self.dictionary = dictionary
+
+    def is_null(self, i: int) -> bool:
+        return self.nulls is not None and bool(self.nulls[i >> 3] >> (i & 7) & 1)
+
+    def get(self, i: int) -> Any:
+        if self.is_null(i):
+            return None
+        v = self.data[i]
+        return v if self.dictionary is None else self.dictionary[v]
+
+    def values(self, lo: int, hi: int) -> List[Any]:
+        out = self.data[lo:hi].tolist()
+        if self.dictionary is not None:
+            d = self.dictionary
+            out = [d[c] for c in out]
+        if self.nulls is not None:
+            for i in range(lo, hi):
+                if self.nulls[i >> 3] >> (i & 7) & 1:
+                    out[i - lo] = None
+        return out
+
+
+def _attach(refs: Sequence[TableRef]) -> List[Dict[str, _ColumnView]]:
+    # блоки, яких немає в поточній задачі, належать уже звільненим SharedTable — закриваємо
+    wanted = {b for _, cols in refs for ref in cols.values() for b in ref[1:] if b}
+    for name in set(_attached) - wanted:
+        shm, _ = _attached.pop(name)
+        try:
+            shm.close()
+        except BufferError:
+            pass  # ще є представлення — звільниться разом із ними
+    for cache in (_bad_codes, _hashes):
+        for key in [k for k in cache if k[0] not in wanted]:
+            del cache[key]
+
+    def block(name: str, dictionary: bool = False) -> Tuple[SharedMemory, Any]:
+        got = _attached.get(name)
+        if got is None:
+            shm = SharedMemory(name=name)
+            got = _attached[name] = (shm, pickle.loads(shm.buf) if dictionary else None)
+        return got
+
+    out = []
+    for size, cols in refs:
+        views = {}
+        for name, (typecode, data, nulls, dictionary) in cols.items():
+            shm, _ = block(data)
+            itemsize = array(typecode).itemsize
+            views[name] = _ColumnView(shm.buf[:size * itemsize].cast(typecode),
+                                      block(nulls)[0].buf if nulls else None,
+                                      block(dictionary, True)[1] if dictionary else None)
+        out.append(views)
+    return out
+
+
+def _positions(cols: Dict[str, _ColumnView], conditions: Sequence[ConditionSpec], lo: int, hi: int) -> List[int]:
+    # перша умова — по значеннях діапазону цілком, решта — лише по знайдених позиціях;
+    # текстові умови перевіряються один раз на елемент словника, рядки — за кодами
+    hits: Optional[List[int]] = None
+    for column, op, value in conditions:
+        c = Condition(column, op, value)
+        col = cols[column]
+        if col.dictionary is not None and c.op != "is null":
+            wanted = frozenset(code for code, v in enumerate(col.dictionary) if c.test(v))
+            codes, null = col.data, col.is_null
+            if hits is None:
+                hits = [lo + j for j, code in enumerate(codes[lo:hi].tolist()) if code in wanted]
+            else:
+                hits = [i for i in hits if codes[i] in wanted]
+            if col.nulls is not None and 0 in wanted:
+                hits = [i for i in hits if not null(i)]
+        elif hits is None:
+            test = c.test
+            hits = [lo + j for j, v in enumerate(col.values(lo, hi)) if test(v)]
+        else:
+            test, get = c.test, col.get
+            hits = [i for i in hits if test(get(i))]
+    return list(range(lo, hi)) if hits is None else hits
+
+
+def _filter_task(ref: TableRef, conditions: Sequence[ConditionSpec], lo: int, hi: int) -> array:
+    cols = _attach([ref])[0]
+    return array("q", _positions(cols, conditions, lo, hi))
+
+
+def _aggregate_task(ref: TableRef, group_by: Sequence[str], aggregates: Sequence[Tuple[str, str]],
+                    conditions: Sequence[ConditionSpec], lo: int, hi: int) -> Dict[Any, List[Any]]:
+    # часткові стани груп [n0, acc0, n1, acc1, ...], як у query.Aggregate; ключ текстової
+    # колонки — код словника (-1 для NULL), декодує батьківський процес
+    cols = _attach([ref])[0]
+    positions = _positions(cols, conditions, lo, hi) if conditions else None
+
+    def column(name: str, codes: bool) -> List[Any]:
+        col = cols[name]
+        if codes and col.dictionary is not None:
+            out = col.data[lo:hi].tolist()
+            if col.nulls is not None:
+                for i in range(lo, hi):
+                    if col.is_null(i):
+                        out[i - lo] = -1
+        else:
+            out = col.values(lo, hi)
+        return out if positions is None else [out[p - lo] for p in positions]
+
+    n = hi - lo if positions is None else len(positions)
+    keys = [column(k, True) for k in group_by]
+    group_keys: List[Any] = keys[0] if len(keys) == 1 else list(zip(*keys)) if keys else [()] * n
+    plan = [(2 * i, fn, None if col == "*" else column(col, False)) for i, (fn, col) in enumerate(aggregates)]
+    groups: Dict[Any, List[Any]] = {}
+    for j, k in enumerate(group_keys):
+        s = groups.get(k)
+        if s is None:
+            s = groups[k] = [0, None] * len(aggregates)
+        for i, fn, values in plan:
+            if values is None:
+                s[i] += 1
+                continue
+            v = values[j]
+            if v is None:
+                continue
+            s[i] += 1
+            s[i + 1] = _step(fn, s[i + 1], v)
+    return groups
+
+
+def _step(fn: str, acc: Any, v: Any) -> Any:
+    if acc is None:
+        return v
+    if fn == "sum" or fn == "avg":
+        return acc + v
+    if fn == "min":
+        return v if v < acc else acc
+    if fn == "max":
+        return v if v > acc else acc
+    return acc
+
+
+def _join_task(left: TableRef, right: TableRef, keys: Sequence[str], keep_left: bool,
+               lo: int, hi: int) -> Tuple[array, array]:
+    # пари позицій (ліва, права) для лівих рядків [lo, hi); -1 — пари немає. Хеш-таблицю
+    # правої сторони кожен процес будує один раз і тримає, поки живе SharedTable
+    lcols, rcols = _attach([left, right])
+    rsize = right[0]
+    cache_key = (right[1][keys[0]][1], tuple(keys))
+    table = _hashes.get(cache_key)
+    if table is None:
+        table = {}
+        rkeys = [rcols[k].values(0, rsize) for k in keys]
+        for j, k in enumerate(rkeys[0] if len(keys) == 1 else zip(*rkeys)):
+            table.setdefault(k, []).append(j)
+        _hashes[cache_key] = table
+    lkeys = [lcols[k].values(lo, hi) for k in keys]
+    lpos, rpos = array("q"), array("q")
+    for j, k in enumerate(lkeys[0] if len(keys) == 1 else zip(*lkeys)):
+        hits = table.get(k)
+        if hits:
+            for r in hits:
+                lpos.append(lo + j)
+                rpos.append(r)
+        elif keep_left:
+            lpos.append(lo + j)
+            rpos.append(-1)
+    return lpos, rpos
+
+
+def _conversion_task(ref: TableRef, name: str, dtype: str, enum_values: Optional[List[str]],
+                     lo: int, hi: int) -> List[Tuple[int, str]]:
+    col = _attach([ref])[0][name]
+    validate = Column(name, dtype, enum_values).validator()
+    if col.dictionary is None:
+        errors = []
+        for j, v in enumerate(col.values(lo, hi)):
+            try:
+                validate(v)
+            except ValueError as e:
+                errors.append((lo + j, str(e)))
+        return errors
+    # текст: кожен елемент словника перевіряється один раз на процес
+    key = (ref[1][name][3], dtype, tuple(enum_values or ()))
+    bad = _bad_codes.get(key)
+    if bad is None:
+        bad = {}
+        for code, v in enumerate(col.dictionary):
+            try:
+                validate(v)
+            except ValueError as e:
+                bad[code] = str(e)
+        _bad_codes[key] = bad
+    if not bad:
+        return []
+    return [(lo + j, bad[c]) for j, c in enumerate(col.data[lo:hi].tolist())
+            if c in bad and not col.is_null(lo + j)]
+
+
+# --- батьківський процес ----------------------------------------------------------------
+
+def _conditions(table: Table, conditions: Sequence[Sequence[Any]]) -> List[ConditionSpec]:
+    # перевірка в батьківському процесі, як у Query.where; у задачі йдуть нормалізовані
+    # (колонка, оператор, значення)
+    q = Query(table)
+    for spec in conditions:
+        q.where(*spec)
+    return [(c.column, c.op, c.value) for c in q.conditions]
+
+
+class Parallel:
+    # with Parallel(workers=4) as p: p.filter(t, [("price", ">", 50)]); пул і спільні копії
+    # таблиць живуть до close(), копія оновлюється, коли змінюється версія таблиці
+    def __init__(self, workers: Optional[int] = None, chunk_rows: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.shared: Dict[int, SharedTable] = {}
+
+    def share(self, table: Table) -> SharedTable:
+        s = self.shared.get(id(table))
+        if s is not None and not s.stale():
+            return s
+        if s is not None:
+            s.close()
+        s = self.shared[id(table)] = SharedTable(table)
+        return s
+
+    def _try_share(self, table: Table) -> Optional[SharedTable]:
+        # None — колонки не вміщуються в масиви спільної пам'яті (OverflowError), потрібен послідовний шлях
+        try:
+            return self.share(table)
+        except OverflowError:
+            return None
+
+    def _ranges(self, n: int) -> List[Tuple[int, int]]:
+        # кілька частин на процес, щоб нерівномірні частини не лишали процеси без роботи
+        step = self.chunk_rows or max(MIN_CHUNK, math.ceil(n / (self.workers * 4)))
+        return [(lo, min(n, lo + step)) for lo in range(0, n, step)]
+
+    def _map(self, fn: Callable[..., Any], n: int, *args: Any) -> List[Any]:
+        futures = [self.pool.submit(fn, *args, lo, hi) for lo, hi in self._ranges(n)]
+        return [f.result() for f in futures]
+
+    def filter(self, table: Table, conditions: Sequence[Sequence[Any]]) -> List[int]:
+        # позиції рядків, що проходять усі умови (AND), за зростанням
+        conditions = _conditions(table, conditions)
+        s = self._try_share(table)
+        if s is None:
+            tests = [Condition(*c) for c in conditions]
+            return [i for i, r in enumerate(table.iter_rows()) if all(c(r) for c in tests)]
+        out: List[int] = []
+        for part in self._map(_filter_task, s.size, s.ref, conditions):
+            out.extend(part)
+        return out
+
+    def aggregate(self, table: Table, aggregates: Dict[str, Tuple[str, str]], group_by: Sequence[str] = (),
+                  conditions: Sequence[Sequence[Any]] = ()) -> List[Row]:
+        # aggregates: псевдонім -> (функція, колонка або "*"), як у Query.aggregate
+        for fn, col in aggregates.values():
+            if fn not in AGGREGATES:
+                raise ValueError(f"Unsupported aggregate: {fn} (expected one of {', '.join(AGGREGATES)})")
+            if col != "*":
+                table._column(col)
+        for k in group_by:
+            table._column(k)
+        conditions = _conditions(table, conditions)
+        s = self._try_share(table)
+        if s is None:
+            q = Query(table)
+            for c in conditions:
+                q.where(*c)
+            return q.group_by(*group_by).aggregate(**aggregates).rows()
+        plan = list(aggregates.values())
+        groups: Dict[Any, List[Any]] = {}
+        for part in self._map(_aggregate_task, s.size, s.ref, list(group_by), plan, conditions):
+            for k, state in part.items():
+                acc = groups.get(k)
+                if acc is None:
+                    groups[k] = state
+                    continue
+                for i, (fn, _) in enumerate(plan):
+                    acc[2 * i] += state[2 * i]
+                    if state[2 * i + 1] is not None:
+                        acc[2 * i + 1] = _step(fn, acc[2 * i + 1], state[2 * i + 1])
+        if not groups and not group_by:
+            groups[()] = [0, None] * len(plan)
+        decoders = [self._decoder(s, k) for k in group_by]
+        out = []
+        for k, state in groups.items():
+            parts = (k,) if len(group_by) == 1 else k
+            row = {name: decode(v) for name, decode, v in zip(group_by, decoders, parts)}
+            for i, (alias, (fn, _)) in enumerate(aggregates.items()):
+                n, acc = state[2 * i], state[2 * i + 1]
+                row[alias] = n if fn == "count" else (acc / n if n else None) if fn == "avg" else acc
+            out.append(row)
+        return out
+
+    @staticmethod
+    def _decoder(s: SharedTable, name: str) -> Callable[[Any], Any]:
+        d = s.dictionaries.get(name)
+        if d is None:
+            return lambda v: v
+        return lambda code: None if code < 0 else d[code]
+
+    def join(self, left: Table, right: Table, on: Union[str, Sequence[str]], how: str = "inner",
+             suffixes: Tuple[str, str] = ("_x", "_y"), name: Optional[str] = None) -> Table:
+        # хеш-з'єднання: права сторона — хеш-таблиця в кожному процесі, ліва ділиться на
+        # частини; порядок як у joins.join — ліві рядки по черзі, потім праві без пари
+        if how not in HOWS:
+            raise ValueError(f"Unsupported join type: {how} (expected one of {', '.join(HOWS)})")
+        keys = [on] if isinstance(on, str) else list(on)
+        if not keys:
+            raise ValueError("Join needs at least one key column")
+        plan = JoinPlan(left, right, keys, suffixes)
+        keep_left, keep_right = how in ("left", "outer"), how in ("right", "outer")
+        ls, rs = self._try_share(left), self._try_share(right)
+        if ls is None or rs is None:
+            out = joins.join(left, right, keys, how, suffixes)
+            out.name = name or out.name
+            return out
+        out = Table(name=name or f"{left.name}_JOIN_{right.name}", columns=plan.columns)
+        matched = bytearray(rs.size) if keep_right else None
+        merge, lrow, rrow = plan.merge, left.row, right.row
+        for lpos, rpos in self._map(_join_task, ls.size, ls.ref, rs.ref, keys, keep_left):
+            out.rows.extend(merge(lrow(lp), rrow(rp) if rp >= 0 else None) for lp, rp in zip(lpos, rpos))
+            if matched is not None:
+                for rp in rpos:
+                    if rp >= 0:
+                        matched[rp] = 1
+        if matched is not None:
+            out.rows.extend(merge(None, rrow(j)) for j, flag in enumerate(matched) if not flag)
+        return out
+
+    def check_conversion(self, table: Table, name: str, dtype: str,
+                         enum_values: Optional[List[str]] = None) -> List[Tuple[int, str]]:
+        # те саме, що Table.check_conversion, але частинами на пулі
+        table._column(name)
+        Column(name, dtype, enum_values).validator()
+        s = self._try_share(table)
+        if s is None:
+            return table.check_conversion(name, dtype, enum_values)
+        out: List[Tuple[int, str]] = []
+        for part in self._map(_conversion_task, s.size, s.ref, name, dtype, enum_values):
+            out.extend(part)
+        return out
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        for s in self.shared.values():
+            s.close()
+        self.shared.clear()
+
+    def __enter__(self) -> "Parallel":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
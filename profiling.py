@@ -0,0 +1,267 @@
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Лічильники й таймери гарячих шляхів: зміни таблиць (Table.add_row, edit_row, ...),
+# перевірка значень за dtype (Column.validate[integer]), фази з'єднань (join.build,
+# join.probe, join.sort, join.merge, join.partition) і збереження/завантаження
+# (storage.serialize, storage.parse, binstore.map, ...). Поки enabled = False, місця вимірювання
+# перевіряють лише цей прапорець. Запис: calls — кількість викликів, items — оброблені
+# рядки/значення, seconds — сумарний час, max_s — найдовший виклик.
+#   profiling.enable(); ...; profiling.dump("stats.json")
+# Capture додатково збирає cProfile (у потоці, що його почав, і в задачах tasks.py) і,
+# за бажанням, tracemalloc.
+
+enabled = False
+_stats: Dict[str, List[float]] = {}
+_lock = threading.Lock()
+_capture: Optional["Capture"] = None
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def record(name: str, seconds: float, items: int = 1) -> None:
+    with _lock:
+        s = _stats.get(name)
+        if s is None:
+            _stats[name] = [1, items, seconds, seconds]
+        else:
+            s[0] += 1
+            s[1] += items
+            s[2] += seconds
+            if seconds > s[3]:
+                s[3] = seconds
+
+
+class _Span:
+    __slots__ = ("name", "items", "t0")
+
+    def __init__(self, name: str, items: int):
+        self.name = name
+        self.items = items
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        record(self.name, time.perf_counter() - self.t0, self.items)
+
+
+_NULL = nullcontext()
+
+
+def span(name: str, items: int = 1) -> Any:
+    # with profiling.span("join.build", len(rows)): ... ; якщо кількість відома лише в кінці —
+    # with profiling.span("storage.parse") as sp: ...; if sp is not None: sp.items = n
+    return _Span(name, items) if enabled else _NULL
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - t0)
+        return wrapper
+    return wrap
+
+
+def iterate(name: str, rows: Iterable[Any]) -> Iterator[Any]:
+    # час лише всередині джерела рядків, без часу споживача між next(); один запис на весь прохід
+    it = iter(rows)
+    seconds = 0.0
+    n = 0
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                row = next(it)
+            except StopIteration:
+                seconds += time.perf_counter() - t0
+                return
+            seconds += time.perf_counter() - t0
+            n += 1
+            yield row
+    finally:
+        record(name, seconds, n)
+
+
+def counting_validator(dtype: str, validate: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    name = f"Column.validate[{dtype}]"
+
+    def wrapper(value: Any) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return validate(value)
+        finally:
+            record(name, time.perf_counter() - t0)
+    return wrapper
+
+
+def counting_batch(dtype: str, batch: Callable[[List[Any]], List[Any]]) -> Callable[[List[Any]], List[Any]]:
+    name = f"Column.validate[{dtype}]"
+
+    def wrapper(raw: List[Any]) -> List[Any]:
+        t0 = time.perf_counter()
+        try:
+            return batch(raw)
+        finally:
+            record(name, time.perf_counter() - t0, len(raw))
+    return wrapper
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    # найдорожчі зверху
+    with _lock:
+        items = sorted(_stats.items(), key=lambda kv: -kv[1][2])
+        return {name: {"calls": int(c), "items": int(i), "seconds": round(s, 6), "max_s": round(m, 6),
+                       "per_item_us": round(s / i * 1e6, 3) if i else None}
+                for name, (c, i, s, m) in items}
+
+
+def dump(path: Optional[str] = None) -> str:
+    text = json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "stats": stats()}, indent=2)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+@contextmanager
+def profiled() -> Iterator[Dict[str, Dict[str, Any]]]:
+    # увімкнути лічильники на час блоку; після виходу словник містить зібране в ньому
+    was = enabled
+    reset()
+    enable()
+    out: Dict[str, Dict[str, Any]] = {}
+    try:
+        yield out
+    finally:
+        if not was:
+            disable()
+        out.update(stats())
+
+
+class Capture:
+    # режим захоплення: лічильники + cProfile + (memory=True) tracemalloc
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.profiles: List[cProfile.Profile] = []
+        self.counters: Dict[str, Dict[str, Any]] = {}
+        self.peak_bytes: Optional[int] = None
+        self.top_allocations: List[str] = []
+        self.seconds = 0.0
+        self._main: Optional[cProfile.Profile] = None
+        self._thread: Optional[threading.Thread] = None
+        self._t0 = 0.0
+        self._was_enabled = False
+
+    def start(self) -> "Capture":
+        global _capture
+        if _capture is not None:
+            raise ValueError("A profiling capture is already running")
+        self._was_enabled = enabled
+        reset()
+        enable()
+        if self.memory:
+            tracemalloc.start()
+        self._main = cProfile.Profile()
+        self._thread = threading.current_thread()
+        _capture = self
+        self._t0 = time.perf_counter()
+        self._main.enable()
+        return self
+
+    def stop(self) -> "Capture":
+        global _capture
+        if _capture is not self:
+            raise ValueError("Capture is not running")
+        self._main.disable()
+        self.seconds = time.perf_counter() - self._t0
+        _capture = None
+        with _lock:
+            self.profiles.append(self._main)
+        if self.memory:
+            _, self.peak_bytes = tracemalloc.get_traced_memory()
+            snap = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self.top_allocations = [str(s) for s in snap.statistics("lineno")[:20]]
+        if not self._was_enabled:
+            disable()
+        self.counters = stats()
+        return self
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        with _lock:
+            self.profiles.append(profile)
+
+    def __enter__(self) -> "Capture":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def profile_text(self, limit: int = 30, sort: str = "cumulative") -> str:
+        out = io.StringIO()
+        profiles = [p for p in self.profiles if p.getstats()]
+        if not profiles:
+            return ""
+        st = pstats.Stats(profiles[0], stream=out)
+        for p in profiles[1:]:
+            st.add(p)
+        st.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def report(self, limit: int = 30) -> str:
+        lines = [f"Captured {self.seconds:.3f} s"]
+        if self.peak_bytes is not None:
+            lines.append(f"Peak traced memory: {self.peak_bytes / 2**20:.1f} MiB")
+        lines.append("")
+        for name, s in self.counters.items():
+            lines.append(f"{name}: {s['calls']} calls, {s['items']} items, {s['seconds']:.4f} s")
+        if self.top_allocations:
+            lines += ["", "Top allocations:"] + self.top_allocations
+        lines += ["", self.profile_text(limit)]
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seconds": round(self.seconds, 6), "stats": self.counters, "peak_bytes": self.peak_bytes,
+                "top_allocations": self.top_allocations}
+
+
+def call(fn: Callable[..., Any], *args: Any) -> Any:
+    # виклик у робочому потоці: під час Capture його cProfile додається до звіту
+    capture = _capture
+    if capture is None or threading.current_thread() is capture._thread:
+        return fn(*args)
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, *args)
+    finally:
+        capture._add(prof)
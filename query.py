@@ -0,0 +1,697 @@
+import heapq
+import re
+from collections import Counter
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import vectorized
+from columnar import NUMERIC_TYPECODES, ColumnStore
+from models import Column, Database, Table
+from rowstore import TupleStore
+
+# Невеликий рушій запитів над Table: побудовник Query або текст SQL (select),
+# логічний план із вузлів і pull-based (Volcano) виконання — кожен вузол є ітератором
+# рядків свого входу. Умови WHERE, що мають індекс, перетворюються на пошук в індексі;
+# ORDER BY разом із LIMIT виконується як top-k без повного сортування.
+
+Row = Dict[str, Any]
+
+OPS = ("=", "!=", "<", "<=", ">", ">=", "in", "is null", "is not null")
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+
+def _predicate(op: str, value: Any) -> Callable[[Any], bool]:
+    # порівняння з NULL, як і в SQL, хибне
+    if op == "=":
+        return lambda v: v is not None and v == value
+    if op == "!=":
+        return lambda v: v is not None and v != value
+    if op == "<":
+        return lambda v: v is not None and v < value
+    if op == "<=":
+        return lambda v: v is not None and v <= value
+    if op == ">":
+        return lambda v: v is not None and v > value
+    if op == ">=":
+        return lambda v: v is not None and v >= value
+    if op == "in":
+        values = frozenset(value)
+        return lambda v: v is not None and v in values
+    if op == "is null":
+        return lambda v: v is None
+    if op == "is not null":
+        return lambda v: v is not None
+    raise ValueError(f"Unsupported operator: {op} (expected one of {', '.join(OPS)})")
+
+
+class Condition:
+    def __init__(self, column: str, op: str, value: Any = None):
+        op = op.lower()
+        if op == "==":
+            op = "="
+        elif op == "<>":
+            op = "!="
+        self.column = column
+        self.op = op
+        self.value = value
+        self.test = _predicate(op, value)
+
+    def __call__(self, row: Row) -> bool:
+        return self.test(row.get(self.column))
+
+    def __repr__(self) -> str:
+        return f"{self.column} {self.op}" + ("" if self.op.startswith("is") else f" {self.value!r}")
+
+
+_OUTSIDE = object()
+
+
+def _literal(col: Column, value: Any, equality: bool) -> Any:
+    # _OUTSIDE — текстове значення, якого колонка не може містити; для числових колонок
+    # і порівнянь <, > помилка лишається помилкою
+    try:
+        return vectorized.literal(col, value)
+    except ValueError:
+        if not equality or col.dtype in NUMERIC_TYPECODES:
+            raise
+        return _OUTSIDE
+
+
+def _sort_key(columns: List[str]) -> Callable[[Row], Any]:
+    # NULL більше за будь-яке значення: в кінці при ASC, на початку при DESC
+    if len(columns) == 1:
+        c = columns[0]
+        return lambda r: (r.get(c) is None, r.get(c))
+    return lambda r: tuple((r.get(c) is None, r.get(c)) for c in columns)
+
+
+def _column_positions(table: Table, buffer: Any, c: Condition) -> List[int]:
+    if table._column(c.column).dtype in NUMERIC_TYPECODES:
+        # цілі/дійсні колонки фільтруються векторно (NumPy, якщо доступний)
+        return vectorized.filter_positions(table, c.column, c.op, c.value)
+    if hasattr(buffer, "dictionary"):
+        # словниково закодовані колонки: умова перевіряється на словнику, рядки — за кодами
+        if c.op == "is null":
+            return buffer.nulls.positions()
+        return buffer.matching(c.test)
+    test = c.test
+    return [i for i, v in enumerate(buffer.values()) if test(v)]
+
+
+# --- вузли плану -------------------------------------------------------------
+
+class Scan:
+    def __init__(self, table: Table, conditions: Sequence[Condition] = ()):
+        self.table = table
+        self.conditions = list(conditions)
+
+    def positions(self) -> Optional[List[int]]:
+        # лише для колонкового сховища: позиції рядків, що пройшли всі умови (None — усі рядки).
+        # Перша умова рахується по буферу колонки цілком, решта — лише по вже знайдених позиціях
+        rows = self.table.rows
+        if not isinstance(rows, ColumnStore) or not self.conditions:
+            return None
+        hits: Optional[List[int]] = None
+        for c in self.conditions:
+            buffer = rows.buffers[c.column]
+            if hits is None:
+                hits = _column_positions(self.table, buffer, c)
+            else:
+                get, test = buffer.get, c.test
+                hits = [i for i in hits if test(get(i))]
+        return hits
+
+    def __iter__(self) -> Iterator[Row]:
+        rows = self.table.rows
+        if isinstance(rows, TupleStore):
+            # умови перевіряються на кортежах, dict будуються лише для рядків, що пройшли
+            tuples: Iterator[Any] = iter(rows.rows)
+            for c in self.conditions:
+                tuples = filter(lambda t, p=rows.pos[c.column], test=c.test: test(t[p]), tuples)
+            names = rows.names
+            return (dict(zip(names, t)) for t in tuples)
+        if not isinstance(rows, ColumnStore):
+            it = self.table.iter_rows()
+            for c in self.conditions:
+                it = filter(c, it)
+            return it
+        # dict будуються лише для рядків, що пройшли умови
+        hits = self.positions()
+        return iter(rows) if hits is None else (rows[i] for i in hits)
+
+    def describe(self) -> str:
+        where = f" where {' and '.join(map(repr, self.conditions))}" if self.conditions else ""
+        return f"Scan {self.table.name}{where}"
+
+
+class IndexScan:
+    def __init__(self, table: Table, column: str, kind: str, lo: Any, hi: Any,
+                 residual: Sequence[Condition] = ()):
+        self.table = table
+        self.column = column
+        self.kind = kind  # "eq" або "range"
+        self.lo = lo
+        self.hi = hi
+        self.residual = list(residual)
+
+    def __iter__(self) -> Iterator[Row]:
+        idx = self.table.indexes[self.column]
+        if self.kind == "eq":
+            positions = idx.lookup(self.lo)
+        else:
+            positions = idx.range(self.lo, self.hi)
+        row = self.table._slot_row
+        it: Iterator[Row] = (row(p) for p in sorted(positions))
+        for c in self.residual:
+            it = filter(c, it)
+        return it
+
+    def describe(self) -> str:
+        what = f"= {self.lo!r}" if self.kind == "eq" else f"in [{self.lo!r}, {self.hi!r}]"
+        residual = f" filter {' and '.join(map(repr, self.residual))}" if self.residual else ""
+        return f"IndexScan {self.table.name}.{self.column} {what}{residual}"
+
+
+class Aggregate:
+    def __init__(self, child: Any, group_by: List[str], aggregates: List[Tuple[str, str, str]]):
+        self.child = child
+        self.group_by = group_by
+        self.aggregates = aggregates  # (псевдонім, функція, колонка або "*")
+
+    def _row_groups(self, empty: List[Any]) -> Dict[Any, List[Any]]:
+        aggs = self.aggregates
+        keys = self.group_by
+        if len(keys) == 1:
+            k0 = keys[0]
+            group_key: Callable[[Row], Any] = lambda r: r.get(k0)
+        else:
+            group_key = lambda r: tuple(r.get(c) for c in keys)
+        plan = [(2 * i, col, fn) for i, (_, fn, col) in enumerate(aggs)]
+        groups: Dict[Any, List[Any]] = {}
+        for r in self.child:
+            k = group_key(r)
+            s = groups.get(k)
+            if s is None:
+                s = groups[k] = list(empty)
+            for i, col, fn in plan:
+                if col == "*":
+                    s[i] += 1
+                    continue
+                v = r.get(col)
+                if v is None:
+                    continue
+                s[i] += 1
+                acc = s[i + 1]
+                if acc is None:
+                    s[i + 1] = v
+                elif fn == "sum" or fn == "avg":
+                    s[i + 1] = acc + v
+                elif fn == "min":
+                    if v < acc:
+                        s[i + 1] = v
+                elif fn == "max":
+                    if v > acc:
+                        s[i + 1] = v
+        return groups
+
+    def _code_buffers(self) -> Optional[List[Any]]:
+        child, keys = self.child, self.group_by
+        if not isinstance(child, Scan) or not isinstance(child.table.rows, ColumnStore):
+            return None
+        buffers = [child.table.rows.buffers[c] for c in keys]
+        return buffers if all(hasattr(b, "dictionary") for b in buffers) else None
+
+    def _code_groups(self, empty: List[Any]) -> Optional[Dict[Any, List[Any]]]:
+        # колонкове сховище, GROUP BY лише по словниково закодованих колонках (або без нього):
+        # ключ групи — цілий код (або кортеж кодів), значення агрегатів беруться з буферів,
+        # dict рядків не будуються; декодуються лише ключі груп
+        buffers = self._code_buffers()
+        if buffers is None:
+            return None
+        store = self.child.table.rows
+        positions = self.child.positions()
+        columns = [b.keys() for b in buffers]
+        if positions is not None:
+            columns = [[k[p] for p in positions] for k in columns]
+        if not columns:
+            codes: List[Any] = [()] * (len(store) if positions is None else len(positions))
+        else:
+            codes = columns[0] if len(columns) == 1 else list(zip(*columns))
+        groups: Dict[Any, List[Any]] = {}
+        if all(col == "*" for _, _, col in self.aggregates):
+            for k, n in Counter(codes).items():
+                groups[k] = [n if i % 2 == 0 else None for i in range(len(empty))]
+        else:
+            plan = []
+            for i, (_, fn, col) in enumerate(self.aggregates):
+                values = None
+                if col != "*":
+                    values = list(store.column_values(col))
+                    if positions is not None:
+                        values = [values[p] for p in positions]
+                plan.append((2 * i, fn, values))
+            for j, k in enumerate(codes):
+                s = groups.get(k)
+                if s is None:
+                    s = groups[k] = list(empty)
+                for i, fn, values in plan:
+                    if values is None:
+                        s[i] += 1
+                        continue
+                    v = values[j]
+                    if v is None:
+                        continue
+                    s[i] += 1
+                    acc = s[i + 1]
+                    if acc is None:
+                        s[i + 1] = v
+                    elif fn == "sum" or fn == "avg":
+                        s[i + 1] = acc + v
+                    elif fn == "min":
+                        if v < acc:
+                            s[i + 1] = v
+                    elif fn == "max":
+                        if v > acc:
+                            s[i + 1] = v
+        if len(buffers) == 1:
+            decode = buffers[0].decode
+            return {decode(k): s for k, s in groups.items()}
+        return {tuple(b.decode(c) for b, c in zip(buffers, k)): s for k, s in groups.items()}
+
+    def __iter__(self) -> Iterator[Row]:
+        aggs = self.aggregates
+        keys = self.group_by
+        # стан групи — плаский список [n0, acc0, n1, acc1, ...]
+        empty = [0, None] * len(aggs)
+        groups = self._code_groups(empty)
+        if groups is None:
+            groups = self._row_groups(empty)
+        if not groups and not keys:
+            groups[()] = list(empty)
+        single = len(keys) == 1
+        for k, s in groups.items():
+            out = {keys[0]: k} if single else dict(zip(keys, k))
+            for i, (alias, fn, _) in enumerate(aggs):
+                n, acc = s[2 * i], s[2 * i + 1]
+                if fn == "count":
+                    out[alias] = n
+                elif fn == "avg":
+                    out[alias] = acc / n if n else None
+                else:
+                    out[alias] = acc
+            yield out
+
+    def describe(self) -> str:
+        aggs = ", ".join(f"{fn}({col}) as {alias}" for alias, fn, col in self.aggregates)
+        by = f" by {', '.join(self.group_by)}" if self.group_by else ""
+        codes = " on dictionary codes" if self.group_by and self._code_buffers() is not None else ""
+        return f"HashAggregate {aggs}{by}{codes}"
+
+
+class Sort:
+    def __init__(self, child: Any, order: List[Tuple[str, bool]], limit: Optional[int] = None):
+        self.child = child
+        self.order = order  # (колонка, desc)
+        self.limit = limit
+
+    def __iter__(self) -> Iterator[Row]:
+        directions = {desc for _, desc in self.order}
+        if len(directions) == 1:
+            key = _sort_key([c for c, _ in self.order])
+            desc = directions.pop()
+            if self.limit is not None:
+                pick = heapq.nlargest if desc else heapq.nsmallest
+                return iter(pick(self.limit, self.child, key=key))
+            return iter(sorted(self.child, key=key, reverse=desc))
+        # різні напрямки: стабільне сортування по одному ключу, від останнього до першого
+        rows = list(self.child)
+        for col, desc in reversed(self.order):
+            rows.sort(key=_sort_key([col]), reverse=desc)
+        return iter(rows if self.limit is None else rows[:self.limit])
+
+    def describe(self) -> str:
+        keys = ", ".join(f"{c} {'desc' if d else 'asc'}" for c, d in self.order)
+        return f"TopK {self.limit} by {keys}" if self.limit is not None else f"Sort by {keys}"
+
+
+class Limit:
+    def __init__(self, child: Any, n: int):
+        self.child = child
+        self.n = n
+
+    def __iter__(self) -> Iterator[Row]:
+        return islice(self.child, self.n)
+
+    def describe(self) -> str:
+        return f"Limit {self.n}"
+
+
+class Project:
+    def __init__(self, child: Any, columns: List[Tuple[str, str]]):
+        self.child = child
+        self.columns = columns  # (джерело, назва у результаті)
+
+    def __iter__(self) -> Iterator[Row]:
+        cols = self.columns
+        for r in self.child:
+            yield {dst: r.get(src) for src, dst in cols}
+
+    def describe(self) -> str:
+        return "Project " + ", ".join(src if src == dst else f"{src} as {dst}" for src, dst in self.columns)
+
+
+# --- побудовник і планувальник ----------------------------------------------
+
+class Query:
+    def __init__(self, table: Table):
+        self.table = table
+        self.conditions: List[Condition] = []
+        self.columns: Optional[List[Tuple[str, str]]] = None
+        self.group_columns: List[str] = []
+        self.aggregates: List[Tuple[str, str, str]] = []
+        self.order: List[Tuple[str, bool]] = []
+        self.limit_n: Optional[int] = None
+
+    def where(self, column: str, op: str, value: Any = None) -> "Query":
+        col = self.table._column(column)
+        op = {"==": "=", "<>": "!="}.get(op.lower(), op.lower())
+        if op == "in":
+            value = [v for v in (_literal(col, v, True) for v in value) if v is not _OUTSIDE]
+        elif value is not None:
+            value = _literal(col, value, op in ("=", "!="))
+            # значення поза доменом колонки (enum, char, email): = не збігається ні з чим,
+            # != — з усім, крім NULL
+            if value is _OUTSIDE:
+                op, value = ("in", []) if op == "=" else ("is not null", None)
+        self.conditions.append(Condition(column, op, value))
+        return self
+
+    def select(self, *columns: str, **aliases: str) -> "Query":
+        # select("id", title="name") -> колонки id і title (значення з name)
+        self.columns = [(c, c) for c in columns] + [(src, dst) for dst, src in aliases.items()]
+        return self
+
+    def group_by(self, *columns: str) -> "Query":
+        for c in columns:
+            self.table._column(c)
+        self.group_columns = list(columns)
+        return self
+
+    def aggregate(self, **aggregates: Tuple[str, str]) -> "Query":
+        # aggregate(n=("count", "*"), total=("sum", "price"))
+        for alias, (fn, col) in aggregates.items():
+            fn = fn.lower()
+            if fn not in AGGREGATES:
+                raise ValueError(f"Unsupported aggregate: {fn} (expected one of {', '.join(AGGREGATES)})")
+            if col != "*":
+                self.table._column(col)
+            elif fn != "count":
+                raise ValueError(f"{fn}(*) is not supported")
+            self.aggregates.append((alias, fn, col))
+        return self
+
+    def order_by(self, column: str, desc: bool = False) -> "Query":
+        self.order.append((column, desc))
+        return self
+
+    def limit(self, n: int) -> "Query":
+        if n < 0:
+            raise ValueError("Limit must be non-negative")
+        self.limit_n = n
+        return self
+
+    def _access_path(self) -> Any:
+        t = self.table
+        eq = [c for c in self.conditions if c.op == "=" and c.value is not None and c.column in t.indexes]
+        if eq:
+            c = eq[0]
+            return IndexScan(t, c.column, "eq", c.value, None, [x for x in self.conditions if x is not c])
+        ranged = [c for c in self.conditions
+                  if c.op in ("<", "<=", ">", ">=") and getattr(t.indexes.get(c.column), "kind", None) == "sorted"]
+        if ranged:
+            column = ranged[0].column
+            lo = hi = None
+            for c in ranged:
+                if c.column != column:
+                    continue
+                if c.op in (">", ">=") and (lo is None or c.value > lo):
+                    lo = c.value
+                elif c.op in ("<", "<=") and (hi is None or c.value < hi):
+                    hi = c.value
+            # межі індексу включні, тож строгі умови лишаються як фільтр
+            residual = [c for c in self.conditions
+                        if not (c.column == column and c.op in ("<=", ">="))]
+            return IndexScan(t, column, "range", lo, hi, residual)
+        return Scan(t, self.conditions)
+
+    def plan(self) -> Any:
+        node = self._access_path()
+        if self.aggregates or self.group_columns:
+            node = Aggregate(node, self.group_columns, self.aggregates)
+        if self.order:
+            node = Sort(node, self.order, self.limit_n)
+        elif self.limit_n is not None:
+            node = Limit(node, self.limit_n)
+        if self.columns is not None:
+            node = Project(node, self.columns)
+        return node
+
+    def explain(self) -> str:
+        lines = []
+        node = self.plan()
+        depth = 0
+        while node is not None:
+            lines.append("  " * depth + node.describe())
+            node = getattr(node, "child", None)
+            depth += 1
+        return "\n".join(lines)
+
+    def __iter__(self) -> Iterator[Row]:
+        return iter(self.plan())
+
+    def rows(self) -> List[Row]:
+        return list(self.plan())
+
+    def output_columns(self) -> List[Column]:
+        t = self.table
+        if self.aggregates or self.group_columns:
+            cols = [t._column(c) for c in self.group_columns]
+            out = {c.name: Column(c.name, c.dtype, c.enum_values) for c in cols}
+            for alias, fn, col in self.aggregates:
+                if fn == "count":
+                    out[alias] = Column(alias, "integer")
+                elif fn == "avg":
+                    out[alias] = Column(alias, "real")
+                else:
+                    src = t._column(col)
+                    out[alias] = Column(alias, src.dtype, src.enum_values)
+        else:
+            out = {c.name: Column(c.name, c.dtype, c.enum_values) for c in t.columns}
+        if self.columns is None:
+            return list(out.values())
+        result = []
+        for src, dst in self.columns:
+            if src not in out:
+                raise ValueError(f"No such column '{src}'")
+            c = out[src]
+            result.append(Column(dst, c.dtype, c.enum_values))
+        return result
+
+    def to_table(self, name: Optional[str] = None) -> Table:
+        out = Table(name=name or f"{self.table.name}_QUERY", columns=self.output_columns())
+        out.rows.extend(self.plan())
+        return out
+
+
+# --- SQL ----------------------------------------------------------------------
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<num>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | '(?P<str>(?:[^']|'')*)'
+  | "(?P<qid>[^"]+)"
+  | (?P<op><=|>=|!=|<>|==|[=<>(),*;])
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+)""", re.VERBOSE)
+
+
+def _tokenize(sql: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    sql = sql.rstrip()
+    while pos < len(sql):
+        m = _TOKEN.match(sql, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Syntax error at position {pos}: {sql[pos:pos + 20]!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "num":
+            tokens.append(("value", float(text) if any(ch in text for ch in ".eE") else int(text)))
+        elif kind == "str":
+            tokens.append(("value", text.replace("''", "'")))
+        elif kind == "qid":
+            tokens.append(("name", text))
+        elif kind == "word":
+            low = text.lower()
+            if low == "null":
+                tokens.append(("value", None))
+            elif low in _KEYWORDS:
+                tokens.append(("kw", low))
+            else:
+                tokens.append(("name", text))
+        elif text != ";":
+            tokens.append(("op", text))
+        pos = m.end()
+    return tokens
+
+
+_KEYWORDS = {"select", "from", "where", "and", "or", "group", "order", "by", "asc", "desc",
+             "limit", "as", "in", "is", "not"} | set(AGGREGATES)
+
+
+class _Parser:
+    def __init__(self, sql: str):
+        self.tokens = _tokenize(sql)
+        self.i = 0
+
+    def peek(self) -> Tuple[str, Any]:
+        return self.tokens[self.i] if self.i < len(self.tokens) else ("end", None)
+
+    def take(self) -> Tuple[str, Any]:
+        tok = self.peek()
+        if tok[0] == "end":
+            raise ValueError("Unexpected end of query")
+        self.i += 1
+        return tok
+
+    def accept(self, kind: str, value: Any) -> bool:
+        if self.peek() == (kind, value):
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any) -> None:
+        if not self.accept(kind, value):
+            raise ValueError(f"Expected {value!r}, got {self.peek()[1]!r}")
+
+    def name(self) -> str:
+        kind, value = self.take()
+        if kind != "name":
+            raise ValueError(f"Expected a column or table name, got {value!r}")
+        return value
+
+    def parse(self, db: Database) -> Query:
+        self.expect("kw", "select")
+        items = self.select_list()
+        self.expect("kw", "from")
+        q = Query(db.get_table(self.name()))
+        if self.accept("kw", "where"):
+            while True:
+                self.condition(q)
+                if self.accept("kw", "or"):
+                    raise ValueError("Only AND-combined conditions are supported")
+                if not self.accept("kw", "and"):
+                    break
+        group: List[str] = []
+        if self.accept("kw", "group"):
+            self.expect("kw", "by")
+            group = self.names()
+            q.group_by(*group)
+        if self.accept("kw", "order"):
+            self.expect("kw", "by")
+            while True:
+                col = self.name()
+                desc = self.accept("kw", "desc")
+                if not desc:
+                    self.accept("kw", "asc")
+                q.order_by(col, desc)
+                if not self.accept("op", ","):
+                    break
+        if self.accept("kw", "limit"):
+            kind, n = self.take()
+            if kind != "value" or not isinstance(n, int):
+                raise ValueError(f"LIMIT expects an integer, got {n!r}")
+            q.limit(n)
+        if self.peek()[0] != "end":
+            raise ValueError(f"Unexpected {self.peek()[1]!r}")
+        self.apply_select(q, items, group)
+        return q
+
+    def names(self) -> List[str]:
+        out = [self.name()]
+        while self.accept("op", ","):
+            out.append(self.name())
+        return out
+
+    def select_list(self) -> List[Tuple[str, Optional[str], str]]:
+        # (колонка або "*", агрегат або None, псевдонім)
+        if self.accept("op", "*"):
+            return []
+        items = []
+        while True:
+            kind, value = self.peek()
+            if kind == "kw" and value in AGGREGATES:
+                self.take()
+                self.expect("op", "(")
+                col = "*" if self.accept("op", "*") else self.name()
+                self.expect("op", ")")
+                alias = f"{value}({col})"
+                fn: Optional[str] = value
+            else:
+                col = self.name()
+                alias, fn = col, None
+            if self.accept("kw", "as"):
+                alias = self.name()
+            items.append((col, fn, alias))
+            if not self.accept("op", ","):
+                return items
+
+    def condition(self, q: Query) -> None:
+        col = self.name()
+        if self.accept("kw", "is"):
+            op = "is not null" if self.accept("kw", "not") else "is null"
+            kind, value = self.take()
+            if (kind, value) != ("value", None):
+                raise ValueError("Expected NULL after IS")
+            q.where(col, op)
+            return
+        if self.accept("kw", "in"):
+            self.expect("op", "(")
+            values = [self.literal()]
+            while self.accept("op", ","):
+                values.append(self.literal())
+            self.expect("op", ")")
+            q.where(col, "in", values)
+            return
+        kind, op = self.take()
+        if kind != "op" or op not in ("=", "==", "!=", "<>", "<", "<=", ">", ">="):
+            raise ValueError(f"Expected a comparison operator, got {op!r}")
+        value = self.literal()
+        if value is None:
+            raise ValueError("Use IS NULL / IS NOT NULL to compare with NULL")
+        q.where(col, op, value)
+
+    def literal(self) -> Any:
+        kind, value = self.take()
+        if kind != "value":
+            raise ValueError(f"Expected a literal, got {value!r}")
+        return value
+
+    def apply_select(self, q: Query, items: List[Tuple[str, Optional[str], str]], group: List[str]) -> None:
+        aggs = {alias: (fn, col) for col, fn, alias in items if fn}
+        if aggs:
+            q.aggregate(**aggs)
+        if group or aggs:
+            for col, fn, _ in items:
+                if not fn and col not in group:
+                    raise ValueError(f"Column '{col}' must appear in GROUP BY or be used in an aggregate")
+        if items:
+            # після агрегації колонки результату вже названі псевдонімами агрегатів
+            q.select(**{alias: alias if fn else col for col, fn, alias in items})
+
+
+def parse(db: Database, sql: str) -> Query:
+    return _Parser(sql).parse(db)
+
+
+def execute(db: Database, sql: str) -> List[Row]:
+    return parse(db, sql).rows()
@@ -0,0 +1,141 @@
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from models import INTERNED_DTYPES, Column, Table
+
+# Компактне рядкове сховище для Table: рядок — кортеж значень у порядку колонок, назви
+# колонок і їхні позиції зберігаються один раз на таблицю (names/pos). Кортеж із k значень
+# займає приблизно вдвічі менше за dict з тими самими ключами. Як і ColumnStore, рядки
+# віддаються як нові dict, тож змінювати їх — через Table.edit_row.
+
+Row = Dict[str, Any]
+
+
+class TupleStore:
+    def __init__(self, columns: List[Column]):
+        self.names: List[str] = [c.name for c in columns]
+        self.pos: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.rows: List[Tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _tuple(self, row: Row) -> Tuple[Any, ...]:
+        return tuple(map(row.get, self.names))
+
+    def __getitem__(self, index: int) -> Row:
+        try:
+            return dict(zip(self.names, self.rows[index]))
+        except IndexError:
+            raise IndexError("Row index out of range")
+
+    def __setitem__(self, index: int, row: Row) -> None:
+        try:
+            self.rows[index] = self._tuple(row)
+        except IndexError:
+            raise IndexError("Row index out of range")
+
+    def __iter__(self) -> Iterator[Row]:
+        names = self.names
+        for values in self.rows:
+            yield dict(zip(names, values))
+
+    def append(self, row: Row) -> None:
+        self.rows.append(self._tuple(row))
+
+    def extend(self, rows: Iterable[Row], chunk: int = 4096) -> None:
+        # itemgetter будує кортеж на рівні C; шматок, де якогось ключа нема, — через row.get
+        names = self.names
+        if len(names) < 2:
+            self.rows.extend(tuple(map(r.get, names)) for r in rows)
+            return
+        getter = itemgetter(*names)
+        it = iter(rows)
+        out = self.rows
+        while True:
+            part = list(islice(it, chunk))
+            if not part:
+                return
+            start = len(out)
+            try:
+                out.extend(map(getter, part))
+            except KeyError:
+                del out[start:]
+                out.extend(tuple(map(r.get, names)) for r in part)
+
+    def pop(self, index: int = -1) -> Row:
+        try:
+            return dict(zip(self.names, self.rows.pop(index)))
+        except IndexError:
+            raise IndexError("Row index out of range")
+
+    def copy(self) -> "TupleStore":
+        # кортежі незмінні, тож достатньо копії списку
+        s = TupleStore([])
+        s.names, s.pos, s.rows = list(self.names), dict(self.pos), list(self.rows)
+        return s
+
+    def _rename(self, names: List[str]) -> None:
+        self.names = names
+        self.pos = {n: i for i, n in enumerate(names)}
+
+    def add_column(self, column: Column, default: Any = None) -> None:
+        tail = (default,)
+        self.rows = [t + tail for t in self.rows]
+        self._rename(self.names + [column.name])
+
+    def drop_column(self, name: str) -> None:
+        p = self.pos.get(name)
+        if p is None:
+            return
+        self.rows = [t[:p] + t[p + 1:] for t in self.rows]
+        self._rename(self.names[:p] + self.names[p + 1:])
+
+    def replace_column(self, column: Column, values: Iterable[Any]) -> None:
+        p = self.pos[column.name]
+        self.rows = [t[:p] + (v,) + t[p + 1:] for t, v in zip(self.rows, values)]
+
+    def column_values(self, name: str) -> Iterator[Any]:
+        if name not in self.pos:
+            raise ValueError(f"No such column '{name}'")
+        return map(itemgetter(self.pos[name]), self.rows)
+
+    def intern_strings(self, columns: List[Column], sample: int = 1024) -> None:
+        # як Table.intern_strings; кортежі перебудовуються одним zip по колонках, а список
+        # замінюється новим, тож знімок зі старим списком не зачіпається
+        plan = []
+        for col in columns:
+            if col.dtype in INTERNED_DTYPES and col.name in self.pos:
+                p = self.pos[col.name]
+                seen = {v: v for v in col.enum_values or []} if col.dtype == "enum" else {}
+                head = [t[p] for t in self.rows[:sample] if t[p].__class__ is str]
+                # значення вже спільні (наприклад, рядки з іншої таблиці) — ділити нічого
+                distinct = len(set(head))
+                if distinct <= sample // 2 and len(set(map(id, head))) > distinct:
+                    plan.append((p, seen))
+        if not plan:
+            return
+        columns_ = list(zip(*self.rows))
+        for p, seen in plan:
+            intern = seen.setdefault
+            columns_[p] = [intern(v, v) if v.__class__ is str else v for v in columns_[p]]
+        self.rows = list(zip(*columns_))
+
+
+def compact_rows(columns: List[Column], rows: Iterable[Row]) -> TupleStore:
+    store = TupleStore(columns)
+    store.extend(rows)
+    return store
+
+
+def make_compact(table: Table) -> Table:
+    if isinstance(table.rows, TupleStore):
+        return table
+    with table._lock:
+        # надгробки прибираються заздалегідь, щоб слоти в індексах збіглися з позиціями кортежів
+        table._purge()
+        table.rows = compact_rows(table.columns, table.iter_rows())
+        table._pending.clear()
+        table._dropped.clear()
+    return table
@@ -0,0 +1,464 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from cache import ResultCache
+from joins import iter_join
+from models import Column, Database, Table
+from storage import load_from_file
+from wal import WriteAheadLog
+
+# HTTP API над однією спільною Database на asyncio без сторонніх залежностей (HTTP/1.1,
+# keep-alive, JSON). Читання виконуються в пулі потоків над знімками лише потрібних
+# таблиць (Table.snapshot; SQL — у транзакції, Database.begin), тож сторінки й потоки
+# рядків узгоджені й не блокують записи.
+# Записи йдуть у чергу — окремий потік-записувач, — і, якщо база відкрита з файлу,
+# після кожного запиту журнал змін (wal.py) робить fsync.
+
+MAX_BODY = 64 * 2**20
+MAX_HEADER_LINES = 100
+DEFAULT_PAGE = 100
+MAX_PAGE = 10000
+STREAM_BATCH = 1000
+STATUS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise HttpError(400, "Request body is not valid JSON")
+
+    def arg(self, name: str, default: int, lo: int = 0, hi: Optional[int] = None) -> int:
+        raw = self.query.get(name)
+        if not raw:
+            return default
+        try:
+            v = int(raw[0])
+        except ValueError:
+            raise HttpError(400, f"Query parameter '{name}' must be an integer")
+        if v < lo or (hi is not None and v > hi):
+            raise HttpError(400, f"Query parameter '{name}' must be between {lo} and {hi}")
+        return v
+
+    def flag(self, name: str) -> bool:
+        return self.query.get(name, ["0"])[0].lower() in ("1", "true", "yes")
+
+
+class Stream:
+    # відповідь частинами (chunked), рядки NDJSON
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self.chunks = chunks
+
+
+Response = Any  # (статус, JSON-об'єкт) або Stream
+Handler = Callable[..., Awaitable[Response]]
+
+
+def _field(body: Any, name: str) -> Any:
+    if not isinstance(body, dict) or name not in body:
+        raise HttpError(400, f"Missing field '{name}'")
+    return body[name]
+
+
+def _table(db: Database, name: str) -> Table:
+    # відсутні таблиця чи рядок — 404, а не 400, як інші ValueError
+    if name not in db.tables:
+        raise HttpError(404, f"No such table '{name}'")
+    return db.tables[name]
+
+
+def _check_row(t: Table, rid: int) -> int:
+    try:
+        t.position(rid)
+    except ValueError as e:
+        raise HttpError(404, str(e))
+    return rid
+
+
+def _ndjson(it: Iterator[Any], n: int) -> bytes:
+    return "".join(_encoder.encode(v) + "\n" for v in islice(it, n)).encode("utf-8")
+
+
+class ApiServer:
+    def __init__(self, db: Database, path: Optional[str] = None, readers: int = 4):
+        self.db = db
+        self.log = WriteAheadLog(db, path) if path else None
+        self.reader_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="minidb-read")
+        # один потік-записувач: записи виконуються по черзі в порядку надходження
+        self.writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="minidb-write")
+        self.connections: Set["asyncio.Task[None]"] = set()
+        self.routes: List[Tuple[str, Any, Handler]] = []
+        for method, pattern, handler in [
+            ("GET", "/db", self.get_db),
+            ("POST", "/db/save", self.save_db),
+            ("GET", "/tables", self.list_tables),
+            ("POST", "/tables", self.create_table),
+            ("GET", "/tables/{table}", self.get_table),
+            ("PUT", "/tables/{table}", self.rename_table),
+            ("DELETE", "/tables/{table}", self.delete_table),
+            ("POST", "/tables/{table}/columns", self.add_column),
+            ("PUT", "/tables/{table}/columns/{column}", self.convert_column),
+            ("DELETE", "/tables/{table}/columns/{column}", self.delete_column),
+            ("GET", "/tables/{table}/rows", self.get_rows),
+            ("POST", "/tables/{table}/rows", self.add_rows),
+            ("GET", "/tables/{table}/rows/{id}", self.get_row),
+            ("PUT", "/tables/{table}/rows/{id}", self.update_row),
+            ("DELETE", "/tables/{table}/rows/{id}", self.delete_row),
+            ("POST", "/join", self.join),
+            ("POST", "/query", self.query),
+        ]:
+            regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+            self.routes.append((method, regex, handler))
+
+    # --- виконання --------------------------------------------------------------
+
+    async def read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.reader_pool, fn, *args)
+
+    async def write(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.writer_pool, self._write, fn, args)
+
+    def _write(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        result = fn(*args)
+        if self.log is not None:
+            self.log.save()
+        return result
+
+    def _snapshot(self, name: str) -> Table:
+        return self._snapshots(name)[0]
+
+    def _snapshots(self, *names: str) -> List[Table]:
+        # знімки лише потрібних таблиць, узяті разом під замком бази
+        with self.db._lock:
+            return [_table(self.db, name).snapshot() for name in names]
+
+    async def _stream(self, make_iter: Callable[[], Iterator[Any]]) -> Stream:
+        # таблиці й курсор готуються до відповіді, тож помилка (404, 400) ще має свій статус;
+        # відкладається лише читання порцій
+        it = await self.read(make_iter)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            while True:
+                data = await self.read(_ndjson, it, STREAM_BATCH)
+                if not data:
+                    return
+                yield data
+        return Stream(chunks())
+
+    # --- обробники --------------------------------------------------------------
+
+    async def get_db(self, req: Request) -> Response:
+        return 200, {"name": self.db.name, "tables": self.db.list_tables(),
+                     "path": self.log.base_path if self.log else None,
+                     "cache": self.db.cache.stats() if self.db.cache is not None else None}
+
+    async def save_db(self, req: Request) -> Response:
+        if self.log is None:
+            raise HttpError(400, "Database is not backed by a file")
+        await self.write(self.log.checkpoint)
+        return 200, {"saved": self.log.base_path}
+
+    def _describe(self, t: Table) -> Dict[str, Any]:
+        d = t.schema_dict()
+        d["rows"] = t.row_count()
+        return d
+
+    async def list_tables(self, req: Request) -> Response:
+        def run() -> List[Dict[str, Any]]:
+            with self.db.begin() as tx:
+                return [self._describe(tx.table(n)) for n in tx.list_tables()]
+        return 200, await self.read(run)
+
+    async def get_table(self, req: Request, table: str) -> Response:
+        return 200, await self.read(lambda: self._describe(self._snapshot(table)))
+
+    async def create_table(self, req: Request) -> Response:
+        body = req.json()
+        columns = [Column(**c) for c in body.get("columns", [])] if isinstance(body, dict) else []
+        t = Table(name=_field(body, "name"), columns=columns)
+        for c in columns:
+            c.validate(c.default)
+        await self.write(self.db.add_table, t)
+        return 201, self._describe(t)
+
+    async def rename_table(self, req: Request, table: str) -> Response:
+        new = _field(req.json(), "name")
+        await self.write(lambda: self.db.rename_table(_table(self.db, table).name, new))
+        return 200, {"name": new}
+
+    async def delete_table(self, req: Request, table: str) -> Response:
+        await self.write(lambda: self.db.delete_table(_table(self.db, table).name))
+        return 200, {"deleted": table}
+
+    async def add_column(self, req: Request, table: str) -> Response:
+        column = Column(**req.json())
+        await self.write(lambda: _table(self.db, table).add_column(column))
+        return 201, column.schema()
+
+    async def convert_column(self, req: Request, table: str, column: str) -> Response:
+        body = req.json()
+        dtype = _field(body, "dtype")
+        await self.write(lambda: _table(self.db, table).convert_column(column, dtype, body.get("enum_values")))
+        return 200, {"name": column, "dtype": dtype}
+
+    async def delete_column(self, req: Request, table: str, column: str) -> Response:
+        await self.write(lambda: _table(self.db, table).delete_column(column))
+        return 200, {"deleted": column}
+
+    async def get_rows(self, req: Request, table: str) -> Response:
+        # сторінка ?offset=&limit= з id рядків або ?stream=1 — усі рядки знімка як NDJSON
+        offset = req.arg("offset", 0)
+        if req.flag("stream"):
+            return await self._stream(lambda: islice(self._snapshot(table).iter_rows(), offset, None))
+        limit = req.arg("limit", DEFAULT_PAGE, 1, MAX_PAGE)
+
+        def run() -> Dict[str, Any]:
+            t = self._snapshot(table)
+            total = t.row_count()
+            stop = min(total, offset + limit)
+            positions = range(offset, stop)
+            return {"total": total, "offset": offset, "next": stop if stop < total else None,
+                    "ids": [t.row_id(p) for p in positions], "rows": [t.row(p) for p in positions]}
+        return 200, await self.read(run)
+
+    async def add_rows(self, req: Request, table: str) -> Response:
+        # один рядок (об'єкт) або пачка (масив); помилкові рядки пачки пропускаються
+        body = req.json()
+        if isinstance(body, dict):
+            rid = await self.write(lambda: _table(self.db, table).add_row(body))
+            return 201, {"id": rid}
+        if not isinstance(body, list):
+            raise HttpError(400, "Expected a row object or an array of rows")
+        errors = await self.write(lambda: _table(self.db, table).add_rows(body))
+        return 201, {"inserted": len(body) - len(errors),
+                     "errors": [{"index": i, "error": msg} for i, msg in errors]}
+
+    def _row_id(self, raw: str) -> int:
+        try:
+            return int(raw)
+        except ValueError:
+            raise HttpError(404, f"No row with id {raw}")
+
+    async def get_row(self, req: Request, table: str, id: str) -> Response:
+        rid = self._row_id(id)
+        def run() -> Dict[str, Any]:
+            t = self._snapshot(table)
+            return t.get(_check_row(t, rid))
+        return 200, await self.read(run)
+
+    async def update_row(self, req: Request, table: str, id: str) -> Response:
+        rid, values = self._row_id(id), req.json()
+        if not isinstance(values, dict):
+            raise HttpError(400, "Expected a row object")
+
+        def run() -> Dict[str, Any]:
+            t = _table(self.db, table)
+            t.update(_check_row(t, rid), values)
+            return t.get(rid)
+        return 200, await self.write(run)
+
+    async def delete_row(self, req: Request, table: str, id: str) -> Response:
+        rid = self._row_id(id)
+        def run() -> None:
+            t = _table(self.db, table)
+            t.delete(_check_row(t, rid))
+        await self.write(run)
+        return 200, {"deleted": rid}
+
+    async def join(self, req: Request) -> Response:
+        body = req.json()
+        left, right, on = _field(body, "left"), _field(body, "right"), _field(body, "on")
+        how = body.get("how", "inner")
+
+        def cursor() -> Any:
+            return iter_join(*self._snapshots(left, right), on, how)
+        if body.get("stream"):
+            return await self._stream(cursor)
+        limit = req.arg("limit", DEFAULT_PAGE, 1, MAX_PAGE)
+        return 200, await self.read(lambda: {"rows": cursor().fetch(limit)})
+
+    async def query(self, req: Request) -> Response:
+        sql = _field(req.json(), "sql")
+
+        def run() -> List[Dict[str, Any]]:
+            # транзакція знімає лише таблиці, які читає запит
+            with self.db.begin() as tx:
+                return tx.query(sql)
+        return 200, await self.read(run)
+
+    # --- HTTP -------------------------------------------------------------------
+
+    async def dispatch(self, req: Request) -> Response:
+        allowed = []
+        for method, regex, handler in self.routes:
+            m = regex.match(req.path)
+            if m is None:
+                continue
+            if method != req.method:
+                allowed.append(method)
+                continue
+            return await handler(req, **{k: unquote(v) for k, v in m.groupdict().items()})
+        if allowed:
+            raise HttpError(405, f"Method {req.method} is not allowed for {req.path}")
+        raise HttpError(404, f"No route for {req.path}")
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        else:
+            raise HttpError(400, "Too many headers")
+        if "chunked" in headers.get("transfer-encoding", ""):
+            raise HttpError(411, "Chunked request bodies are not supported")
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY:
+            raise HttpError(413, f"Request body exceeds {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), headers, body)
+
+    @staticmethod
+    def _head(status: int, extra: str, keep_alive: bool) -> bytes:
+        conn = "keep-alive" if keep_alive else "close"
+        return f"HTTP/1.1 {status} {STATUS.get(status, '')}\r\n{extra}Connection: {conn}\r\n\r\n".encode("latin-1")
+
+    async def _send(self, writer: asyncio.StreamWriter, result: Response, keep_alive: bool) -> None:
+        if isinstance(result, Stream):
+            writer.write(self._head(200, "Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n",
+                                    keep_alive))
+            async for data in result.chunks:
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        else:
+            status, payload = result
+            data = _encoder.encode(payload).encode("utf-8")
+            writer.write(self._head(status, f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n",
+                                    keep_alive) + data)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    req = await self._read_request(reader)
+                    if req is None:
+                        break
+                    keep_alive = req.headers.get("connection", "").lower() != "close"
+                    result = await self.dispatch(req)
+                except HttpError as e:
+                    result = (e.status, {"error": str(e)})
+                except IndexError as e:
+                    result = (404, {"error": str(e)})
+                except (ValueError, TypeError) as e:
+                    result = (400, {"error": str(e)})
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    result = (500, {"error": f"{type(e).__name__}: {e}"})
+                await self._send(writer, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self, server: asyncio.AbstractServer) -> None:
+        # закриває сокет і відкриті keep-alive з'єднання
+        server.close()
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await server.wait_closed()
+
+    def close(self) -> None:
+        self.writer_pool.shutdown(wait=True)
+        self.reader_pool.shutdown(wait=True)
+        if self.log is not None:
+            self.log.checkpoint()
+            self.log.close()
+
+
+def open_database(path: Optional[str]) -> Database:
+    if path and os.path.exists(path):
+        return load_from_file(path)
+    name = os.path.splitext(os.path.basename(path))[0] if path else "db"
+    return Database(name=name)
+
+
+async def serve(db: Database, host: str, port: int, path: Optional[str] = None, readers: int = 4) -> None:
+    api = ApiServer(db, path, readers)
+    server = await api.start(host, port)
+    print(f"Serving '{db.name}' on http://{host}:{server.sockets[0].getsockname()[1]}")
+    try:
+        await server.serve_forever()
+    finally:
+        await api.stop(server)
+        api.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Mini DBMS HTTP API")
+    ap.add_argument("--db", help="database file (.json or .minidb); changes are journaled next to it")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--readers", type=int, default=4, help="threads serving reads")
+    ap.add_argument("--cache-mb", type=float, default=0, help="cache /query results up to this many MiB")
+    args = ap.parse_args()
+    db = open_database(args.db)
+    if args.cache_mb > 0:
+        db.cache = ResultCache(int(args.cache_mb * 2**20))
+    try:
+        asyncio.run(serve(db, args.host, args.port, args.db, args.readers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
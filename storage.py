@@ -1,11 +1,411 @@
+import codecs
 import json
-from models import Database
+import os
+import re
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
 
-def save_to_file(db: Database, path: str) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(db.to_dict(), f, ensure_ascii=False, indent=2)
+# progress(done, total) — необов'язковий колбек довгих операцій; виняток із нього
+# (наприклад, tasks.Cancelled) перериває операцію, не пошкодивши файл на диску
+Progress = Callable[[int, Optional[int]], None]
 
-def load_from_file(path: str) -> Database:
-    with open(path, "r", encoding="utf-8") as f:
-        d = json.load(f)
-    return Database.from_dict(d)
+import binstore
+import paged
+import profiling
+import wal
+from models import Column, Database, Table
+from rowstore import compact_rows
+
+CHUNK_SIZE = 1 << 16
+_WS = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def save_to_file(db: Database, path: str, progress: Optional[Progress] = None) -> None:
+    if binstore.is_binary_path(path):
+        binstore.save(db, path, progress)
+    elif paged.is_paged_path(path):
+        paged.save(db, path, progress)
+    else:
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                _write_database(db, f, progress)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, path)
+    # журнал від іншого вмісту цього файлу більше не відповідає базі
+    if os.path.exists(wal.wal_path(path)) and wal.attached_log(db, path) is None:
+        os.remove(wal.wal_path(path))
+
+
+def load_from_file(path: str, lazy: bool = False, progress: Optional[Progress] = None,
+                   compact: bool = False) -> Database:
+    # compact — рядки JSON-таблиць зберігаються кортежами (rowstore.TupleStore)
+    if binstore.is_binary_path(path):
+        # колонки відображаються через mmap, тож файл і так відкривається ледаче
+        db = binstore.load(path)
+    elif paged.is_paged_path(path):
+        # рядки лишаються на диску й читаються сторінками через буферний пул
+        db = paged.load(path)
+    elif lazy:
+        db = _open_lazy(path, progress)
+    else:
+        db = _load_json(path, progress, compact)
+    with profiling.span("storage.wal_replay"):
+        wal.replay(db, path)
+    return db
+
+
+def _load_json(path: str, progress: Optional[Progress] = None, compact: bool = False) -> Database:
+    with open(path, "rb") as f:
+        r = _JsonReader(f, progress=progress)
+        db = Database(name="")
+        for key in r.members():
+            if key == "name":
+                db.name = r.value()
+            elif key == "lsn":
+                db.lsn = r.value()
+            elif key == "tables":
+                for name in r.members():
+                    with profiling.span("storage.parse") as sp:
+                        db.tables[name] = db.adopt(_read_table(r, compact))
+                        if sp is not None:
+                            sp.items = db.tables[name].row_count()
+            else:
+                r.skip()
+    return db
+
+
+def iter_tables(path: str) -> Iterator[Table]:
+    if binstore.is_binary_path(path):
+        yield from binstore.load(path).tables.values()
+        return
+    if paged.is_paged_path(path):
+        yield from paged.load(path).tables.values()
+        return
+    with open(path, "rb") as f:
+        r = _JsonReader(f)
+        for key in r.members():
+            if key != "tables":
+                r.skip()
+                continue
+            for _ in r.members():
+                yield _read_table(r)
+
+
+def iter_rows(path: str, table: str) -> Iterator[Dict[str, Any]]:
+    if binstore.is_binary_path(path):
+        yield from binstore.load(path).get_table(table).rows
+        return
+    if paged.is_paged_path(path):
+        yield from paged.load(path).get_table(table).rows
+        return
+    with open(path, "rb") as f:
+        r = _JsonReader(f)
+        for key in r.members():
+            if key != "tables":
+                r.skip()
+                continue
+            for name in r.members():
+                if name != table:
+                    r.skip()
+                    continue
+                for tkey in r.members():
+                    if tkey != "rows":
+                        r.skip()
+                        continue
+                    yield from r.values()
+                return
+    raise ValueError(f"No such table '{table}'")
+
+
+# --- запис ----------------------------------------------------------------
+
+def _dumps(v: Any) -> str:
+    return _encoder.encode(v)
+
+
+def _write_database(db: Database, f: BinaryIO, progress: Optional[Progress] = None) -> None:
+    # catalog_offset доповнюється пробілами до фіксованої ширини і дописується в кінці,
+    # щоб ледаче відкриття могло одразу перейти до каталогу зміщень таблиць
+    lsn = f'"lsn": {db.lsn}, ' if db.lsn else ""
+    f.write(f'{{"name": {_dumps(db.name)}, {lsn}"catalog_offset": '.encode("utf-8"))
+    slot = f.tell()
+    f.write(b" " * 20 + b', "tables": {')
+    catalog: Dict[str, Tuple[int, int]] = {}
+    tables = db.tables.items()
+    total = sum(t.row_count() for _, t in tables) if progress is not None else None
+    done = 0
+    for i, (name, t) in enumerate(tables):
+        f.write(f'{"," if i else ""}\n{_dumps(name)}: '.encode("utf-8"))
+        start = f.tell()
+        with profiling.span("storage.serialize", t.row_count()):
+            if progress is not None:
+                base = done
+                _write_table(t, f, progress=lambda n: progress(base + n, total))
+                done += t.row_count()
+            else:
+                _write_table(t, f)
+        catalog[name] = (start, f.tell() - start)
+    f.write(b'\n}, "catalog": ')
+    cat_offset = f.tell()
+    f.write(_dumps(catalog).encode("utf-8"))
+    f.write(b"}\n")
+    f.seek(slot)
+    f.write(str(cat_offset).encode("ascii"))
+
+
+def _write_table(t: Table, f: BinaryIO, batch: int = 1000,
+                 progress: Optional[Callable[[int], None]] = None) -> None:
+    header = _dumps(t.schema_dict())
+    f.write(header[:-1].encode("utf-8") + b', "rows": [')
+    buf = []
+    first = True
+    written = 0
+    for row in t.iter_rows():
+        buf.append(_dumps(row))
+        if len(buf) >= batch:
+            f.write((("" if first else ",") + "\n" + ",\n".join(buf)).encode("utf-8"))
+            first = False
+            written += len(buf)
+            buf = []
+            if progress is not None:
+                progress(written)
+    if buf:
+        f.write((("" if first else ",") + "\n" + ",\n".join(buf)).encode("utf-8"))
+    f.write(b"\n]}")
+
+
+# --- потокове читання -------------------------------------------------------
+
+class _JsonReader:
+    def __init__(self, f: BinaryIO, offset: int = 0, progress: Optional[Progress] = None):
+        self.f = f
+        self.progress = progress
+        self.size = os.fstat(f.fileno()).st_size if progress is not None else None
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.base = offset
+        self.eof = False
+        if offset:
+            f.seek(offset)
+
+    def _fill(self) -> bool:
+        if self.pos:
+            self.base += len(self.buf[:self.pos].encode("utf-8"))
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        if self.eof:
+            return False
+        data = self.f.read(CHUNK_SIZE)
+        if not data:
+            self.eof = True
+            self.buf += self.decoder.decode(b"", final=True)
+            return False
+        self.buf += self.decoder.decode(data)
+        if self.progress is not None:
+            self.progress(self.f.tell(), self.size)
+        return True
+
+    def tell(self) -> int:
+        return self.base + len(self.buf[:self.pos].encode("utf-8"))
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON at byte {self.tell()}: expected '{ch}', got '{got}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                v, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # число на межі буфера може продовжуватися в наступному шматку
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return v
+
+    def members(self) -> Iterator[str]:
+        # після кожного ключа викликач мусить прочитати або пропустити значення
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def values(self) -> Iterator[Any]:
+        # масив значень (рядків таблиці). Рядки JSON не містять сирих переводів рядка,
+        # тож шматок буфера до останнього "\n" зазвичай можна розібрати одним json.loads
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        batch = True
+        while True:
+            if batch:
+                nl = self.buf.rfind("\n", self.pos)
+                if nl > self.pos:
+                    chunk = self.buf[self.pos:nl].rstrip()
+                    trailing = chunk.endswith(",")
+                    try:
+                        vals = json.loads("[" + (chunk[:-1] if trailing else chunk) + "]")
+                    except ValueError:
+                        batch = False
+                    else:
+                        self.pos = nl
+                        yield from vals
+                        if not trailing:
+                            if self.peek() == "]":
+                                self.pos += 1
+                                return
+                            self.expect(",")
+                        self.peek()
+                        continue
+            yield self.value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+            self.peek()
+
+    def skip(self) -> None:
+        # великі об'єкти/масиви обходимо по елементах, щоб не тримати їх цілком у пам'яті
+        ch = self.peek()
+        if ch == "{":
+            for _ in self.members():
+                self.skip()
+        elif ch == "[":
+            for _ in self.values():
+                pass
+        else:
+            self.value()
+
+
+def _read_table(r: _JsonReader, compact: bool = False) -> Table:
+    t = Table(name="")
+    index_kinds: Dict[str, str] = {}
+    for key in r.members():
+        if key == "name":
+            t.name = r.value()
+        elif key == "columns":
+            t.columns = [Column(**c) for c in r.value()]
+        elif key == "indexes":
+            index_kinds = r.value()
+        elif key == "rows":
+            # колонки записуються перед рядками (schema_dict), тож схема кортежів уже відома
+            if compact:
+                t.rows = compact_rows(t.columns, r.values())
+            else:
+                t.rows.extend(r.values())
+        else:
+            r.skip()
+    t.intern_strings()
+    for name, kind in index_kinds.items():
+        t.create_index(name, kind)
+    return t
+
+
+# --- ледаче відкриття -------------------------------------------------------
+
+_UNLOADED = object()
+
+
+class LazyTables(dict):
+    def __init__(self, path: str, offsets: Dict[str, int], on_load: Optional[Callable[[Table], Table]] = None):
+        super().__init__((name, _UNLOADED) for name in offsets)
+        self.path = path
+        self.offsets = offsets
+        self.on_load = on_load
+
+    def _load(self, name: str, progress: Optional[Progress] = None) -> Table:
+        with open(self.path, "rb") as f:
+            t = _read_table(_JsonReader(f, self.offsets[name], progress))
+        if self.on_load is not None:
+            t = self.on_load(t)
+        dict.__setitem__(self, name, t)
+        return t
+
+    def __getitem__(self, name: str) -> Table:
+        t = dict.__getitem__(self, name)
+        return self._load(name) if t is _UNLOADED else t
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def pop(self, name: str, *default: Any) -> Any:
+        if name in self:
+            t = self[name]
+            dict.__delitem__(self, name)
+            return t
+        return dict.pop(self, name, *default)
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+    def is_loaded(self, name: str) -> bool:
+        return dict.__getitem__(self, name) is not _UNLOADED
+
+    def load(self, name: str, progress: Optional[Progress] = None) -> Table:
+        # як self[name], але з прогресом (у байтах файлу) для великих таблиць
+        t = dict.__getitem__(self, name)
+        return self._load(name, progress) if t is _UNLOADED else t
+
+
+def _open_lazy(path: str, progress: Optional[Progress] = None) -> Database:
+    db = Database(name="")
+    offsets: Dict[str, int] = {}
+    with open(path, "rb") as f:
+        r = _JsonReader(f, progress=progress)
+        catalog_offset: Optional[int] = None
+        for key in r.members():
+            if key == "name":
+                db.name = r.value()
+            elif key == "lsn":
+                db.lsn = r.value()
+            elif key == "catalog_offset":
+                catalog_offset = r.value()
+                break
+            elif key == "tables":
+                # старий формат без каталогу: один прохід, запам'ятовуючи зміщення
+                for name in r.members():
+                    offsets[name] = _value_offset(r)
+                    r.skip()
+            else:
+                r.skip()
+        if catalog_offset is not None:
+            r = _JsonReader(f, catalog_offset)
+            offsets = {name: start for name, (start, _) in r.value().items()}
+    db.tables = LazyTables(path, offsets, on_load=db.adopt)
+    return db
+
+
+def _value_offset(r: _JsonReader) -> int:
+    r.peek()
+    return r.tell()
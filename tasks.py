@@ -0,0 +1,128 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import profiling
+
+# Виконання довгих операцій (завантаження, збереження, join, конвертація колонки) у
+# пулі потоків. Робоча функція отримує Task першим аргументом і повідомляє прогрес через
+# task.progress(done, total); той самий виклик кидає Cancelled після task.cancel().
+# Колбеки on_done/on_error/on_progress/on_cancel ніколи не викликаються з робочого
+# потоку: події йдуть у чергу, яку головний потік вибирає через schedule (Tk.after).
+
+Schedule = Callable[[int, Callable[[], None]], Any]
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, runner: "TaskRunner", fn: Callable[..., Any], args: tuple,
+                 on_done: Optional[Callable[[Any], None]], on_error: Optional[Callable[[BaseException], None]],
+                 on_progress: Optional[Callable[[int, Optional[int]], None]],
+                 on_cancel: Optional[Callable[[], None]]):
+        self.runner = runner
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.done = 0
+        self.total: Optional[int] = None
+        self.finished = threading.Event()
+        self._cancelled = threading.Event()
+        self._progress_posted = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        # можна передавати як колбек progress у storage/Table; часті виклики зливаються в одну подію
+        self.check()
+        self.done, self.total = done, total
+        if self.on_progress is not None and not self._progress_posted:
+            self._progress_posted = True
+            self.runner._post(self, "progress", None)
+
+    def _run(self) -> None:
+        try:
+            self.check()
+            # під час profiling.Capture задача профілюється й потрапляє до його звіту
+            result = profiling.call(self.fn, self, *self.args)
+        except Cancelled:
+            self.runner._post(self, "cancel", None)
+        except BaseException as e:
+            self.runner._post(self, "error", e)
+        else:
+            self.runner._post(self, "done", result)
+
+
+class TaskRunner:
+    def __init__(self, schedule: Schedule, workers: int = 2, poll_ms: int = 50):
+        self.schedule = schedule
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="minidb-task")
+        self.events: "queue.Queue[Any]" = queue.Queue()
+        self.tasks: "set[Task]" = set()
+        self._polling = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None) -> Task:
+        # викликати з головного потоку
+        task = Task(self, fn, args, on_done, on_error, on_progress, on_cancel)
+        self.tasks.add(task)
+        self.executor.submit(task._run)
+        if not self._polling:
+            self._polling = True
+            self.schedule(self.poll_ms, self.poll)
+        return task
+
+    def _post(self, task: Task, kind: str, payload: Any) -> None:
+        self.events.put((task, kind, payload))
+
+    def poll(self) -> None:
+        # доставляє накопичені події в поточному (головному) потоці
+        while True:
+            try:
+                task, kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                task._progress_posted = False
+                if not task.finished.is_set():
+                    task.on_progress(task.done, task.total)
+                continue
+            self.tasks.discard(task)
+            task.finished.set()
+            if kind == "done":
+                if task.on_done is not None:
+                    task.on_done(payload)
+            elif kind == "cancel":
+                if task.on_cancel is not None:
+                    task.on_cancel()
+            elif task.on_error is not None:
+                task.on_error(payload)
+        if self.tasks:
+            self.schedule(self.poll_ms, self.poll)
+        else:
+            self._polling = False
+
+    def shutdown(self, cancel: bool = True) -> None:
+        if cancel:
+            for task in self.tasks:
+                task.cancel()
+        self.executor.shutdown(wait=not cancel, cancel_futures=cancel)
@@ -1,5 +1,33 @@
+import json
+import os
+import sys
+import tempfile
 import unittest
-from models import Database, Column, join_tables
+import unittest.mock
+from models import Database, Table, Column, join_tables
+from columnar import ColumnStore, make_columnar
+import binstore
+import bulk
+import cache
+import joins
+import models
+import paged
+import parallel
+import profiling
+import query
+import rowstore
+import server
+import tasks
+import transactions
+import vectorized
+import threading
+import asyncio
+import asyncdb
+import http.client
+import storage
+import wal
+from benchmarks import suite
+from benchmarks._common import skewed_keys
 
 class TestMiniDBMS(unittest.TestCase):
     def setUp(self):
@@ -75,5 +103,1365 @@ class TestMiniDBMS(unittest.TestCase):
             _ = join_tables(orders, users, key="unknown_key")
 
 
+class TestColumnStore(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("Orders", columns=[
+            Column("id", "integer"),
+            Column("price", "real"),
+            Column("status", "enum", enum_values=["NEW", "PAID"]),
+        ])
+        make_columnar(self.t)
+        self.t.add_row({"id": 1, "price": 9.5, "status": "NEW"})
+        self.t.add_row({"id": 2, "status": "PAID"})
+        self.t.add_row({"id": 3, "price": 1.0, "status": "NEW"})
+
+    def test_row_api(self):
+        with self.subTest("nulls survive"):
+            self.assertIsNone(self.t.rows[1]["price"], msg="Порожнє значення має лишитися None")
+        with self.subTest("edit and delete"):
+            self.t.edit_row(1, {"price": "2.5"})
+            self.t.delete_row(0)
+            self.assertEqual([r["id"] for r in self.t.rows], [2, 3])
+            self.assertEqual(self.t.rows[0]["price"], 2.5)
+        with self.subTest("dictionary encoding"):
+            self.assertIsInstance(self.t.rows, ColumnStore)
+            self.assertEqual(self.t.rows.buffers["status"].dictionary, ["NEW", "PAID"])
+
+    def test_schema_changes_and_to_dict(self):
+        self.t.add_column(Column("note", "string"))
+        self.t.delete_column("price")
+        self.t.convert_column("id", "real")
+        d = self.t.to_dict()
+        self.assertEqual(d["rows"][0], {"id": 1.0, "status": "NEW", "note": None})
+        self.assertEqual(Table.from_dict(d).rows, list(self.t.rows), msg="Round-trip через to_dict")
+
+    def test_integer_overflow_rejected(self):
+        with self.assertRaises(ValueError):
+            self.t.add_row({"id": 2**70})
+        self.assertEqual(len(self.t.rows), 3, msg="Невдалий рядок не має лишати слідів")
+        with self.assertRaises(ValueError):
+            self.t.edit_row(0, {"price": 5.0, "id": 2**70})
+        self.assertEqual(self.t.row(0), {"id": 1, "price": 9.5, "status": "NEW"}, msg="Невдала зміна не змінює рядок")
+
+    def test_rows_after_added_column(self):
+        for n in (3, 9, 16):
+            with self.subTest(rows=n):
+                t = make_columnar(Table("C", [Column("a", "integer")]))
+                t.add_rows({"a": i} for i in range(n))
+                t.add_column(Column("b", "integer"))
+                t.add_column(Column("s", "string"))
+                t.add_row({"a": 99, "b": 5, "s": "x"})
+                self.assertEqual(t.row(n), {"a": 99, "b": 5, "s": "x"}, msg="Значення після add_column не губляться")
+                t.delete_row(0)
+                t.delete_row(0)
+                self.assertEqual([r["a"] for r in t.iter_rows()], list(range(2, n)) + [99])
+                self.assertEqual(t.row(n - 2), {"a": 99, "b": 5, "s": "x"})
+                self.assertIsNone(t.row(0)["b"])
+
+
+class TestCompactRows(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("Orders", columns=[Column("id", "integer"), Column("status", "enum", enum_values=["NEW", "PAID"])])
+        self.t.add_rows({"id": i, "status": "NEW" if i % 3 else "PAID"} for i in range(10))
+        self.t.create_index("id", "hash")
+        self.t.delete_row(2)
+        self.t.add_column(Column("note", "string", default="-"))
+        self.plain = Table.from_dict(self.t.to_dict())
+        rowstore.make_compact(self.t)
+
+    def test_row_api_matches_dict_rows(self):
+        self.assertIsInstance(self.t.rows, rowstore.TupleStore)
+        self.assertEqual(list(self.t.iter_rows()), list(self.plain.iter_rows()))
+        self.assertEqual(self.t.row(2), {"id": 3, "status": "PAID", "note": "-"})
+        snap = self.t.snapshot()
+        for t in (self.t, self.plain):
+            rid = t.add_row({"id": "42", "status": "NEW"})
+            t.edit_row(0, {"note": "x"})
+            t.delete(t.row_id(3))
+            t.convert_column("id", "real")
+            t.delete_column("status")
+            self.assertEqual(t.get(rid), {"id": 42.0, "note": None})
+        self.assertEqual(list(self.t.iter_rows()), list(self.plain.iter_rows()))
+        self.assertEqual(self.t.to_dict(), self.plain.to_dict())
+        self.assertEqual(snap.row(0), {"id": 0, "status": "PAID", "note": "-"}, msg="Знімок не бачить пізніших змін")
+        self.assertEqual(self.t.indexes["id"].lookup(42.0), self.plain.indexes["id"].lookup(42.0))
+
+    def test_query_join_and_loading(self):
+        q = lambda t: query.Query(t).where("status", "=", "NEW").where("id", ">", 3).select("id").rows()
+        self.assertEqual(q(self.t), q(self.plain))
+        other = Table("S", [Column("status", "string"), Column("label", "string")])
+        other.add_rows([{"status": "NEW", "label": "n"}, {"status": "X", "label": "x"}])
+        for how in joins.HOWS:
+            with self.subTest(how):
+                got = joins.join(self.t, other, "status", how, compact=True)
+                self.assertIsInstance(got.rows, rowstore.TupleStore)
+                self.assertEqual(list(got.iter_rows()), joins.join(self.plain, other, "status", how).rows)
+        cursor = join_tables(self.t, other, "status", lazy=True, compact=True)
+        head = cursor.fetch(2)
+        self.assertEqual(cursor.to_table(head=head).to_dict()["rows"], join_tables(self.plain, other, "status").rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "db.json")
+            db = Database("c")
+            db.add_table(self.plain)
+            storage.save_to_file(db, path)
+            loaded = storage.load_from_file(path, compact=True).get_table("Orders")
+        self.assertIsInstance(loaded.rows, rowstore.TupleStore)
+        self.assertEqual(list(loaded.iter_rows()), list(self.plain.iter_rows()))
+        self.assertEqual(Table.from_dict(self.plain.to_dict(), compact=True).to_dict(), self.plain.to_dict())
+
+    def test_smaller_than_dict_rows(self):
+        sizes = lambda rows: sum(map(sys.getsizeof, rows))
+        self.assertLess(sizes(self.t.rows.rows), sizes(self.plain.rows) / 2,
+                        msg="Кортеж рядка має займати менше половини dict")
+
+
+class TestBatchInsert(unittest.TestCase):
+    def test_add_rows_reports_errors_per_row(self):
+        t = Table("Users", columns=[
+            Column("id", "integer"),
+            Column("email", "email"),
+            Column("grade", "char"),
+        ])
+        errors = t.add_rows([
+            {"id": "1", "email": "a@example.com", "grade": "A"},
+            {"id": "x", "email": "b@example.com"},
+            {"id": 3, "email": "not-an-email", "grade": "B"},
+            {"id": 4, "email": "a@example.com", "grade": None},
+        ], batch_size=2)
+        with self.subTest("bad rows skipped, good rows kept"):
+            self.assertEqual([r["id"] for r in t.rows], [1, 4], msg="Мали лишитися лише валідні рядки")
+        with self.subTest("errors carry input position"):
+            self.assertEqual([i for i, _ in errors], [1, 2])
+            self.assertIn("email", errors[1][1])
+
+    def test_validator_follows_dtype_change(self):
+        col = Column("v", "string")
+        self.assertEqual(col.validate(5), "5")
+        col.dtype = "integer"
+        with self.assertRaises(ValueError):
+            col.validate("abc")
+
+
+class TestIndexes(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("Items", columns=[Column("id", "integer"), Column("tag", "string")])
+        self.t.add_rows({"id": i, "tag": "even" if i % 2 == 0 else "odd"} for i in range(10))
+        self.t.create_index("id", "sorted")
+        self.t.create_index("tag", "hash")
+
+    def test_indexes_follow_mutations(self):
+        self.t.delete_row(0)
+        self.t.edit_row(0, {"tag": "even"})
+        self.t.add_row({"id": 42, "tag": "odd"})
+        with self.subTest("hash lookup"):
+            self.assertEqual(sorted(r["id"] for r in self.t.find("tag", "odd")), [3, 5, 7, 9, 42])
+        with self.subTest("sorted range"):
+            self.assertEqual([r["id"] for r in self.t.find_range("id", "3", 6)], [3, 4, 5, 6])
+        with self.subTest("index matches a fresh rebuild"):
+            self.t.compact()
+            fresh = Table.from_dict(self.t.to_dict())
+            self.assertEqual({k: sorted(v) for k, v in self.t.indexes["tag"].buckets.items()},
+                             fresh.indexes["tag"].buckets)
+            self.assertEqual(fresh.indexes["id"].positions, self.t.indexes["id"].positions)
+
+    def test_delete_column_drops_index(self):
+        self.t.delete_column("tag")
+        self.assertNotIn("tag", self.t.indexes, msg="Індекс видаленої колонки має зникнути")
+        with self.assertRaises(ValueError):
+            self.t.find_range("tag", "a", "b")
+
+    def test_join_uses_right_index(self):
+        left = Table("L", columns=[Column("id", "integer"), Column("v", "string")])
+        left.add_rows([{"id": 1, "v": "a"}, {"id": 3, "v": "b"}, {"id": 3, "v": "c"}])
+        joined = join_tables(left, self.t, key="id")
+        self.assertEqual([(r["v"], r["tag"]) for r in joined.rows], [("a", "odd"), ("b", "odd"), ("c", "odd")])
+
+
+class TestJoins(unittest.TestCase):
+    def setUp(self):
+        self.left = Table("L", [Column("a", "integer"), Column("b", "string"), Column("v", "string")])
+        self.left.add_rows([{"a": 1, "b": "x", "v": "l1"}, {"a": 1, "b": "y", "v": "l2"},
+                            {"a": 2, "b": "x", "v": "l3"}, {"a": None, "b": "x", "v": "l4"}])
+        self.right = Table("R", [Column("a", "integer"), Column("b", "string"), Column("v", "string")])
+        self.right.add_rows([{"a": 1, "b": "x", "v": "r1"}, {"a": 1, "b": "x", "v": "r2"},
+                             {"a": 3, "b": "z", "v": "r3"}])
+
+    def _pairs(self, t):
+        return sorted((r["v"] or "", r["v_y"] or "") for r in t.rows)
+
+    def test_join_types_agree_across_strategies(self):
+        expected = {
+            "inner": [("l1", "r1"), ("l1", "r2")],
+            "left": [("l1", "r1"), ("l1", "r2"), ("l2", ""), ("l3", ""), ("l4", "")],
+            "right": [("", "r3"), ("l1", "r1"), ("l1", "r2")],
+            "outer": [("", "r3"), ("l1", "r1"), ("l1", "r2"), ("l2", ""), ("l3", ""), ("l4", "")],
+        }
+        for how, pairs in expected.items():
+            for strategy in ("hash", "merge", "partitioned"):
+                with self.subTest(how=how, strategy=strategy):
+                    out = joins.join(self.left, self.right, ["a", "b"], how=how, strategy=strategy, partitions=3)
+                    self.assertEqual(out.column_names(), ["a", "b", "v", "v_y"])
+                    self.assertEqual(self._pairs(out), pairs, msg=f"Неправильний результат {how}/{strategy}")
+
+    def test_hash_join_keeps_left_major_order(self):
+        small = Table("S", [Column("a", "integer"), Column("v", "string")])
+        small.add_rows([{"a": 3, "v": "s1"}, {"a": 1, "v": "s2"}, {"a": 9, "v": "s3"}])
+        big = Table("B", [Column("a", "integer"), Column("w", "string")])
+        big.add_rows({"a": i % 4, "w": f"b{i}"} for i in range(12))
+        expected = {}
+        for how in joins.HOWS:
+            keep_left, keep_right = how in ("left", "outer"), how in ("right", "outer")
+            pairs = []
+            for l in small.rows:
+                hits = [(l["v"], r["w"]) for r in big.rows if r["a"] == l["a"]]
+                pairs += hits or ([(l["v"], None)] if keep_left else [])
+            if keep_right:
+                pairs += [(None, r["w"]) for r in big.rows if all(l["a"] != r["a"] for l in small.rows)]
+            expected[how] = pairs
+        for indexed in (False, True):
+            if indexed:
+                small.create_index("a", "hash")
+            for how, pairs in expected.items():
+                with self.subTest(how=how, indexed=indexed):
+                    out = joins.join(small, big, "a", how=how, strategy="hash")
+                    self.assertEqual([(r["v"], r["w"]) for r in out.rows], pairs,
+                                     msg="Побудова на меншій лівій стороні не змінює порядок рядків")
+
+    def test_unmatched_right_rows_keep_their_key(self):
+        out = joins.join(self.left, self.right, ["a", "b"], how="right")
+        self.assertIn({"a": 3, "b": "z", "v": None, "v_y": "r3"}, out.rows)
+
+    def test_auto_strategy_uses_indexes_and_spills(self):
+        self.left.create_index("a", "sorted")
+        self.right.create_index("a", "sorted")
+        self.assertEqual(joins._choose(self.left, self.right, ["a"], "auto", None), "merge")
+        self.assertEqual(joins._choose(self.left, self.right, ["a"], "auto", 2), "partitioned")
+        merged = joins.join(self.left, self.right, "a", how="outer")
+        hashed = joins.join(self.left, self.right, "a", how="outer", strategy="hash")
+        self.assertEqual(sorted(map(repr, merged.rows)), sorted(map(repr, hashed.rows)))
+
+    def test_cursor_is_lazy_and_limited(self):
+        cursor = join_tables(self.left, self.right, "a", lazy=True)
+        self.assertEqual(cursor.fetched, 0)
+        first = cursor.limit(1).fetch(5)
+        self.assertEqual(len(first), 1, msg="limit має обмежувати кількість рядків")
+        rest = join_tables(self.left, self.right, "a", lazy=True)
+        head = rest.fetch(1)
+        t = rest.to_table(head=head)
+        self.assertEqual(t.to_dict(), join_tables(self.left, self.right, "a").to_dict())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            joins.join(self.left, self.right, "a", how="cross")
+        with self.assertRaises(ValueError):
+            joins.join(self.left, self.right, [])
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("Q")
+        t = self.db.create_table("Items")
+        for c in (Column("id", "integer"), Column("status", "enum", ["new", "paid"]), Column("price", "real")):
+            t.add_column(c)
+        t.add_rows([{"id": i, "status": "paid" if i % 3 else "new", "price": None if i == 5 else float(i)}
+                    for i in range(1, 11)])
+        self.t = t
+
+    def test_sql_filter_order_limit(self):
+        rows = self.db.query("SELECT id, price AS p FROM Items WHERE status = 'paid' AND id >= 4 ORDER BY price DESC LIMIT 3")
+        self.assertEqual(rows, [{"id": 5, "p": None}, {"id": 10, "p": 10.0}, {"id": 8, "p": 8.0}],
+                         msg="NULL має бути першим при DESC, як у top-k, так і в сортуванні")
+
+    def test_group_by_aggregates(self):
+        rows = self.db.query("SELECT status, COUNT(*), COUNT(price) AS priced, SUM(price), AVG(id), MAX(price) "
+                             "FROM Items GROUP BY status ORDER BY status")
+        self.assertEqual(rows[0], {"status": "new", "count(*)": 3, "priced": 3, "sum(price)": 18.0,
+                                   "avg(id)": 6.0, "max(price)": 9.0})
+        self.assertEqual(rows[1]["count(*)"], 7)
+        self.assertEqual(rows[1]["priced"], 6)
+        self.assertEqual(self.db.query("SELECT COUNT(*) FROM Items WHERE id > 100"), [{"count(*)": 0}])
+
+    def test_index_pushdown_matches_scan(self):
+        q = lambda: query.Query(self.t).where("id", ">", 3).where("id", "<=", 7).where("status", "=", "paid")
+        expected = q().rows()
+        self.assertTrue(q().explain().startswith("Scan"))
+        self.t.create_index("id", "sorted")
+        self.assertTrue(q().explain().startswith("IndexScan Items.id in [3, 7]"))
+        self.assertEqual(q().rows(), expected)
+        self.t.create_index("status", "hash")
+        self.assertTrue(q().explain().startswith("IndexScan Items.status = 'paid'"))
+        self.assertEqual(q().rows(), expected)
+
+    def test_fractional_literals_are_not_truncated(self):
+        cases = [("id = 2.5", []), ("id != 2.5", list(range(1, 11))), ("id < 2.5", [1, 2]),
+                 ("id >= 2.5", list(range(3, 11))), ("id > 8.5", [9, 10]), ("id IN (2.5, 3)", [3])]
+        for indexed in (False, True):
+            if indexed:
+                self.t.create_index("id", "sorted")
+            for where, expected in cases:
+                with self.subTest(where, indexed=indexed):
+                    rows = self.db.query(f"SELECT id FROM Items WHERE {where}")
+                    self.assertEqual([r["id"] for r in rows], expected, msg="Літерал порівнюється без обрізання до цілого")
+
+    def test_literals_outside_column_domain(self):
+        self.t.add_row({"id": 11, "status": None, "price": 1.0})
+        cases = [("status = 'gone'", []), ("status != 'gone'", list(range(1, 11))),
+                 ("status IN ('gone', 'new')", [3, 6, 9]), ("status IN ('gone')", [])]
+        for label, prepare in [("rows", lambda: None), ("hash index", lambda: self.t.create_index("status", "hash")),
+                               ("columnar", lambda: make_columnar(self.t))]:
+            prepare()
+            for where, expected in cases:
+                with self.subTest(where, store=label):
+                    rows = self.db.query(f"SELECT id FROM Items WHERE {where}")
+                    self.assertEqual([r["id"] for r in rows], expected, msg="Значення поза enum нічому не дорівнює")
+        with self.assertRaises(ValueError):
+            self.db.query("SELECT id FROM Items WHERE status < 'gone'")
+
+    def test_builder_to_table_and_columnar_scan(self):
+        make_columnar(self.t)
+        res = (query.Query(self.t).where("price", "is null").select("id", "status").to_table("Nulls"))
+        self.assertEqual([c.dtype for c in res.columns], ["integer", "enum"])
+        self.assertEqual(res.rows, [{"id": 5, "status": "paid"}])
+
+    def test_invalid_queries(self):
+        bad = ["SELECT id FROM Items WHERE id = 1 OR id = 2",
+               "SELECT id, COUNT(*) FROM Items",
+               "SELECT id FROM Items WHERE id = 'x'",
+               "SELECT id FROM Missing",
+               "SELECT id FROM Items LIMIT"]
+        for sql in bad:
+            with self.subTest(sql=sql):
+                with self.assertRaises(ValueError):
+                    self.db.query(sql)
+
+
+class TestTasks(unittest.TestCase):
+    def setUp(self):
+        self.scheduled = []
+        self.runner = tasks.TaskRunner(lambda ms, fn: self.scheduled.append(fn))
+        self.addCleanup(self.runner.shutdown)
+
+    def drain(self, task):
+        # імітація циклу подій Tk: колбеки виконуються лише тут, у головному потоці
+        while not task.finished.is_set():
+            threading.Event().wait(0.005)
+            self.runner.poll()
+
+    def test_results_and_progress_delivered_on_poll(self):
+        seen = {}
+        main = threading.get_ident()
+        def work(task, n):
+            for i in range(n):
+                task.progress(i + 1, n)
+            return threading.get_ident()
+        task = self.runner.submit(work, 5, on_done=lambda r: seen.update(worker=r, thread=threading.get_ident()),
+                                  on_progress=lambda d, t: seen.update(progress=(d, t)))
+        self.drain(task)
+        self.assertNotEqual(seen["worker"], main, msg="Робота має виконуватися у фоновому потоці")
+        self.assertEqual(seen["thread"], main, msg="Колбеки — лише в головному потоці")
+        self.assertEqual(self.runner.tasks, set())
+
+    def test_cancel_leaves_table_and_file_untouched(self):
+        t = Table("T", [Column("v", "string")])
+        t.add_rows({"v": str(i)} for i in range(30000))
+        started, resume = threading.Event(), threading.Event()
+        outcome = []
+        def work(task):
+            def progress(done, total):
+                started.set()
+                resume.wait(5)
+                task.progress(done, total)
+            t.convert_column("v", "integer", progress=progress)
+        task = self.runner.submit(work, on_done=lambda r: outcome.append("done"), on_cancel=lambda: outcome.append("cancel"))
+        started.wait(5)
+        task.cancel()
+        resume.set()
+        self.drain(task)
+        self.assertEqual(outcome, ["cancel"])
+        self.assertEqual(t._column("v").dtype, "string")
+        self.assertEqual(t.rows[5]["v"], "5")
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "db.json")
+            db = Database("D")
+            db.add_table(t)
+            storage.save_to_file(db, path)
+            t.add_row({"v": "new"})
+            cancel = tasks.Task(self.runner, None, (), None, None, None, None)
+            cancel.cancel()
+            with self.assertRaises(tasks.Cancelled):
+                storage.save_to_file(db, path, progress=cancel.progress)
+            self.assertEqual(os.listdir(d), ["db.json"], msg="Тимчасовий файл має бути видалений")
+            self.assertEqual(len(storage.load_from_file(path).get_table("T").rows), 30000)
+
+
+class TestVectorized(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("N", [Column("i", "integer"), Column("x", "real")])
+        self.t.add_rows([{"i": v, "x": None if v % 4 == 0 else v / 2} for v in (5, 3, 8, 3, 1, 12, 7)])
+
+    def check_backend(self, use_numpy):
+        for store in ("rows", "columnar"):
+            t = make_columnar(self.t) if store == "columnar" else self.t
+            with self.subTest(store=store, numpy=use_numpy):
+                self.assertEqual(vectorized.filter_positions(t, "i", ">=", "5", use_numpy=use_numpy), [0, 2, 5, 6])
+                self.assertEqual(vectorized.filter_positions(t, "x", "<", 2, use_numpy=use_numpy), [1, 3, 4])
+                self.assertEqual(vectorized.filter_positions(t, "x", "is null", use_numpy=use_numpy), [2, 5])
+                self.assertEqual(vectorized.filter_positions(t, "i", "<", 3.5, use_numpy=use_numpy), [1, 3, 4],
+                                 msg="Дробовий літерал не обрізається до цілого")
+                self.assertEqual(vectorized.filter_positions(t, "i", "in", [3, 7.5, "12"], use_numpy=use_numpy), [1, 3, 5])
+                self.assertEqual(vectorized.aggregate(t, "x", "count", use_numpy=use_numpy), 5)
+                self.assertEqual(vectorized.aggregate(t, "x", "sum", use_numpy=use_numpy), 9.5)
+                self.assertEqual(vectorized.aggregate(t, "i", "max", [1, 3, 4], use_numpy=use_numpy), 3)
+                self.assertIsNone(vectorized.aggregate(t, "x", "mean", [2, 5], use_numpy=use_numpy))
+                self.assertEqual(vectorized.sort_positions(t, "i", use_numpy=use_numpy), [4, 1, 3, 0, 6, 2, 5])
+                self.assertEqual(vectorized.sort_positions(t, "x", desc=True, use_numpy=use_numpy), [2, 5, 6, 0, 1, 3, 4],
+                                 msg="NULL першими при спаданні, рівні значення — у вихідному порядку")
+
+    def test_filters_match_row_path(self):
+        rows = Table("R", [Column("a", "integer")])
+        rows.add_rows({"a": v} for v in (1, 2, 3, 2, None, 4))
+        cols = make_columnar(Table("C", [Column("a", "integer")]))
+        cols.add_rows(rows.iter_rows())
+        for op, value in [("<", 2.5), ("<=", 2.0), (">", 2.5), ("=", 2.5), ("!=", 2.5), ("in", [2, 2.5, 4.0])]:
+            with self.subTest(op=op, value=value):
+                expected = [r["a"] for r in query.Query(rows).where("a", op, value).rows()]
+                self.assertEqual([r["a"] for r in query.Query(cols).where("a", op, value).rows()], expected,
+                                 msg="Векторний шлях збігається з порядковим")
+                self.assertEqual([rows.row(p)["a"] for p in vectorized.filter_positions(rows, "a", op, value)], expected)
+
+    def test_pure_python_fallback(self):
+        self.check_backend(False)
+        values, errors = vectorized.coerce(Column("i", "integer"), [1, "2", None, "x", True], use_numpy=False)
+        self.assertEqual(values, [1, 2, None, None, None])
+        self.assertEqual([p for p, _ in errors], [3, 4])
+        with self.assertRaises(ValueError):
+            vectorized.aggregate(self.t, "i", "median")
+
+    @unittest.skipUnless(vectorized.HAS_NUMPY, "NumPy is not installed")
+    def test_numpy_matches_fallback(self):
+        self.check_backend(True)
+        values, errors = vectorized.coerce(Column("x", "real"), [1, "2.5", None, "x"], use_numpy=True)
+        self.assertEqual(values.tolist(), [1.0, 2.5, None, None])
+        self.assertEqual([p for p, _ in errors], [3])
+        store = make_columnar(self.t).rows
+        data, _ = vectorized.column_array(self.t, "i")
+        self.assertFalse(data.flags.owndata, msg="Колонка ColumnStore має віддаватися без копіювання")
+        self.assertEqual(data.tolist(), list(store.column_values("i")))
+
+
+class TestOnlineSchema(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("S", [Column("id", "integer"), Column("old", "string")])
+        self.t.add_rows({"id": i, "old": str(i)} for i in range(5))
+
+    def test_default_applied_on_read(self):
+        self.t.create_index("id", "sorted")
+        self.t.add_column(Column("score", "real", default="1.5"))
+        self.t.create_index("score")
+        self.assertNotIn("score", self.t.rows[0], msg="Існуючі рядки не мають переписуватися")
+        self.assertEqual(self.t.row(0)["score"], 1.5)
+        self.t.edit_row(1, {"score": None})
+        self.t.add_row({"id": 5})
+        self.assertEqual([r["score"] for r in self.t.iter_rows()], [1.5, None, 1.5, 1.5, 1.5, None])
+        self.assertEqual(len(self.t.find("score", 1.5)), 4)
+        self.assertEqual(self.t.indexes["score"].lookup(None), [1, 5], msg="Індекс бачить default як значення")
+        self.assertEqual(query.Query(self.t).aggregate(s=("sum", "score")).rows(), [{"s": 6.0}])
+        copy = Table.from_dict(json.loads(json.dumps(self.t.to_dict())))
+        self.assertEqual(copy.columns[2].default, "1.5")
+        self.assertEqual(copy.rows, list(self.t.iter_rows()))
+        with self.assertRaises(ValueError):
+            self.t.add_column(Column("bad", "integer", default="x"))
+
+    def test_dropped_column_is_tombstoned_until_compaction(self):
+        version = self.t.schema_version
+        self.t.delete_column("old")
+        self.assertEqual(self.t.schema_version, version + 1)
+        self.assertIn("old", self.t.rows[0], msg="Видалення колонки не має обходити рядки")
+        self.assertEqual(self.t.row(0), {"id": 0})
+        self.t.add_column(Column("old", "string"))
+        self.assertEqual(self.t.row(2), {"id": 2, "old": None}, msg="Старі значення не мають повертатися")
+        self.t.delete_column("old")
+        self.t.add_column(Column("flag", "char", default="y"))
+        self.t.compact(batch_size=2)
+        self.assertEqual(self.t.rows[4], {"id": 4, "flag": "y"})
+        self.assertFalse(self.t._stale(), msg="Після compact рядки читаються без проєкції")
+
+    def test_columnar_default_fill(self):
+        make_columnar(self.t)
+        self.t.add_column(Column("n", "integer", default=7))
+        self.t.add_column(Column("e", "enum", ["a", "b"], default="b"))
+        self.assertEqual(self.t.rows[3], {"id": 3, "old": "3", "n": 7, "e": "b"})
+
+    def test_check_conversion_reports_all_failures(self):
+        self.t.edit_row(1, {"old": "x"})
+        self.t.edit_row(3, {"old": "y"})
+        errors = self.t.check_conversion("old", "integer")
+        self.assertEqual([i for i, _ in errors], [1, 3])
+        with self.assertRaises(ValueError):
+            self.t.convert_column("old", "integer")
+        self.assertEqual(self.t._column("old").dtype, "string")
+
+
+class TestDictionaryEncoding(unittest.TestCase):
+    def make(self) -> Table:
+        t = Table("D", [Column("id", "integer"), Column("status", "enum", ["NEW", "PAID", "SHIPPED"]),
+                        Column("city", "string"), Column("price", "real")])
+        cities = ["Kyiv", None, "Lviv", "Kyiv", "Odesa"]
+        statuses = ["NEW", "PAID", None, "NEW", "SHIPPED", "PAID"]
+        t.add_rows({"id": i, "status": statuses[i % 6], "city": cities[i % 5], "price": i if i % 4 else None}
+                   for i in range(60))
+        return t
+
+    def test_enum_values_are_shared(self):
+        col = Column("s", "enum", ["NEW", "PAID"])
+        self.assertIs(col.validate("".join(["PA", "ID"])), col.enum_values[1])
+        with self.assertRaises(ValueError):
+            col.validate("LOST")
+
+    def test_from_dict_interns_strings(self):
+        t = self.make()
+        copy = Table.from_dict(json.loads(json.dumps(t.to_dict())))
+        kyiv = [r["city"] for r in copy.rows if r["city"] == "Kyiv"]
+        self.assertTrue(all(v is kyiv[0] for v in kyiv), msg="Однакові рядки мають бути одним об'єктом")
+        shared = {id(v) for v in copy.columns[1].enum_values}
+        self.assertTrue(all(r["status"] is None or id(r["status"]) in shared for r in copy.rows))
+        self.assertEqual(copy.rows, t.rows)
+
+    def test_filters_and_group_by_on_codes(self):
+        rows = self.make()
+        cols = make_columnar(self.make())
+        queries = [
+            lambda t: query.Query(t).where("status", "=", "NEW"),
+            lambda t: query.Query(t).where("status", "!=", "NEW").where("price", ">", 10),
+            lambda t: query.Query(t).where("city", "in", ["Kyiv", "Odesa"]),
+            lambda t: query.Query(t).where("city", "is null"),
+            lambda t: query.Query(t).where("city", "is not null").where("status", "is null"),
+            lambda t: query.Query(t).where("city", ">=", "L"),
+            lambda t: query.Query(t).group_by("status").aggregate(n=("count", "*")),
+            lambda t: query.Query(t).group_by("status", "city").aggregate(n=("count", "price"), s=("sum", "price"),
+                                                                           lo=("min", "price"), avg=("avg", "price")),
+            lambda t: query.Query(t).where("status", "=", "PAID").aggregate(n=("count", "*"), hi=("max", "price")),
+        ]
+        for i, q in enumerate(queries):
+            with self.subTest(query=i):
+                self.assertEqual(q(cols).rows(), q(rows).rows(), msg="Колонкова таблиця має давати той самий результат")
+        self.assertIn("on dictionary codes", queries[6](cols).explain())
+
+
+class TestTransactions(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("tx")
+        t = self.db.create_table("Accounts")
+        t.add_column(Column("id", "integer"))
+        t.add_column(Column("balance", "integer"))
+        t.add_rows({"id": i, "balance": 100} for i in range(10))
+        self.t = t
+
+    def total(self, t: Table) -> int:
+        return sum(r["balance"] for r in t.iter_rows())
+
+    def test_snapshot_isolation(self):
+        tx = self.db.begin()
+        self.t.edit_row(0, {"balance": 0})
+        self.t.add_row({"id": 10, "balance": 5})
+        self.assertEqual(self.total(tx.table("Accounts")), 1000, msg="Знімок не бачить пізніших змін")
+        tx.table("Accounts").delete_row(1)
+        self.assertEqual(tx.table("Accounts").row_count(), 9)
+        self.assertEqual(self.t.row_count(), 11, msg="Незафіксовані зміни не видно іншим")
+        self.assertEqual(self.db.begin().query("SELECT SUM(balance) AS s FROM Accounts"), [{"s": 905}])
+        with self.assertRaises(transactions.Conflict):
+            tx.commit()
+        self.assertEqual(self.t.row_count(), 11)
+
+    def test_commit_and_rollback(self):
+        events = []
+        self.db.listeners.append(lambda src, op, args: events.append(op))
+        with self.db.begin() as tx:
+            a = tx.table("Accounts")
+            a.edit_row(0, {"balance": 50})
+            a.edit_row(1, {"balance": 150})
+            a.add_row({"id": 10, "balance": 0})
+        self.assertEqual([r["balance"] for r in self.t.rows[:2]], [50, 150])
+        self.assertEqual(events, ["edit_row", "edit_row", "add_row"], msg="Commit проходить через слухачів (WAL)")
+        with self.assertRaises(RuntimeError):
+            with self.db.begin() as tx:
+                tx.table("Accounts").delete_row(0)
+                raise RuntimeError("boom")
+        tx = self.db.begin()
+        tx.table("Accounts").add_row({"id": 11})
+        tx.rollback()
+        self.assertEqual(self.t.row_count(), 11)
+        with self.assertRaises(ValueError):
+            tx.table("Accounts")
+
+    def test_concurrent_transfers_keep_total(self):
+        def transfer(seed: int) -> None:
+            for i in range(50):
+                while True:
+                    try:
+                        with self.db.begin() as tx:
+                            a = tx.table("Accounts")
+                            src, dst = (seed + i) % 10, (seed + 3 * i + 1) % 10
+                            if src == dst:
+                                break
+                            a.edit_row(src, {"balance": a.row(src)["balance"] - 1})
+                            a.edit_row(dst, {"balance": a.row(dst)["balance"] + 1})
+                        break
+                    except transactions.Conflict:
+                        continue
+
+        totals = []
+
+        def read() -> None:
+            for _ in range(200):
+                with self.db.begin() as tx:
+                    totals.append(self.total(tx.table("Accounts")))
+
+        threads = [threading.Thread(target=transfer, args=(s,)) for s in range(4)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        self.assertEqual(set(totals), {1000}, msg="Читачі бачать лише зафіксовані стани")
+        self.assertEqual(self.total(self.t), 1000)
+
+    def test_tables_are_snapshotted_lazily(self):
+        other = self.db.create_table("Other")
+        other.add_column(Column("id", "integer"))
+        other.add_row({"id": 1})
+        rows = self.t.rows
+        self.assertEqual(self.db.begin().query("SELECT COUNT(*) AS n FROM Other"), [{"n": 1}])
+        self.t.add_row({"id": 10, "balance": 0})
+        self.assertIs(self.t.rows, rows, msg="Читання іншої таблиці не змушує копіювати рядки")
+        tx = self.db.begin()
+        self.t.edit_row(0, {"balance": 0})
+        self.db.rename_table("Other", "Renamed")
+        self.assertEqual(self.total(tx.table("Accounts")), 1000, msg="Таблицю знято перед зміною")
+        self.assertEqual(tx.table("Other").row_count(), 1)
+        tx.rollback()
+        rows = self.t.rows
+        self.t.add_row({"id": 11, "balance": 0})
+        self.assertIs(self.t.rows, rows, msg="Завершена транзакція запису не сповільнює")
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "tx.json")
+            storage.save_to_file(self.db, path)
+            lazy = storage.load_from_file(path, lazy=True)
+            tx = lazy.begin()
+            self.assertFalse(lazy.tables.is_loaded("Accounts"), msg="begin не завантажує таблиці")
+            self.assertEqual(tx.table("Renamed").row_count(), 1)
+            self.assertFalse(lazy.tables.is_loaded("Accounts"))
+
+
+class TestRowIds(unittest.TestCase):
+    def setUp(self):
+        self.t = Table("R", [Column("id", "integer"), Column("tag", "string")])
+        self.t.add_rows({"id": i, "tag": "even" if i % 2 == 0 else "odd"} for i in range(10))
+        self.t.create_index("tag", "hash")
+        self.t.create_index("id", "sorted")
+
+    def test_ids_survive_deletes_and_compaction(self):
+        t = self.t
+        rid = t.row_id(7)
+        t.delete_row(2)
+        t.delete(t.row_id(0))
+        self.assertEqual(t.row_count(), 8)
+        self.assertEqual(len(t.rows), 10, msg="Видалення рядка-dict лишає надгробок, а не зсуває список")
+        self.assertEqual(t.position(rid), 5)
+        t.update(rid, {"tag": "seven"})
+        self.assertEqual(t.get(rid), {"id": 7, "tag": "seven"})
+        new = t.add_row({"id": 10, "tag": "odd"})
+        self.assertGreater(new, rid)
+        self.assertEqual([r["id"] for r in t.iter_rows()], [1, 3, 4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(t.row(0)["id"], 1)
+        with self.assertRaises(ValueError):
+            t.get(t.row_id(0) - 1)
+        t.compact()
+        self.assertEqual(len(t.rows), t.row_count())
+        self.assertEqual(t.get(rid)["tag"], "seven", msg="id не змінюється після ущільнення")
+        self.assertEqual(t.position(new), 8)
+
+    def test_indexes_and_queries_skip_tombstones(self):
+        t = self.t
+        for _ in range(3):
+            t.delete_row(1)
+        expected = [5, 7, 9]
+        for label, got in [
+            ("hash index", [r["id"] for r in t.find("tag", "odd")]),
+            ("sorted index", [r["id"] for r in t.find_range("id", 0, 6)]),
+            ("query", [r["id"] for r in query.Query(t).where("tag", "=", "odd").rows()]),
+            ("to_dict", [r["id"] for r in t.to_dict()["rows"] if r["tag"] == "odd"]),
+            ("join", [r["id"] for r in joins.join(t, t, "id").rows if r["tag"] == "odd"]),
+        ]:
+            with self.subTest(label):
+                self.assertEqual(got, expected if label != "sorted index" else [0, 4, 5, 6])
+
+    def test_periodic_purge(self):
+        t = Table("P", [Column("v", "integer")])
+        t.add_rows({"v": i} for i in range(400))
+        t.create_index("v", "sorted")
+        keep = t.row_id(399)
+        for _ in range(150):
+            t.delete_row(0)
+        self.assertLess(len(t.rows) - t.row_count(), models.PURGE_MIN + 1, msg="Надгробки мають періодично прибиратися")
+        self.assertEqual(t.get(keep), {"v": 399})
+        self.assertEqual([r["v"] for r in t.find_range("v", 148, 151)], [150, 151])
+
+    def test_failed_delete_leaves_table_consistent(self):
+        t = make_columnar(self.t)
+        rid = t.row_id(5)
+        with unittest.mock.patch.object(ColumnStore, "pop", side_effect=OverflowError):
+            with self.assertRaises(OverflowError):
+                t.delete_row(1)
+        self.assertEqual((t.row_count(), t.position(rid)), (10, 5), msg="Невдале видалення нічого не змінює")
+        t.delete_row(1)
+        self.assertEqual([r["id"] for r in t.find("tag", "odd")], [3, 5, 7, 9])
+        self.assertEqual(t.get(rid)["id"], 5)
+
+    def test_columnar_ids(self):
+        t = make_columnar(self.t)
+        rid = t.row_id(5)
+        t.delete_row(1)
+        self.assertEqual(t.position(rid), 4)
+        self.assertEqual(t.get(rid)["id"], 5)
+
+    def test_conversion_after_deletes_keeps_indexes(self):
+        for label, convert in [("columnar", make_columnar), ("compact", rowstore.make_compact)]:
+            with self.subTest(label):
+                t = Table("R", [Column("id", "integer"), Column("tag", "string")])
+                t.add_rows({"id": i, "tag": "even" if i % 2 == 0 else "odd"} for i in range(10))
+                t.create_index("tag", "hash")
+                t.create_index("id", "sorted")
+                rid = t.row_id(7)
+                t.delete_row(0)
+                t.delete_row(3)
+                convert(t)
+                self.assertEqual([r["id"] for r in t.find("tag", "odd")], [1, 3, 5, 7, 9],
+                                 msg="Слоти в індексах перераховано разом із надгробками")
+                self.assertEqual([r["id"] for r in t.find_range("id", 4, 8)], [5, 6, 7, 8])
+                self.assertEqual(t.get(rid)["id"], 7)
+
+
+class TestHttpServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "api.json")
+        self.db = Database("api")
+        self.api = server.ApiServer(self.db, self.path, readers=2)
+        self.loop = asyncio.new_event_loop()
+        self.srv = self.loop.run_until_complete(self.api.start("127.0.0.1", 0))
+        self.port = self.srv.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+
+    def tearDown(self):
+        self.conn.close()
+        asyncio.run_coroutine_threadsafe(self.api.stop(self.srv), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.api.close()
+        self.tmp.cleanup()
+
+    def call(self, method, path, body=None):
+        data = json.dumps(body) if body is not None else None
+        self.conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+        resp = self.conn.getresponse()
+        raw = resp.read()
+        if resp.getheader("Content-Type") == "application/x-ndjson":
+            return resp.status, [json.loads(line) for line in raw.splitlines()]
+        return resp.status, json.loads(raw)
+
+    def test_tables_rows_and_pages(self):
+        status, _ = self.call("POST", "/tables", {"name": "Users", "columns": [
+            {"name": "id", "dtype": "integer"}, {"name": "name", "dtype": "string"}]})
+        self.assertEqual(status, 201)
+        status, res = self.call("POST", "/tables/Users/rows", [{"id": i, "name": f"u{i}"} for i in range(25)] + [{"id": "x"}])
+        self.assertEqual((status, res["inserted"], res["errors"][0]["index"]), (201, 25, 25),
+                         msg="Пачка вставляється, помилкові рядки повертаються з індексами")
+        status, page = self.call("GET", "/tables/Users/rows?offset=20&limit=10")
+        self.assertEqual((page["total"], page["next"], [r["id"] for r in page["rows"]]), (25, None, [20, 21, 22, 23, 24]))
+        _, first = self.call("GET", "/tables/Users/rows?limit=10")
+        self.assertEqual(first["next"], 10)
+        rid = first["ids"][3]
+        self.assertEqual(self.call("PUT", f"/tables/Users/rows/{rid}", {"name": "Carol"}), (200, {"id": 3, "name": "Carol"}))
+        self.assertEqual(self.call("DELETE", f"/tables/Users/rows/{first['ids'][0]}")[0], 200)
+        status, rows = self.call("GET", "/tables/Users/rows?stream=1")
+        self.assertEqual((status, len(rows), rows[2]), (200, 24, {"id": 3, "name": "Carol"}))
+        _, res = self.call("POST", "/query", {"sql": "SELECT COUNT(*) FROM Users WHERE id < 10"})
+        self.assertEqual(list(res[0].values()), [9])
+        self.assertEqual(self.call("GET", f"/tables/Users/rows/{rid}")[1]["name"], "Carol")
+        self.assertTrue(os.path.exists(self.path + wal.SUFFIX), msg="Записи журналюються поруч із файлом бази")
+
+    def test_join_and_errors(self):
+        self.call("POST", "/tables", {"name": "A", "columns": [{"name": "k", "dtype": "integer"}]})
+        self.call("POST", "/tables", {"name": "B", "columns": [{"name": "k", "dtype": "integer"},
+                                                               {"name": "v", "dtype": "string"}]})
+        self.call("POST", "/tables/A/rows", [{"k": i} for i in range(5)])
+        self.call("POST", "/tables/B/rows", [{"k": i, "v": str(i)} for i in range(0, 10, 2)])
+        _, res = self.call("POST", "/join", {"left": "A", "right": "B", "on": "k"})
+        self.assertEqual(sorted(r["v"] for r in res["rows"]), ["0", "2", "4"])
+        _, rows = self.call("POST", "/join", {"left": "A", "right": "B", "on": "k", "how": "left", "stream": True})
+        self.assertEqual(len(rows), 5)
+        for label, (method, path, body), status in [
+            ("невідома таблиця", ("GET", "/tables/Nope/rows", None), 404),
+            ("невідома таблиця потоком", ("GET", "/tables/nope/rows?stream=1", None), 404),
+            ("невідома таблиця з'єднання потоком", ("POST", "/join", {"left": "A", "right": "nope", "on": "k", "stream": True}), 404),
+            ("невідомий маршрут", ("GET", "/nothing", None), 404),
+            ("невірний метод", ("PATCH", "/tables", None), 405),
+            ("невірне значення", ("POST", "/tables/A/rows", {"k": "x"}), 400),
+            ("невідомий id", ("GET", "/tables/A/rows/999", None), 404),
+            ("невірний limit", ("GET", "/tables/A/rows?limit=0", None), 400),
+        ]:
+            with self.subTest(label):
+                got, res = self.call(method, path, body)
+                self.assertEqual(got, status, msg=res)
+                self.assertIn("error", res)
+
+
+class TestAsyncDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "async.json")
+        db = Database("async")
+        t = db.create_table("Orders")
+        t.add_column(Column("id", "integer"))
+        t.add_column(Column("status", "string"))
+        t.add_rows({"id": i, "status": "NEW" if i % 2 else "PAID"} for i in range(50))
+        storage.save_to_file(db, self.path)
+
+    def test_reads_run_while_save_is_in_progress(self):
+        started, release = threading.Event(), threading.Event()
+        real_save = storage.save_to_file
+
+        def slow_save(*args):
+            started.set()
+            release.wait(10)
+            real_save(*args)
+
+        async def main():
+            async with await asyncdb.AsyncDatabase.open(self.path) as adb:
+                with unittest.mock.patch.object(storage, "save_to_file", slow_save):
+                    save = asyncio.ensure_future(adb.save())
+                    await asyncio.to_thread(started.wait, 10)
+                    counts = await asyncio.gather(*(adb.query("SELECT COUNT(*) FROM Orders WHERE status = 'NEW'")
+                                                    for _ in range(200)))
+                    self.assertFalse(save.done(), msg="Читання не чекають на збереження")
+                    write = asyncio.ensure_future(adb.add_row("Orders", {"id": 50, "status": "NEW"}))
+                    await asyncio.sleep(0.05)
+                    self.assertFalse(write.done(), msg="Записи йдуть у черзі після збереження")
+                    release.set()
+                    await save
+                    rid = await write
+                self.assertEqual({list(c[0].values())[0] for c in counts}, {25})
+                self.assertEqual((await adb.table("Orders")).get(rid), {"id": 50, "status": "NEW"})
+        asyncio.run(main())
+        self.assertEqual(storage.load_from_file(self.path).get_table("Orders").row_count(), 50)
+
+    def test_async_iterators_and_serialized_writes(self):
+        async def main():
+            adb = await asyncdb.AsyncDatabase.open(self.path, readers=2)
+            await adb.create_table("Labels", [Column("status", "string"), Column("label", "string")])
+            ids = await asyncio.gather(*(adb.add_row("Labels", {"status": s, "label": s.lower()})
+                                         for s in ("NEW", "PAID")))
+            self.assertEqual(ids, [0, 1], msg="Записи виконуються в порядку надходження")
+            with self.assertRaises(ValueError):
+                await adb.add_row("Orders", {"id": "x"})
+            rows = adb.rows("Orders", batch=7)
+            first = await rows.__anext__()
+            await adb.delete("Orders", 49)
+            rest = [r async for r in rows]
+            self.assertEqual([first] + rest, [{"id": i, "status": "NEW" if i % 2 else "PAID"} for i in range(50)],
+                             msg="Потік рядків читає знімок, узятий на початку")
+            joined = [r async for r in adb.join("Orders", "Labels", "status", batch=5)]
+            self.assertEqual(sorted(r["label"] for r in joined), ["new"] * 24 + ["paid"] * 25)
+            self.assertEqual((await adb.join_table("Orders", "Labels", "status", how="left")).row_count(), 49)
+            await adb.save()
+            await adb.close()
+            with self.assertRaises(ValueError):
+                await adb.query("SELECT * FROM Orders")
+        asyncio.run(main())
+        self.assertEqual(storage.load_from_file(self.path).list_tables(), ["Orders", "Labels"])
+
+
+class TestBulkImportExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database("bulk")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_csv_import_infers_schema_and_rejects(self):
+        with open(self.path("people.csv"), "w", encoding="utf-8") as f:
+            f.write("id,score,email,note\n1,2.5,a@x.com,hi\n2,3,b@x.com,\n3,oops,c@x.com,x\n4,1,d@x.com,y,extra\n")
+        rep = bulk.import_file(self.db, self.path("people.csv"), rejects=self.path("bad.ndjson"), sample=2)
+        t = self.db.get_table("people")
+        self.assertEqual([(c.name, c.dtype) for c in t.columns],
+                         [("id", "integer"), ("score", "real"), ("email", "email"), ("note", "string")])
+        self.assertEqual((rep.rows, rep.rejected), (2, 2))
+        self.assertEqual(t.row(1), {"id": 2, "score": 3.0, "email": "b@x.com", "note": None},
+                         msg="Порожнє поле CSV — NULL")
+        with open(self.path("bad.ndjson"), encoding="utf-8") as f:
+            bad = [json.loads(line) for line in f]
+        self.assertEqual([b["line"] for b in bad], [4, 5], msg="Відхилені рядки зберігаються з номерами рядків файлу")
+        self.assertIn("score", bad[0]["error"])
+
+    def test_header_only_and_failed_imports(self):
+        with open(self.path("empty.csv"), "w", encoding="utf-8") as f:
+            f.write("id,name\n")
+        rep = bulk.import_file(self.db, self.path("empty.csv"))
+        t = self.db.get_table("empty")
+        self.assertEqual([(c.name, c.dtype) for c in t.columns], [("id", "string"), ("name", "string")],
+                         msg="Колонки беруться із заголовка CSV")
+        self.assertEqual((rep.rows, t.row_count()), (0, 0))
+        with open(self.path("blank.ndjson"), "w", encoding="utf-8") as f:
+            f.write("\n")
+        with self.assertRaises(ValueError):
+            bulk.import_file(self.db, self.path("blank.ndjson"))
+        with self.assertRaises(ValueError):
+            bulk.import_file(self.db, self.path("empty.csv"), table="other", columns={"missing": "x"})
+        self.assertEqual(self.db.list_tables(), ["empty"], msg="Невдалий імпорт не лишає таблиць")
+
+    def test_import_into_table_with_other_fields(self):
+        t = self.db.add_table(Table("P", [Column("name", "string"), Column("age", "integer")]))
+        with open(self.path("typo.csv"), "w", encoding="utf-8") as f:
+            f.write("nmae,agee\nbob,3\n")
+        with self.assertRaises(ValueError):
+            bulk.import_file(self.db, self.path("typo.csv"), table="P")
+        with open(self.path("part.csv"), "w", encoding="utf-8") as f:
+            f.write("name,agee\nbob,3\n")
+        rep = bulk.import_file(self.db, self.path("part.csv"), table="P")
+        self.assertEqual((rep.rows, t.row(0)), (1, {"name": "bob", "age": None}))
+        with open(self.path("typo.ndjson"), "w", encoding="utf-8") as f:
+            f.write('{"nmae": "x"}\n{"age": 4}\n')
+        rep = bulk.import_file(self.db, self.path("typo.ndjson"), table="P")
+        self.assertEqual((rep.rows, rep.rejected), (1, 1), msg="Запис без жодного поля таблиці відхиляється")
+        self.assertEqual(t.row_count(), 2)
+
+    def test_roundtrip_and_process_pool(self):
+        src = Table("S", [Column("id", "integer"), Column("status", "enum", enum_values=["A", "B"]),
+                          Column("price", "real")])
+        src.add_rows({"id": i, "status": "AB"[i % 2], "price": None if i % 5 == 0 else i / 4} for i in range(250))
+        src.delete_row(3)
+        for fmt in bulk.FORMATS:
+            with self.subTest(fmt):
+                path = self.path(f"s.{fmt}")
+                self.assertEqual(bulk.export_file(src, path), 249)
+                db = Database("copy")
+                db.add_table(Table("S", [Column(c.name, c.dtype, c.enum_values) for c in src.columns]))
+                rep = bulk.import_file(db, path, table="S", chunk_size=40, workers=2 if fmt == "csv" else 0)
+                self.assertEqual((rep.rows, rep.rejected), (249, 0))
+                self.assertEqual(list(db.get_table("S").iter_rows()), list(src.iter_rows()))
+        db = Database("mapped")
+        bulk.import_file(db, self.path("s.ndjson"), table="M", columns={"id": "key"}, dtypes={"key": "string"})
+        self.assertEqual(db.get_table("M").row(0), {"key": "0"})
+
+
+class TestParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = parallel.Parallel(workers=2, chunk_rows=7)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def setUp(self):
+        self.t = Table("P", [Column("id", "integer"), Column("tag", "string"), Column("score", "real")])
+        self.t.add_rows({"id": i, "tag": None if i % 7 == 0 else "abc"[i % 3], "score": None if i % 5 == 0 else i / 2}
+                        for i in range(60))
+        self.t.delete_row(4)
+
+    def test_matches_serial_execution(self):
+        for label, t in [("dict rows", self.t), ("columnar", make_columnar(Table.from_dict(self.t.to_dict())))]:
+            with self.subTest(label):
+                rows = list(t.iter_rows())
+                got = self.pool.filter(t, [("score", ">", 5), ("tag", "in", ["a", "b"])])
+                self.assertEqual(got, [i for i, r in enumerate(rows) if r["score"] is not None and r["score"] > 5
+                                       and r["tag"] in ("a", "b")])
+                q = query.Query(t).where("id", ">=", 3).group_by("tag").aggregate(
+                    n=("count", "*"), s=("sum", "score"), lo=("min", "score"), avg=("avg", "id"))
+                got = self.pool.aggregate(t, {"n": ("count", "*"), "s": ("sum", "score"), "lo": ("min", "score"),
+                                              "avg": ("avg", "id")}, ["tag"], [("id", ">=", 3)])
+                key = lambda r: (r["tag"] is None, r["tag"])
+                self.assertEqual(sorted(got, key=key), sorted(q.rows(), key=key),
+                                 msg="Часткові агрегати мають зливатися так само, як у послідовному запиті")
+                self.assertEqual(self.pool.check_conversion(t, "tag", "char"), t.check_conversion("tag", "char"))
+                self.assertEqual(len(self.pool.check_conversion(t, "score", "integer")), 0)
+
+    def test_join_and_refresh(self):
+        other = Table("O", [Column("tag", "string"), Column("label", "string")])
+        other.add_rows([{"tag": "a", "label": "A"}, {"tag": "a", "label": "AA"}, {"tag": "z", "label": "Z"}])
+        for how in joins.HOWS:
+            with self.subTest(how):
+                got = self.pool.join(self.t, other, "tag", how)
+                self.assertEqual(sorted(map(repr, got.rows)), sorted(map(repr, joins.join(self.t, other, "tag", how).rows)))
+        self.assertEqual(self.pool.join(self.t, other, "tag").name, joins.join(self.t, other, "tag").name)
+        before = self.pool.filter(self.t, [("tag", "=", "c")])
+        self.t.edit_row(before[0], {"tag": "b"})
+        self.assertEqual(self.pool.filter(self.t, [("tag", "=", "c")]), before[1:],
+                         msg="Спільна копія оновлюється, коли змінюється версія таблиці")
+
+    def test_literals_and_serial_fallback(self):
+        self.assertEqual(self.pool.filter(self.t, [("id", "<", 2.5)]), [0, 1, 2], msg="Літерал не обрізається")
+        with self.assertRaises(ValueError):
+            self.pool.filter(self.t, [("id", "=", "x")])
+        big = Table("B", [Column("id", "integer"), Column("tag", "string")])
+        big.add_rows([{"id": 1, "tag": "a"}, {"id": 2 ** 70, "tag": "b"}, {"id": 3, "tag": "a"}])
+        self.assertEqual(self.pool.filter(big, [("id", ">", 2)]), [1, 2], msg="Цілі поза int64 — послідовний шлях")
+        self.assertEqual(self.pool.aggregate(big, {"s": ("sum", "id")}), [{"s": 2 ** 70 + 4}])
+        self.assertEqual(len(self.pool.join(big, self.t, "id").rows), 2)
+        self.assertEqual(self.pool.check_conversion(big, "tag", "char"), [])
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "run.json")
+            with open(os.devnull, "w") as devnull, unittest.mock.patch("sys.stdout", devnull):
+                doc = suite.run([200], [0.0, 1.5], repeat=1, cases=["add_rows", "join_tables"], out=out)
+            with open(out, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["results"], doc["results"])
+        self.assertEqual([(r["case"], r["skew"]) for r in doc["results"]],
+                         [("add_rows", 0.0), ("join_tables", 0.0), ("join_tables", 1.5)])
+        base = {"results": [{"case": "a", "rows": 10, "s": 1.0}, {"case": "b", "rows": 10, "s": 1.0},
+                            {"case": "c", "rows": 10, "s": 0.0001}, {"case": "gone", "rows": 10, "s": 1.0}]}
+        new = {"results": [{"case": "a", "rows": 10, "s": 1.5}, {"case": "b", "rows": 10, "s": 1.05},
+                           {"case": "c", "rows": 10, "s": 0.0004}, {"case": "d", "rows": 10, "s": 1.0}]}
+        status = {r["case"]: r["status"] for r in suite.compare(base, new, threshold=0.1)}
+        self.assertEqual(status, {"a": "regression", "b": "ok", "c": "ok", "d": "new", "gone": "missing"},
+                         msg="Різниця в межах порогу чи шуму таймера не є регресією")
+        self.assertEqual([suite.parse_size(s) for s in ("10k", "1m", "2500")], [10_000, 1_000_000, 2500])
+
+    def test_skewed_keys(self):
+        uniform, skewed = skewed_keys(5000, 100, 0.0), skewed_keys(5000, 100, 1.5)
+        self.assertTrue(all(0 <= k < 100 for k in uniform + skewed))
+        self.assertGreater(skewed.count(0), 5 * uniform.count(0), msg="При skew > 0 перші ключі гарячі")
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("c", cache=cache.ResultCache())
+        self.t = self.db.create_table("T")
+        self.t.add_column(Column("id", "integer"))
+        self.t.add_column(Column("grp", "string"))
+        self.t.add_rows({"id": i, "grp": "ab"[i % 2]} for i in range(20))
+        self.d = Table("D", [Column("grp", "string"), Column("label", "string")])
+        self.d.add_rows([{"grp": "a", "label": "A"}, {"grp": "b", "label": "B"}])
+
+    def test_query_hits_and_invalidation(self):
+        sql = "SELECT grp, COUNT(*) AS n FROM T GROUP BY grp"
+        first = self.db.query(sql)
+        first[0]["n"] = -1
+        self.assertEqual(self.db.query(sql), query.execute(self.db, sql),
+                         msg="Зміна отриманого результату не псує кеш")
+        self.assertEqual(self.db.query("SELECT id FROM T WHERE id < 2"), [{"id": 0}, {"id": 1}])
+        tx = self.db.begin()
+        self.assertEqual(tx.query(sql), self.db.query(sql), msg="Знімок транзакції бачить записи кешу")
+        self.t.add_row({"id": 20, "grp": "a"})
+        self.assertEqual(self.db.query(sql), query.execute(self.db, sql), msg="Зміна таблиці робить запис застарілим")
+        self.assertEqual(tx.query(sql), query.execute(tx.snapshot, sql))
+        s = self.db.cache.stats()
+        self.assertEqual((s["hits"], s["misses"], s["entries"]), (4, 3, 3))
+
+    def test_join_eager_and_lazy(self):
+        res = self.db.cache
+        expected = join_tables(self.t, self.d, "grp").rows
+        self.assertEqual(join_tables(self.t, self.d, "grp", cache=res).rows, expected)
+        out = join_tables(self.t, self.d, "grp", cache=res)
+        out.add_row({"id": 99, "grp": "a", "label": "X"})
+        self.assertEqual(join_tables(self.t, self.d, "grp", cache=res).rows, expected,
+                         msg="Результат з кешу — знімок, зміни отримувача його не зачіпають")
+        self.t.delete_row(0)
+        cursor = join_tables(self.t, self.d, "grp", lazy=True, cache=res)
+        head = cursor.fetch(3)
+        self.assertEqual(cursor.to_table(head=head).rows, join_tables(self.t, self.d, "grp").rows)
+        hits = res.hits
+        cursor = join_tables(self.t, self.d, "grp", lazy=True, cache=res)
+        self.assertEqual((res.hits, cursor.name, len(cursor.fetch(100))), (hits + 1, "T_JOIN_D", 19))
+        fresh = cache.ResultCache()
+        cursor = join_tables(self.t, self.d, "grp", lazy=True, cache=fresh)
+        cursor.fetch(3)
+        cursor.to_table()
+        self.assertEqual(fresh.stats()["entries"], 0, msg="Неповний результат (без head) не кешується")
+
+    def test_eviction_by_size(self):
+        small = cache.ResultCache(max_bytes=cache.estimate_size(self.t) * 2)
+        tables = [Table(f"T{i}", self.t.columns, list(self.t.rows)) for i in range(3)]
+        for t in tables:
+            small.put("copy", (t,), (), t)
+        s = small.stats()
+        self.assertEqual((s["entries"], s["evictions"]), (2, 1))
+        self.assertLessEqual(s["bytes"], small.max_bytes)
+        self.assertIsNone(small.get("copy", (tables[0],)), msg="Витісняється найдавніший запис")
+        small.put("copy", (tables[0],), (), Table("big", rows=self.t.rows * 10))
+        self.assertEqual(small.stats()["entries"], 2, msg="Запис, більший за весь кеш, не зберігається")
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def make(self):
+        t = Table("T", [Column("id", "integer"), Column("email", "email")])
+        t.add_rows({"id": i, "email": f"u{i}@example.com"} for i in range(50))
+        return t
+
+    def test_disabled_records_nothing(self):
+        t = self.make()
+        t.add_row({"id": "7", "email": "a@b.co"})
+        join_tables(t, t, "id")
+        self.assertEqual(profiling.stats(), {})
+        self.assertIs(t.columns[0].validator(), t.columns[0].validator(), msg="Без профілювання валідатор не обгортається")
+
+    def test_hot_path_counters(self):
+        with profiling.profiled() as stats:
+            t = self.make()
+            t.add_row({"id": "7", "email": "a@b.co"})
+            t.edit_row(0, {"email": "z@b.co"})
+            join_tables(t, t, "id")
+            t.create_index("id", "sorted")
+            joins.join(t, t, "id")
+            with tempfile.TemporaryDirectory() as tmp:
+                for ext in (".json", ".minidb"):
+                    path = os.path.join(tmp, "db" + ext)
+                    db = Database("p")
+                    db.add_table(Table.from_dict(t.to_dict()))
+                    storage.save_to_file(db, path)
+                    storage.load_from_file(path)
+        self.assertFalse(profiling.enabled)
+        self.assertEqual((stats["Table.add_row"]["calls"], stats["Table.edit_row"]["calls"]), (1, 1))
+        self.assertEqual(stats["Column.validate[integer]"]["items"], 51)
+        self.assertEqual(stats["Column.validate[email]"]["items"], 52)
+        self.assertEqual(stats["join.build"]["items"], 51)
+        self.assertEqual(stats["join.probe"]["items"], 53, msg="items фази probe — рядки результату (id 7 двічі)")
+        self.assertEqual(stats["join.merge"]["items"], 53)
+        for name in ("storage.serialize", "storage.parse", "binstore.serialize", "binstore.map", "Table.to_dict"):
+            self.assertIn(name, stats)
+        self.assertEqual(stats["storage.parse"]["items"], 51)
+        self.assertEqual(json.loads(profiling.dump())["stats"], profiling.stats())
+
+    def test_capture_includes_tasks(self):
+        def work(n):
+            return join_tables(self.make(), self.make(), "id").row_count() + n
+        with profiling.Capture(memory=True) as cap:
+            out = []
+            th = threading.Thread(target=lambda: out.append(profiling.call(work, 1)))
+            th.start(); th.join()
+        self.assertEqual(out, [51])
+        self.assertEqual(len(cap.profiles), 2)
+        self.assertIn("work", cap.profile_text())
+        self.assertIn("join.probe", cap.counters)
+        self.assertGreater(cap.peak_bytes, 0)
+        self.assertFalse(profiling.enabled)
+        with self.assertRaises(ValueError):
+            cap.stop()
+
+
+class TestStreamingStorage(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("Склад")
+        t = self.db.create_table("Items")
+        t.add_column(Column("id", "integer"))
+        t.add_column(Column("name", "string"))
+        t.add_rows({"id": i, "name": f"товар {i}"} for i in range(50))
+        t.create_index("id", "sorted")
+        self.db.create_table("Empty")
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_round_trip_small_chunks(self):
+        storage.save_to_file(self.db, self.path)
+        old = storage.CHUNK_SIZE
+        storage.CHUNK_SIZE = 5
+        self.addCleanup(setattr, storage, "CHUNK_SIZE", old)
+        loaded = storage.load_from_file(self.path)
+        self.assertEqual(loaded.to_dict(), self.db.to_dict(), msg="Дані мали пережити збереження")
+        self.assertEqual(loaded.get_table("Items").indexes["id"].kind, "sorted")
+
+    def test_lazy_open_loads_on_access(self):
+        storage.save_to_file(self.db, self.path)
+        lazy = storage.load_from_file(self.path, lazy=True)
+        self.assertEqual(lazy.list_tables(), ["Items", "Empty"])
+        self.assertFalse(lazy.tables.is_loaded("Items"), msg="Таблиця не мала завантажитися завчасно")
+        self.assertEqual(len(lazy.get_table("Items").rows), 50)
+        self.assertTrue(lazy.tables.is_loaded("Items"))
+        self.assertFalse(lazy.tables.is_loaded("Empty"))
+
+    def test_reads_legacy_pretty_json(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.db.to_dict(), f, ensure_ascii=False, indent=2)
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                loaded = storage.load_from_file(self.path, lazy=lazy)
+                self.assertEqual(loaded.to_dict(), self.db.to_dict())
+        self.assertEqual([r["id"] for r in storage.iter_rows(self.path, "Items")], list(range(50)))
+
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("Bin")
+        t = self.db.create_table("Orders")
+        t.add_column(Column("id", "integer"))
+        t.add_column(Column("price", "real"))
+        t.add_column(Column("status", "enum", enum_values=["NEW", "PAID"]))
+        t.add_rows([{"id": 1, "price": 2.5, "status": "NEW"}, {"id": 2, "status": "PAID"}, {"id": 2**70}])
+        t.create_index("id", "hash")
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "db.minidb")
+        self.addCleanup(lambda: [os.remove(os.path.join(self.dir, f)) for f in os.listdir(self.dir)])
+
+    def test_round_trip_by_extension(self):
+        storage.save_to_file(self.db, self.path)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(len(binstore.MAGIC)), binstore.MAGIC, msg="Очікувався бінарний формат")
+        loaded = storage.load_from_file(self.path)
+        self.assertEqual(loaded.to_dict(), self.db.to_dict())
+        self.assertIn("id", loaded.get_table("Orders").indexes)
+
+    def test_zero_copy_columns_and_copy_on_write(self):
+        storage.save_to_file(self.db, self.path)
+        prices, nulls = binstore.read_column(self.path, "Orders", "price")
+        self.assertIsInstance(prices, memoryview)
+        self.assertEqual(prices[0], 2.5)
+        self.assertTrue(nulls[0] & 0b110, msg="Рядки без price мають бути NULL")
+        orders = storage.load_from_file(self.path).get_table("Orders")
+        orders.edit_row(1, {"price": 7})
+        orders.delete_row(0)
+        self.assertEqual(orders.rows[0], {"id": 2, "price": 7.0, "status": "PAID"})
+
+
+class TestPagedStorage(unittest.TestCase):
+    def setUp(self):
+        self.db = Database("Paged")
+        t = self.db.create_table("Orders")
+        t.add_column(Column("id", "integer"))
+        t.add_column(Column("note", "string"))
+        t.add_rows({"id": i, "note": "n" * (i % 40)} for i in range(600))
+        t.create_index("id", "hash")
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "db.pages")
+        self.addCleanup(lambda: [os.remove(os.path.join(self.dir, f)) for f in os.listdir(self.dir)])
+
+    def open(self, policy="lru"):
+        # маленькі сторінки й пул на 4 сторінки: таблиця точно не вміщується в пам'ять
+        pool = paged.BufferPool(4, policy)
+        paged.save(self.db, self.path, page_size=1024, pool=pool)
+        db = paged.load(self.path, pool)
+        self.addCleanup(paged.close, db)
+        return db, pool
+
+    def test_row_api_through_buffer_pool(self):
+        for policy in paged.POLICIES:
+            with self.subTest(policy):
+                db, pool = self.open(policy)
+                orders = db.get_table("Orders")
+                plain = Table.from_dict(self.db.get_table("Orders").to_dict())
+                self.assertIsInstance(orders.rows, paged.PagedStore)
+                self.assertGreater(len(orders.rows.pages), pool.capacity)
+                snap = orders.snapshot()
+                for t in (orders, plain):
+                    t.add_row({"id": 1000, "note": "new"})
+                    t.edit_row(3, {"note": "x" * 200})
+                    t.delete_row(10)
+                    t.add_column(Column("qty", "integer", default=1))
+                    t.convert_column("id", "string")
+                    t.delete_column("qty")
+                self.assertEqual(list(orders.iter_rows()), list(plain.iter_rows()))
+                self.assertEqual(orders.find("id", "1000"), [{"id": "1000", "note": "new"}])
+                self.assertEqual(snap.row(10), {"id": 10, "note": "n" * 10}, msg="Знімок не бачить пізніших змін")
+                self.assertGreater(pool.stats()["evictions"], 0)
+
+    def test_checkpoint_and_reopen(self):
+        storage.save_to_file(self.db, self.path)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(len(paged.MAGIC)), paged.MAGIC, msg="Очікувався сторінковий формат")
+        db = storage.load_from_file(self.path)
+        self.addCleanup(paged.close, db)
+        self.assertEqual(db.to_dict(), self.db.to_dict())
+        self.assertIn("id", db.get_table("Orders").indexes)
+        orders = db.get_table("Orders")
+        orders.edit_row(0, {"note": "changed"})
+        # до checkpoint файл лишається в попередньому стані
+        before = paged.load(self.path, paged.BufferPool(4))
+        self.assertEqual(before.get_table("Orders").row(0)["note"], "")
+        paged.close(before)
+        storage.save_to_file(db, self.path)
+        after = paged.load(self.path, paged.BufferPool(4))
+        self.addCleanup(paged.close, after)
+        self.assertEqual(after.get_table("Orders").row(0)["note"], "changed")
+        self.assertEqual(after.to_dict(), db.to_dict())
+
+    def test_join_switches_to_partitioned(self):
+        db, pool = self.open()
+        orders = db.get_table("Orders")
+        self.assertEqual(joins._choose(orders, orders, ["id"], "auto", None), "partitioned")
+        expected = joins.join(self.db.get_table("Orders"), self.db.get_table("Orders"), "id")
+        self.assertEqual(sorted(joins.join(orders, orders, "id").rows, key=lambda r: r["id"]),
+                         sorted(expected.rows, key=lambda r: r["id"]))
+
+    def test_row_larger_than_page(self):
+        db, _ = self.open()
+        orders = db.get_table("Orders")
+        with self.assertRaises(ValueError):
+            orders.add_row({"id": 1, "note": "x" * 2000})
+        self.assertEqual(orders.row_count(), 600)
+
+
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "db.json")
+        self.addCleanup(lambda: [os.remove(os.path.join(self.dir, f)) for f in os.listdir(self.dir)])
+        self.db = Database("Journal")
+        self.log = wal.WriteAheadLog(self.db, self.path)
+        self.addCleanup(self.log.close)
+        t = self.db.create_table("Users")
+        t.add_column(Column("id", "integer"))
+        t.add_row({"id": 1})
+        self.log.checkpoint()
+
+    def test_committed_edits_survive_crash(self):
+        t = self.db.get_table("Users")
+        t.add_rows([{"id": 2}, {"id": 3}])
+        t.edit_row(0, {"id": 10})
+        t.delete_row(1)
+        self.db.rename_table("Users", "People")
+        self.assertFalse(self.log.save(), msg="Після однієї правки мав бути лише fsync журналу")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["tables"]["Users"]["rows"]), 1, msg="Базовий файл не переписується")
+        reopened = storage.load_from_file(self.path)
+        self.assertEqual(reopened.to_dict(), self.db.to_dict())
+
+    def test_replay_skips_checkpointed_and_torn_records(self):
+        self.db.get_table("Users").add_row({"id": 2})
+        self.log.commit()
+        with open(wal.wal_path(self.path), "rb") as f:
+            journal = f.read()
+        self.log.checkpoint()
+        # збій між записом бази і очищенням журналу + недописаний хвіст
+        with open(wal.wal_path(self.path), "wb") as f:
+            f.write(journal + b'{"lsn": 99, "op": "add_')
+        reopened = storage.load_from_file(self.path)
+        self.assertEqual([r["id"] for r in reopened.get_table("Users").rows], [1, 2])
+
+    def test_plain_save_drops_stale_log(self):
+        self.db.get_table("Users").add_row({"id": 2})
+        self.log.commit()
+        other = Database("Other")
+        storage.save_to_file(other, self.path)
+        self.assertFalse(os.path.exists(wal.wal_path(self.path)))
+        self.assertEqual(storage.load_from_file(self.path).list_tables(), [])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
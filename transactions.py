@@ -0,0 +1,153 @@
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Database, Table
+from wal import apply_record
+
+# Транзакції зі знімковою ізоляцією. Читання в транзакції бачать стан бази на момент
+# begin і власні зміни та нікого не блокують. Таблиця знімається (Table.snapshot: рядки
+# спільні, копіюються лише при першому записі) ліниво — при першому зверненні транзакції
+# до неї або, якщо раніше її змінює, перейменовує чи видаляє хтось інший, перед цією зміною
+# (Database._before_write). Тож таблиці, яких транзакція не торкається, не знімаються, не
+# копіюються при наступному записі й не завантажуються з файлу (storage.LazyTables).
+# Зміни робляться звичайними методами Table над знімком і записуються в журнал
+# операцій; commit під замком перевіряє, що таблиці, які транзакція змінювала, ніхто
+# не змінив після знімка (перший commit виграє), і повторює операції над справжніми
+# таблицями — слухачі бази (WAL) бачать їх як звичайні зміни.
+
+_UNTAKEN = object()
+_serials = itertools.count(1)
+
+
+class Conflict(ValueError):
+    pass
+
+
+class SnapshotTables(dict):
+    # назви таблиць на момент begin; знімок береться при першому зверненні (як storage.LazyTables)
+    # або в pin() перед зміною оригіналу. Транзакцію не тримає: забута транзакція разом зі
+    # своїми знімками звільняється одразу і зникає з Database._open
+    def __init__(self, db: Database, log: List[Tuple[str, str, Tuple[Any, ...]]]):
+        # під замком бази; сирі значення — незавантажена таблиця LazyTables не завантажується
+        self.origin: Dict[str, Optional[Table]] = {n: t if isinstance(t, Table) else None
+                                                  for n, t in dict.items(db.tables)}
+        super().__init__((name, _UNTAKEN) for name in self.origin)
+        self.db = db
+        self.log = log
+        self.names = {id(t): n for n, t in self.origin.items() if t is not None}
+        self.sources: Dict[str, Table] = {}
+        self.versions: Dict[str, int] = {}
+        self.closed = False
+        self.serial = next(_serials)
+        db._open[self.serial] = self
+
+    def __getitem__(self, name: str) -> Table:
+        t = dict.__getitem__(self, name)
+        return self._take(name) if t is _UNTAKEN else t
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+    def is_taken(self, name: str) -> bool:
+        return dict.__getitem__(self, name) is not _UNTAKEN
+
+    def _store(self, name: str, table: Table) -> Table:
+        snap = table.snapshot()
+        log = self.log
+        snap.listeners.append(lambda t, op, args: log.append((name, op, args)))
+        self.sources[name] = table
+        self.versions[name] = table.version
+        dict.__setitem__(self, name, snap)
+        return snap
+
+    def _take(self, name: str) -> Table:
+        if self.closed:
+            raise ValueError("Transaction is already finished")
+        with self.db._lock:
+            if self.is_taken(name):
+                return dict.__getitem__(self, name)
+            # таблицю, яку після begin змінили, перейменували чи видалили, уже знято в pin()
+            origin = self.origin[name]
+            return self._store(name, origin if origin is not None else self.db.tables[name])
+
+    def pin(self, table: Table) -> None:
+        # під замком бази, перед зміною таблиці: знімок стану, який має бачити транзакція
+        if self.closed:
+            return
+        name = self.names.get(id(table))
+        if name is None and self.origin.get(table.name, False) is None:
+            name = table.name
+        if name is not None and not self.is_taken(name):
+            self._store(name, table)
+
+    def close(self) -> None:
+        with self.db._lock:
+            self.closed = True
+            self.db._open.pop(self.serial, None)
+
+
+class Transaction:
+    def __init__(self, db: Database):
+        self.db = db
+        self.log: List[Tuple[str, str, Tuple[Any, ...]]] = []
+        self.active = True
+        with db._lock:
+            tables = SnapshotTables(db, self.log)
+        self.snapshot = Database(name=db.name, tables=tables, cache=db.cache)
+        self.sources = tables.sources
+        self.versions = tables.versions
+
+    def _finish(self) -> None:
+        self.active = False
+        self.snapshot.tables.close()
+
+    def _check_active(self) -> None:
+        if not self.active:
+            raise ValueError("Transaction is already finished")
+
+    def table(self, name: str) -> Table:
+        self._check_active()
+        return self.snapshot.get_table(name)
+
+    def list_tables(self) -> List[str]:
+        return self.snapshot.list_tables()
+
+    def query(self, sql: str) -> List[Dict[str, Any]]:
+        self._check_active()
+        return self.snapshot.query(sql)
+
+    def commit(self) -> None:
+        self._check_active()
+        self._finish()
+        if not self.log:
+            return
+        written = dict.fromkeys(name for name, _, _ in self.log)
+        db = self.db
+        with db._lock:
+            for name in written:
+                t = db.tables.get(name)
+                if t is not self.sources[name] or t.version != self.versions[name]:
+                    raise Conflict(f"Table '{name}' was changed by another transaction")
+            for name, op, args in self.log:
+                apply_record(db, {"op": op, "table": name, "args": list(args)})
+
+    def rollback(self) -> None:
+        self._finish()
+        self.log.clear()
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], tb: Any) -> None:
+        if not self.active:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
@@ -0,0 +1,220 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from columnar import ColumnStore, NUMERIC_TYPECODES
+from models import Column, Table
+
+# Векторизовані операції над цілими/дійсними колонками. Якщо встановлено NumPy, колонка
+# ColumnStore віддається як ndarray без копіювання (np.frombuffer над array('q'/'d') або
+# mmap) разом із маскою NULL; для таблиць на dict-рядках масив будується одним проходом.
+# Без NumPy ті самі функції працюють звичайними циклами і дають той самий результат.
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # NumPy — необов'язкова залежність
+    np = None
+    HAS_NUMPY = False
+
+COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+}
+AGGREGATES = ("count", "sum", "min", "max", "mean")
+_NP_DTYPES = {"q": "int64", "d": "float64"}
+
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool:
+    if use_numpy and not HAS_NUMPY:
+        raise ValueError("NumPy is not installed")
+    return HAS_NUMPY if use_numpy is None else use_numpy
+
+
+def _numeric_column(t: Table, name: str) -> Column:
+    col = t._column(name)
+    if col.dtype not in NUMERIC_TYPECODES:
+        raise ValueError(f"Column '{name}' is not numeric")
+    return col
+
+
+def literal(col: Column, value: Any) -> Any:
+    # число для числової колонки лишається як є: validate обрізав би 2.5 до 2 для integer,
+    # і умови a = 2.5 чи a < 2.5 порівнювали б не з тим значенням
+    if col.dtype in NUMERIC_TYPECODES and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return col.validate(value)
+
+
+def column_array(t: Table, name: str) -> Tuple[Any, Any]:
+    # (значення, маска NULL або None, якщо NULL немає); на місці NULL у значеннях 0
+    if not HAS_NUMPY:
+        raise ValueError("NumPy is not installed")
+    col = _numeric_column(t, name)
+    dtype = _NP_DTYPES[NUMERIC_TYPECODES[col.dtype]]
+    rows = t.rows
+    if isinstance(rows, ColumnStore):
+        b = rows.buffers[name]
+        if getattr(b, "typecode", None) == NUMERIC_TYPECODES[col.dtype]:
+            data = np.frombuffer(b.data, dtype=dtype, count=rows.size)
+            if not b.nulls.any():
+                return data, None
+            bits = np.frombuffer(b.nulls.bits, dtype=np.uint8)
+            return data, np.unpackbits(bits, bitorder="little", count=rows.size).astype(bool)
+    values = list(t._column_values(name))
+    nulls = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    if not nulls.any():
+        return np.array(values, dtype=dtype), None
+    return np.array([0 if v is None else v for v in values], dtype=dtype), nulls
+
+
+def coerce(col: Column, values: Sequence[Any], use_numpy: Optional[bool] = None) -> Tuple[Any, List[Tuple[int, str]]]:
+    # Масове перетворення у тип колонки: (значення, помилки [(позиція, текст)]).
+    # З NumPy значення — ndarray, або numpy.ma.MaskedArray, якщо є NULL чи помилки;
+    # без NumPy — список, де NULL і помилкові значення дають None
+    if col.dtype not in NUMERIC_TYPECODES:
+        raise ValueError(f"Column '{col.name}' is not numeric")
+    numpy = _use_numpy(use_numpy)
+    types = set(map(type, values))
+    clean = types <= ({int} if col.dtype == "integer" else {int, float})
+    if clean and numpy:
+        try:
+            return np.array(values, dtype=_NP_DTYPES[NUMERIC_TYPECODES[col.dtype]]), []
+        except OverflowError:
+            pass
+    elif clean:
+        return (list(values) if col.dtype == "integer" else list(map(float, values))), []
+    if types == {str}:
+        # рядки з числами: одне масове перетворення, при першій помилці — поелементно
+        convert = int if col.dtype == "integer" else float
+        try:
+            converted = list(map(convert, values))
+            if numpy:
+                return np.array(converted, dtype=_NP_DTYPES[NUMERIC_TYPECODES[col.dtype]]), []
+            return converted, []
+        except (ValueError, OverflowError):
+            pass
+    validate = col.validator()
+    out: List[Any] = []
+    errors: List[Tuple[int, str]] = []
+    for i, v in enumerate(values):
+        try:
+            out.append(validate(v))
+        except ValueError as e:
+            errors.append((i, str(e)))
+            out.append(None)
+    if numpy:
+        mask = [v is None for v in out]
+        try:
+            data = np.array([0 if v is None else v for v in out], dtype=_NP_DTYPES[NUMERIC_TYPECODES[col.dtype]])
+        except OverflowError:
+            return out, errors
+        return np.ma.array(data, mask=mask), errors
+    return out, errors
+
+
+def filter_positions(t: Table, name: str, op: str, value: Any = None, use_numpy: Optional[bool] = None) -> List[int]:
+    # позиції рядків, для яких "колонка op value"; NULL, як і в SQL, не проходить порівняння
+    col = _numeric_column(t, name)
+    if op not in COMPARISONS and op not in ("in", "is null", "is not null"):
+        raise ValueError(f"Unsupported operator: {op}")
+    if op in COMPARISONS:
+        value = literal(col, value)
+        if value is None:
+            return []
+    elif op == "in":
+        value = [v for v in (literal(col, v) for v in value) if v is not None]
+    if _use_numpy(use_numpy):
+        try:
+            data, nulls = column_array(t, name)
+        except OverflowError:
+            data = None
+        if data is not None:
+            if op == "is null":
+                return [] if nulls is None else np.flatnonzero(nulls).tolist()
+            if op == "is not null":
+                return np.arange(len(data)).tolist() if nulls is None else np.flatnonzero(~nulls).tolist()
+            mask = np.isin(data, value) if op == "in" else COMPARISONS[op](data, value)
+            if nulls is not None:
+                mask &= ~nulls
+            return np.flatnonzero(mask).tolist()
+    if op == "is null":
+        return [i for i, v in enumerate(t._column_values(name)) if v is None]
+    if op == "is not null":
+        return [i for i, v in enumerate(t._column_values(name)) if v is not None]
+    if op == "in":
+        values = frozenset(value)
+        return [i for i, v in enumerate(t._column_values(name)) if v is not None and v in values]
+    cmp = COMPARISONS[op]
+    return [i for i, v in enumerate(t._column_values(name)) if v is not None and cmp(v, value)]
+
+
+def aggregate(t: Table, name: str, fn: str, positions: Optional[Sequence[int]] = None,
+              use_numpy: Optional[bool] = None) -> Any:
+    # count/sum/min/max/mean по не-NULL значеннях (необов'язково — лише по positions);
+    # на порожньому наборі count == 0, решта None
+    if fn not in AGGREGATES:
+        raise ValueError(f"Unsupported aggregate: {fn} (expected one of {', '.join(AGGREGATES)})")
+    _numeric_column(t, name)
+    if _use_numpy(use_numpy):
+        try:
+            data, nulls = column_array(t, name)
+        except OverflowError:
+            data = None
+        if data is not None:
+            if positions is not None:
+                idx = np.asarray(positions, dtype=np.intp)
+                data = data[idx]
+                nulls = None if nulls is None else nulls[idx]
+            valid = data if nulls is None else data[~nulls]
+            if fn == "count":
+                return int(valid.size)
+            if not valid.size:
+                return None
+            if fn == "sum":
+                return valid.sum().item()
+            if fn == "min":
+                return valid.min().item()
+            if fn == "max":
+                return valid.max().item()
+            return valid.mean().item()
+    values: Any = t._column_values(name)
+    if positions is not None:
+        column = list(values)
+        values = (column[p] for p in positions)
+    values = [v for v in values if v is not None]
+    if fn == "count":
+        return len(values)
+    if not values:
+        return None
+    if fn == "sum":
+        return sum(values)
+    if fn == "min":
+        return min(values)
+    if fn == "max":
+        return max(values)
+    return sum(values) / len(values)
+
+
+def sort_positions(t: Table, name: str, desc: bool = False, use_numpy: Optional[bool] = None) -> List[int]:
+    # стабільний порядок рядків за колонкою; NULL вважається найбільшим (як у query)
+    _numeric_column(t, name)
+    if _use_numpy(use_numpy):
+        try:
+            data, nulls = column_array(t, name)
+        except OverflowError:
+            data = None
+        if data is not None:
+            if desc:
+                # стабільний спадний порядок: сортуємо перевернутий масив і відображаємо назад
+                order = len(data) - 1 - np.argsort(data[::-1], kind="stable")[::-1]
+            else:
+                order = np.argsort(data, kind="stable")
+            if nulls is None:
+                return order.tolist()
+            order = order[~nulls[order]]
+            null_pos = np.flatnonzero(nulls)
+            parts = (null_pos, order) if desc else (order, null_pos)
+            return np.concatenate(parts).tolist()
+    values = list(t._column_values(name))
+    return sorted(range(len(values)), key=lambda i: (values[i] is None, values[i]), reverse=desc)
@@ -0,0 +1,146 @@
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from models import Column, Database, Table
+
+# Журнал змін (write-ahead log) поруч із файлом бази: <base>.wal, один JSON-запис на рядок.
+# Кожна зміна Database/Table дописується одразу, commit() робить fsync, checkpoint()
+# переписує базовий файл і очищує журнал. Записи мають зростаючий lsn; базовий файл
+# зберігає lsn останнього врахованого запису, тож повтор після збою між записом бази
+# і очищенням журналу не застосує зміни двічі.
+
+SUFFIX = ".wal"
+SYNC_MODES = ("always", "commit")
+DEFAULT_CHECKPOINT_BYTES = 16 * 2**20
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def wal_path(base_path: str) -> str:
+    return base_path + SUFFIX
+
+
+def attached_log(db: Database, base_path: str) -> Optional["WriteAheadLog"]:
+    for fn in db.listeners:
+        log = getattr(fn, "__self__", None)
+        if isinstance(log, WriteAheadLog) and log.base_path == base_path:
+            return log
+    return None
+
+
+class WriteAheadLog:
+    def __init__(self, db: Database, base_path: str, sync: str = "commit",
+                 checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unsupported sync mode: {sync}")
+        self.db = db
+        self.base_path = base_path
+        self.path = wal_path(base_path)
+        self.sync = sync
+        self.checkpoint_bytes = checkpoint_bytes
+        self.lsn = db.lsn
+        self.f = open(self.path, "ab")
+        db.listeners.append(self._record)
+
+    def _record(self, source: Any, op: str, args: Any) -> None:
+        self.lsn += 1
+        rec: Dict[str, Any] = {"lsn": self.lsn, "op": op, "args": list(args)}
+        if isinstance(source, Table):
+            rec["table"] = source.name
+        self.f.write((_encoder.encode(rec) + "\n").encode("utf-8"))
+        self.f.flush()
+        if self.sync == "always":
+            os.fsync(self.f.fileno())
+
+    def size(self) -> int:
+        return self.f.tell()
+
+    def commit(self) -> None:
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def checkpoint(self, progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
+        from storage import save_to_file
+        self.commit()
+        previous, self.db.lsn = self.db.lsn, self.lsn
+        try:
+            save_to_file(self.db, self.base_path, progress)
+        except BaseException:
+            # базовий файл не змінився, журнал лишається потрібним
+            self.db.lsn = previous
+            raise
+        self.f.seek(0)
+        self.f.truncate()
+        self.commit()
+
+    def needs_checkpoint(self) -> bool:
+        return self.size() >= self.checkpoint_bytes or not os.path.exists(self.base_path)
+
+    def save(self) -> bool:
+        # O(зміни): зазвичай лише fsync журналу; повний запис — коли журнал виріс
+        self.commit()
+        if self.needs_checkpoint():
+            self.checkpoint()
+            return True
+        return False
+
+    def close(self) -> None:
+        if self._record in self.db.listeners:
+            self.db.listeners.remove(self._record)
+        if not self.f.closed:
+            self.commit()
+            self.f.close()
+
+
+_DB_OPS: Dict[str, Callable[..., Any]] = {
+    "create_table": Database.create_table,
+    "add_table": lambda db, d: db.add_table(Table.from_dict(d)),
+    "rename_table": Database.rename_table,
+    "delete_table": Database.delete_table,
+}
+
+_TABLE_OPS: Dict[str, Callable[..., Any]] = {
+    "add_column": lambda t, d: t.add_column(Column(**d)),
+    "delete_column": Table.delete_column,
+    "convert_column": Table.convert_column,
+    "add_row": Table.add_row,
+    "add_rows": Table.add_rows,
+    "edit_row": Table.edit_row,
+    "delete_row": Table.delete_row,
+    "create_index": Table.create_index,
+    "drop_index": Table.drop_index,
+}
+
+
+def apply_record(db: Database, rec: Dict[str, Any]) -> None:
+    op = rec["op"]
+    if "table" in rec:
+        fn = _TABLE_OPS.get(op)
+        target: Any = db.get_table(rec["table"])
+    else:
+        fn = _DB_OPS.get(op)
+        target = db
+    if fn is None:
+        raise ValueError(f"Unknown WAL operation: {op}")
+    fn(target, *rec["args"])
+
+
+def replay(db: Database, base_path: str) -> int:
+    path = wal_path(base_path)
+    if not os.path.exists(path):
+        return 0
+    applied = 0
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                break  # недописаний останній запис після збою
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Corrupt WAL record at {path}:{lineno}")
+            if rec["lsn"] <= db.lsn:
+                continue
+            apply_record(db, rec)
+            db.lsn = rec["lsn"]
+            applied += 1
+    return applied